@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""Startup-time benchmark for the non-interactive repwritter.py commands.
+
+Runs each command several times against a throwaway HOME and fails when its
+median wall time, minus the time of a bare ``python -c pass``, goes over the
+budget. With --importtime it also lists the
+slowest imports reported by ``python -X importtime``.
+
+The budget applies to both ``python repwritter.py``, the documented command, and
+``python -m repwritter``. Both only import ``repwritter.cli`` and the module of
+the command being run, from cached bytecode.
+
+    python benchmarks/startup.py
+    python benchmarks/startup.py --budget-ms 50 --runs 20 --importtime
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+REPO_PATH = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+SCRIPT = os.path.join(REPO_PATH, "repwritter.py")
+COMMANDS = [
+    ["--help"],
+    ["status"],
+    ["search", "--help"],
+    ["build", "--help"],
+]
+
+def time_command(argv, env, runs):
+    """Return the wall times in milliseconds of running argv runs times."""
+    samples = []
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run(argv, env=env, cwd=REPO_PATH, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=True)
+        samples.append((time.perf_counter() - started) * 1000)
+    return samples
+
+def slowest_imports(env, count):
+    """Parse python -X importtime for --help and return the modules with the highest cumulative time."""
+    result = subprocess.run([sys.executable, "-X", "importtime", "-m", "repwritter", "--help"], env=env, cwd=REPO_PATH,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    imports, started = [], False
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        # Everything before runpy is interpreter startup; nested imports are part of their parent's time
+        if started and not name.startswith("  "):
+            imports.append((int(cumulative) / 1000, name.strip()))
+        started = started or name.strip() == "runpy"
+    return sorted(imports, reverse=True)[:count]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=10, help="Runs per command (default: 10)")
+    parser.add_argument("--budget-ms", type=float, default=60.0,
+                        help="Maximum median time per command on top of the interpreter startup (default: 60)")
+    parser.add_argument("--importtime", action="store_true", help="Show the slowest imports of repwritter.py")
+    parser.add_argument("--json", metavar="PATH", help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as home:
+        env = dict(os.environ, HOME=home)
+        baseline = statistics.median(time_command([sys.executable, "-c", "pass"], env, args.runs))
+        print(f"python -c pass: {baseline:.1f} ms (interpreter baseline)")
+
+        # Make sure the bytecode cache exists before timing
+        subprocess.run([sys.executable, "-m", "compileall", "-q", "repwritter"], env=env, cwd=REPO_PATH, check=True)
+
+        results, over_budget = [], []
+        for command in COMMANDS:
+            for launcher, argv in (("repwritter.py", [SCRIPT]), ("-m repwritter", ["-m", "repwritter"])):
+                samples = time_command([sys.executable, *argv, *command], env, args.runs)
+                median = statistics.median(samples)
+                results.append({'launcher': launcher, 'command': command, 'median_ms': median,
+                                'min_ms': min(samples), 'max_ms': max(samples)})
+                over = median - baseline > args.budget_ms
+                print(f"{launcher:<14}{' '.join(command):<14} median {median:6.1f} ms  min {min(samples):6.1f} ms  "
+                      f"{'OVER BUDGET' if over else 'ok'}")
+                if over:
+                    over_budget.append(f"{launcher} {' '.join(command)}")
+
+        if args.importtime:
+            print("\nSlowest imports (cumulative):")
+            for elapsed, name in slowest_imports(env, 10):
+                print(f"  {elapsed:6.1f} ms  {name}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'python': sys.version, 'runs': args.runs, 'budget_ms': args.budget_ms,
+                       'baseline_ms': baseline, 'results': results}, f, indent=2)
+
+    if over_budget:
+        print(f"\n❌ {len(over_budget)} command(s) over the {args.budget_ms:.0f} ms budget")
+        return 1
+    print(f"\n✅ All commands within the {args.budget_ms:.0f} ms budget")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+"""Benchmark the generate/save/load/publish paths of repwritter.py on synthetic writeups.
+
+Builds a writeup with N steps, M images and K attachments inside a throwaway
+HOME, then times each phase: generate_writeup (cold and unchanged), save_state,
+load_state, loading the generated README back, upload_to_github into a clone of
+a local bare repository, and the push to that bare repository.
+
+For every phase it reports wall time, bytes written (by this process and the
+git and worker processes it waited for), peak RSS and the number of
+subprocesses started. Results can be saved as JSON and
+compared against an earlier run:
+
+    python benchmarks/writeups.py --steps 200 --images 50 --attachments 10 --json new.json
+    python benchmarks/writeups.py --steps 200 --images 50 --attachments 10 --compare new.json
+"""
+import argparse
+import contextlib
+import json
+import os
+import platform
+import random
+import resource
+import shutil
+import struct
+import subprocess
+import sys
+import tempfile
+import time
+import zlib
+
+REPO_PATH = os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+
+class Counters:
+    """Per-phase wall time, bytes written, peak RSS and subprocess count.
+
+    Subprocesses are both the commands run through subprocess (git, the publish
+    worker) and the multiprocessing workers started by process pools.
+    """
+
+    def __init__(self):
+        import multiprocessing.process
+        self.subprocesses = 0
+        self.results = []
+        original_init = subprocess.Popen.__init__
+        original_start = multiprocessing.process.BaseProcess.start
+
+        def counting_init(popen, *args, **kwargs):
+            self.subprocesses += 1
+            original_init(popen, *args, **kwargs)
+
+        def counting_start(process):
+            self.subprocesses += 1
+            original_start(process)
+
+        subprocess.Popen.__init__ = counting_init
+        multiprocessing.process.BaseProcess.start = counting_start
+
+    def measure(self, name, function, *args):
+        reset_peak_rss()
+        written, spawned = bytes_written(), self.subprocesses
+        started = time.perf_counter()
+        result = function(*args)
+        elapsed = time.perf_counter() - started
+        self.results.append({
+            'phase': name,
+            'wall_s': elapsed,
+            'bytes_written': bytes_written() - written if written is not None else None,
+            'peak_rss_mb': peak_rss_mb(),
+            'children_peak_rss_mb': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024,
+            'subprocesses': self.subprocesses - spawned,
+        })
+        return result
+
+def bytes_written():
+    """Bytes written so far by this process and its reaped children, from /proc/self/io (Linux only)."""
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                if line.startswith("wchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+def reset_peak_rss():
+    """Reset the kernel's peak RSS counter so each phase reports its own peak (Linux only)."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+    except OSError:
+        pass
+
+def peak_rss_mb():
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    # Without /proc only the high-water mark of the whole run is available
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def write_png(path, size, rng):
+    """Write a size x size PNG of random pixels, so it neither compresses nor dedups."""
+    raw = b"".join(b"\x00" + rng.randbytes(size * 3) for _ in range(size))
+
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+    with open(path, "wb") as f:
+        f.write(b"\x89PNG\r\n\x1a\n")
+        f.write(chunk(b"IHDR", struct.pack(">IIBBBBB", size, size, 8, 2, 0, 0, 0)))
+        f.write(chunk(b"IDAT", zlib.compress(raw, 1)))
+        f.write(chunk(b"IEND", b""))
+
+def make_writeup(WriteupGenerator, source_dir, args, rng):
+    """Fill a WriteupGenerator with the synthetic content described by args."""
+    generator = WriteupGenerator(os.path.join(source_dir, "repo"))
+    generator.title = "Benchmark Box"
+    generator.sections['title'] = True
+    generator.input_order.append(('title', None))
+
+    image_paths = []
+    for i in range(args.images):
+        path = os.path.join(source_dir, f"screenshot_{i:04d}.png")
+        write_png(path, args.image_size, rng)
+        image_paths.append(path)
+
+    # The first image is the machine image, the rest are spread over the steps
+    if image_paths:
+        generator.images.append(("machine", image_paths[0]))
+        generator.sections['image'] = True
+        generator.input_order.append(('image', 0))
+    step_images = image_paths[1:]
+    for i in range(args.steps):
+        description = [f"Line {j} of step {i}: " + " ".join(rng.choice(("nmap", "suid", "shell", "ssh", "flag", "port"))
+                                                           for _ in range(12)) for j in range(args.lines)]
+        image = (f"step_{i:04d}", step_images[i]) if i < len(step_images) else None
+        generator.steps.append((f"Step {i}", description, f"cat /etc/passwd | grep {i}", image))
+        generator.input_order.append(('step', i))
+    generator.sections['description'] = bool(generator.steps)
+
+    for i in range(args.attachments):
+        path = os.path.join(source_dir, f"attachment_{i:03d}.bin")
+        with open(path, "wb") as f:
+            f.write(rng.randbytes(args.attachment_kb * 1024))
+        generator.files.append((os.path.basename(path), path))
+        generator.input_order.append(('file', i))
+    generator.flags.append("f" * 32)
+    generator.input_order.append(('flag', 0))
+    return generator
+
+def make_repository(work_dir):
+    """Create a bare repository and a clone of it to publish into."""
+    bare = os.path.join(work_dir, "remote.git")
+    clone = os.path.join(work_dir, "repo")
+    subprocess.run(["git", "init", "-q", "--bare", bare], check=True)
+    subprocess.run(["git", "clone", "-q", bare, clone], check=True, stderr=subprocess.DEVNULL)
+    subprocess.run(["git", "commit", "-q", "--allow-empty", "-m", "Initial commit"], cwd=clone, check=True)
+    subprocess.run(["git", "push", "-q", "origin", "HEAD"], cwd=clone, check=True)
+    return clone
+
+@contextlib.contextmanager
+def silenced():
+    """Send stdout to /dev/null at the file descriptor level, so git's output is hidden too."""
+    sys.stdout.flush()
+    saved = os.dup(1)
+    devnull = os.open(os.devnull, os.O_WRONLY)
+    os.dup2(devnull, 1)
+    try:
+        yield
+    finally:
+        sys.stdout.flush()
+        os.dup2(saved, 1)
+        os.close(devnull)
+        os.close(saved)
+
+def compare(results, baseline_path):
+    with open(baseline_path) as f:
+        baseline = {r['phase']: r for r in json.load(f)['results']}
+    print(f"\nCompared with {baseline_path}:")
+    for result in results:
+        old = baseline.get(result['phase'])
+        if old and old['wall_s']:
+            print(f"  {result['phase']:<16} {old['wall_s'] * 1000:9.1f} ms -> {result['wall_s'] * 1000:9.1f} ms "
+                  f"({result['wall_s'] / old['wall_s']:.2f}x)")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--steps", type=int, default=50, help="Steps in the writeup (default: 50)")
+    parser.add_argument("--lines", type=int, default=5, help="Description lines per step (default: 5)")
+    parser.add_argument("--images", type=int, default=20, help="Images, the first one is the machine image (default: 20)")
+    parser.add_argument("--image-size", type=int, default=1024, help="Width and height of each image in pixels (default: 1024)")
+    parser.add_argument("--attachments", type=int, default=5, help="Attached files (default: 5)")
+    parser.add_argument("--attachment-kb", type=int, default=512, help="Size of each attachment in KB (default: 512)")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed for the synthetic content (default: 1)")
+    parser.add_argument("--json", metavar="PATH", help="Write the results as JSON")
+    parser.add_argument("--compare", metavar="PATH", help="Compare with the JSON results of an earlier run")
+    parser.add_argument("--keep", action="store_true", help="Keep the temporary HOME for inspection")
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp(prefix="repwritter-bench-")
+    # repwritter resolves its folders from HOME at import time
+    os.environ["HOME"] = work_dir
+    for key, value in (("GIT_AUTHOR_NAME", "bench"), ("GIT_AUTHOR_EMAIL", "bench@localhost"),
+                       ("GIT_COMMITTER_NAME", "bench"), ("GIT_COMMITTER_EMAIL", "bench@localhost")):
+        os.environ.setdefault(key, value)
+    with open(os.path.join(work_dir, ".Gitenv"), "w") as f:
+        f.write("GITHUB_TOKEN=benchmark")
+    sys.path.insert(0, REPO_PATH)
+    from repwritter import push_queue
+    from repwritter.config import PUBLISH_LOG_PATH, SAVED_WRITEUPS_PATH
+    from repwritter.generator import WriteupGenerator
+    # Pushes run in the foreground "push" phase instead of a detached worker
+    push_queue.start_publish_worker = lambda: None
+
+    try:
+        source_dir = os.path.join(work_dir, "sources")
+        os.makedirs(source_dir)
+        os.makedirs(SAVED_WRITEUPS_PATH)
+        clone = make_repository(work_dir)
+        generator = make_writeup(WriteupGenerator, source_dir, args, random.Random(args.seed))
+        generator.writeup_name = "benchmark"
+        counters = Counters()
+
+        with silenced():
+            readme_path = counters.measure("generate", generator.generate_writeup)
+            counters.measure("generate_again", generator.generate_writeup)
+            counters.measure("save_state", generator.save_state)
+            loaded = WriteupGenerator(clone)
+            counters.measure("load_state", loaded.load_state,
+                             os.path.join(SAVED_WRITEUPS_PATH, "benchmark.json"))
+            with open(readme_path) as f:
+                imported = WriteupGenerator(clone)
+                counters.measure("load_readme", imported.import_readme, f, os.path.dirname(readme_path))
+            counters.measure("upload_to_github", generator.upload_to_github, readme_path, clone)
+            remaining = counters.measure("push", push_queue.drain_publish_queue, True, lambda message: None)
+        if len(imported.steps) != args.steps or len(loaded.steps) != args.steps:
+            print(f"❌ Round trip lost steps: {len(loaded.steps)} after load_state, "
+                  f"{len(imported.steps)} after loading the README, {args.steps} expected")
+            return 1
+        if remaining:
+            print(f"❌ {remaining} push(es) still queued, see {PUBLISH_LOG_PATH}")
+            return 1
+
+        print(f"{args.steps} steps, {args.images} images of {args.image_size}px, "
+              f"{args.attachments} attachments of {args.attachment_kb} KB")
+        print(f"{'phase':<18}{'wall':>11}{'written':>12}{'peak RSS':>11}{'children RSS':>14}{'subprocs':>10}")
+        for r in counters.results:
+            written = f"{r['bytes_written'] / 1024 / 1024:.1f} MB" if r['bytes_written'] is not None else "n/a"
+            print(f"{r['phase']:<18}{r['wall_s'] * 1000:8.1f} ms{written:>12}{r['peak_rss_mb']:8.1f} MB"
+                  f"{r['children_peak_rss_mb']:11.1f} MB{r['subprocesses']:>10}")
+
+        if args.json:
+            with open(args.json, "w") as f:
+                json.dump({'params': vars(args), 'python': sys.version, 'platform': platform.platform(),
+                           'results': counters.results}, f, indent=2)
+        if args.compare:
+            compare(counters.results, args.compare)
+        return 0
+    finally:
+        if args.keep:
+            print(f"Files kept in {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    sys.exit(main())
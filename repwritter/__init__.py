@@ -0,0 +1,6 @@
+"""Create, edit and publish CTF writeups as README.md folders in a GitHub repository.
+
+The program is split by feature (store, publish, search, site, ...) and the command
+line in repwritter.cli imports each module only when its command runs, so importing
+the package stays cheap.
+"""
@@ -0,0 +1,3 @@
+from repwritter.cli import main
+
+main()
@@ -0,0 +1,193 @@
+"""Batch commands: build writeups from saved state files and import existing README folders."""
+import contextlib
+import glob
+import io
+import json
+import os
+import sqlite3
+import time
+
+from .config import PRUNED_FOLDERS, SAVED_WRITEUPS_PATH
+from .generator import WriteupGenerator
+from .largefiles import POINTER_SUFFIX
+from .readme import parse_readme
+from .sessions import SessionStore
+from .tracing import merge_trace, run_traced, trace_span, _trace
+
+def build_spec(spec_path):
+    """Build one writeup from a saved state file. Runs inside a worker process."""
+    started = time.perf_counter()
+    try:
+        with open(spec_path, 'r') as f:
+            state = json.load(f)
+        generator = WriteupGenerator(state.get('repo_path') or "")
+        generator.apply_state(state)
+        generator.link_references()
+        # Workers share the terminal, keep the per-writeup chatter out of the summary
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            readme_path = generator.generate_writeup()
+        if not readme_path:
+            lines = output.getvalue().strip().splitlines()
+            return spec_path, None, lines[-1].strip(" ❌⚠️") if lines else "Generation failed", time.perf_counter() - started
+        return spec_path, readme_path, None, time.perf_counter() - started
+    except Exception as e:
+        return spec_path, None, str(e), time.perf_counter() - started
+
+def expand_spec_paths(patterns):
+    """Expand spec arguments, accepting globs and folders of .json files."""
+    spec_paths = []
+    for pattern in patterns:
+        pattern = os.path.expanduser(pattern)
+        if os.path.isdir(pattern):
+            spec_paths.extend(sorted(glob.glob(os.path.join(pattern, "*.json"))))
+        elif glob.has_magic(pattern):
+            spec_paths.extend(sorted(glob.glob(pattern)))
+        else:
+            spec_paths.append(pattern)
+    # Keep the first occurrence of each spec
+    return list(dict.fromkeys(spec_paths))
+
+def cmd_build(args):
+    """Generate writeups for many saved state files in parallel."""
+    spec_paths = expand_spec_paths(args.specs)
+    if not spec_paths:
+        print("❌ No spec files matched.")
+        return 1
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    started = time.perf_counter()
+    built, failed = [], []
+    with trace_span("build", files=len(spec_paths)), ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        futures = [executor.submit(run_traced, _trace['path'], build_spec, spec_path) for spec_path in spec_paths]
+        for future in as_completed(futures):
+            spec_path, readme_path, error, elapsed = merge_trace(future)
+            if error:
+                failed.append((spec_path, error))
+                print(f"❌ {spec_path}: {error}")
+            else:
+                built.append(readme_path)
+                print(f"✅ {readme_path} ({elapsed:.2f}s)")
+
+    print("\n" + "=" * 40)
+    print(f"Built {len(built)}/{len(spec_paths)} writeups in {time.perf_counter() - started:.2f}s")
+    if failed:
+        print(f"Failed ({len(failed)}):")
+        for spec_path, error in failed:
+            print(f"  - {spec_path}: {error}")
+    return 1 if failed else 0
+
+def find_readme_folders(roots):
+    """Every folder under roots that holds a README.md, skipping .git and dependency folders."""
+    folders = []
+    for root in roots:
+        root = os.path.abspath(os.path.expanduser(root))
+        for current, dirnames, filenames in os.walk(root):
+            dirnames[:] = sorted(d for d in dirnames if not d.startswith('.') and d not in PRUNED_FOLDERS and d != "img")
+            if "README.md" in filenames:
+                folders.append(current)
+    return list(dict.fromkeys(folders))
+
+def import_writeup(folder, save_file):
+    """Parse folder/README.md, its img/ folder and attachments into a saved state file. Runs inside a worker process."""
+    try:
+        with open(os.path.join(folder, "README.md"), 'r', errors='replace') as f:
+            state = parse_readme(f, folder)
+        state['title'] = os.path.basename(folder)
+        if ('title', None) not in state['input_order']:
+            state['input_order'].insert(0, ('title', None))
+        state['sections']['title'] = True
+
+        # Everything next to the README is an attachment, large ones may only be present as a pointer
+        notes = []
+        for entry in sorted(os.scandir(folder), key=lambda entry: entry.name):
+            if entry.name == "README.md" or entry.name.startswith('.') or not entry.is_file():
+                continue
+            if entry.name.endswith(POINTER_SUFFIX):
+                if not os.path.isfile(entry.path[:-len(POINTER_SUFFIX)]):
+                    notes.append(f"{entry.name[:-len(POINTER_SUFFIX)]} not hydrated")
+                continue
+            state['files'].append((entry.name, entry.path))
+            state['input_order'].append(('file', len(state['files']) - 1))
+        images = [path for _, path in state['images']] + [step[3][1] for step in state['steps'] if step[3]]
+        missing = [os.path.basename(path) for path in images if not os.path.isfile(path)]
+        if missing:
+            notes.append(f"missing images: {', '.join(missing)}")
+
+        generator = WriteupGenerator("")
+        generator.apply_state(state)
+        generator.writeup_name = os.path.splitext(os.path.basename(save_file))[0]
+        generator.imported_from = folder
+        tmp_path = f"{save_file}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(generator.state_dict(), f)
+        os.replace(tmp_path, save_file)
+        return folder, save_file, len(generator.steps), notes, None
+    except Exception as e:
+        return folder, save_file, 0, [], str(e)
+
+def cmd_import(args):
+    """Turn every README.md found under the given folders into a saved writeup, in parallel."""
+    started = time.perf_counter()
+    folders = find_readme_folders(args.paths)
+    if not folders:
+        print("❌ No README.md found.")
+        return 1
+    os.makedirs(SAVED_WRITEUPS_PATH, exist_ok=True)
+
+    # Names are picked up front so workers never race for the same file
+    taken = {}
+    for entry in os.scandir(SAVED_WRITEUPS_PATH):
+        if entry.name.endswith(".json"):
+            try:
+                with open(entry.path, 'r') as f:
+                    taken[entry.name[:-len(".json")]] = json.load(f).get('imported_from')
+            except (OSError, ValueError):
+                taken[entry.name[:-len(".json")]] = None
+    imported_from = {source: name for name, source in taken.items() if source}
+    jobs, skipped = [], []
+    for folder in folders:
+        name = imported_from.get(folder)
+        if name and not args.force:
+            skipped.append((folder, name))
+            continue
+        if name is None:
+            base = name = os.path.basename(folder) or "writeup"
+            suffix = 2
+            while name in taken:
+                name, suffix = f"{base}-{suffix}", suffix + 1
+            taken[name] = folder
+        jobs.append((folder, os.path.join(SAVED_WRITEUPS_PATH, f"{name}.json")))
+
+    print(f"📦 Importing {len(jobs)} writeups ({len(skipped)} already imported)...")
+    imported, failed = [], []
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    with trace_span("import", files=len(jobs)), ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        futures = [executor.submit(run_traced, _trace['path'], import_writeup, folder, save_file) for folder, save_file in jobs]
+        for done, future in enumerate(as_completed(futures), 1):
+            folder, save_file, steps, notes, error = merge_trace(future)
+            if error:
+                failed.append((folder, error))
+                print(f"\r{f'❌ {folder}: {error}':<40}")
+            else:
+                imported.append(save_file)
+                if notes:
+                    print(f"\r{f'⚠️ {folder}: ' + '; '.join(notes):<40}")
+            if done % 50 == 0 or done == len(futures):
+                print(f"\r   {done}/{len(futures)} done", end="", flush=True)
+    print()
+
+    try:
+        SessionStore().catalog_sync()
+    except sqlite3.Error as e:
+        print(f"⚠️ Could not update the saved writeups catalog: {e}")
+
+    print("\n" + "=" * 40)
+    print(f"Imported {len(imported)}/{len(jobs)} writeups into {SAVED_WRITEUPS_PATH} in {time.perf_counter() - started:.2f}s")
+    if skipped:
+        print(f"Skipped {len(skipped)} already imported (use --force to import them again)")
+    if failed:
+        print(f"Failed ({len(failed)}):")
+        for folder, error in failed:
+            print(f"  - {folder}: {error}")
+    return 1 if failed else 0
@@ -0,0 +1,134 @@
+"""The gc command: find and remove images that no writeup uses any more."""
+import json
+import os
+import time
+
+from .config import IMAGE_FORMAT, MANIFESTS_PATH, SAVED_WRITEUPS_PATH, WRITEUPS_PATH, format_size
+from .readme import img_references
+from .store import hash_file, load_manifest, object_path
+from .tracing import run_git, trace_span
+
+def find_orphan_assets(folder, referenced):
+    """List the files in folder/img that neither the README, the last export nor a saved session refers to.
+
+    Returns (folder, [(relative path, size)], whether the folder has an export manifest).
+    Runs inside a worker process.
+    """
+    reachable = set(referenced)
+    try:
+        with open(os.path.join(folder, "README.md"), 'r', errors='replace') as f:
+            reachable.update(img_references(f.read()))
+    except OSError:
+        # Without a README there is no way to tell what is still in use
+        return folder, [], False
+    manifest = load_manifest(folder)
+    reachable.update(os.path.relpath(path, "img") for path in manifest['assets'] if path.startswith("img" + os.sep))
+
+    orphans = []
+    for current, _, filenames in os.walk(os.path.join(folder, "img")):
+        for name in filenames:
+            path = os.path.join(current, name)
+            relative_path = os.path.relpath(path, os.path.join(folder, "img"))
+            if relative_path in reachable:
+                continue
+            orphans.append((os.path.join("img", relative_path), os.lstat(path).st_size))
+    return folder, sorted(orphans), manifest['readme'] is not None
+
+def git_toplevel(folder):
+    """The work tree that contains folder, found without starting git."""
+    current = os.path.abspath(folder)
+    while True:
+        if os.path.exists(os.path.join(current, ".git")):
+            return current
+        parent = os.path.dirname(current)
+        if parent == current:
+            return None
+        current = parent
+
+def cmd_gc(args):
+    """Find, and with --delete remove, images that no writeup refers to anymore, in ~/writeups and the repositories."""
+    started = time.perf_counter()
+    # Published copies are known from their export manifests, local ones from ~/writeups
+    folders = set()
+    if os.path.isdir(MANIFESTS_PATH):
+        for entry in os.scandir(MANIFESTS_PATH):
+            try:
+                with open(entry.path, 'r') as f:
+                    folders.add(json.load(f)['folder'])
+            except (OSError, ValueError, KeyError):
+                pass
+    if os.path.isdir(WRITEUPS_PATH):
+        folders.update(entry.path for entry in os.scandir(WRITEUPS_PATH) if entry.is_dir())
+    folders = sorted(folder for folder in folders if os.path.isdir(os.path.join(folder, "img")))
+
+    # Images of saved sessions stay reachable even before the README is generated again
+    by_title = {}
+    for entry in os.scandir(SAVED_WRITEUPS_PATH) if os.path.isdir(SAVED_WRITEUPS_PATH) else []:
+        if not entry.name.endswith(".json"):
+            continue
+        try:
+            with open(entry.path, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            continue
+        names = by_title.setdefault(state.get('title', ""), set())
+        names.update(f"{image[0]}.{IMAGE_FORMAT}" for image in state.get('images', []))
+        names.update(f"{step[3][0]}.{IMAGE_FORMAT}" for step in state.get('steps', []) if step[3])
+        names.update(file_info[0] for file_info in state.get('files', []))
+
+    from concurrent.futures import ProcessPoolExecutor
+    with trace_span("gc", files=len(folders)), ProcessPoolExecutor(max_workers=args.jobs) as executor:
+        results = [(folder, orphans, managed) for folder, orphans, managed in executor.map(
+            find_orphan_assets, folders, [by_title.get(os.path.basename(folder), set()) for folder in folders],
+            chunksize=32) if orphans]
+
+    total = sum(size for _, orphans, _ in results for _, size in orphans)
+    count = sum(len(orphans) for _, orphans, _ in results)
+    for folder, orphans, managed in results:
+        # Hand-written READMEs may link images in ways the parser does not know about
+        print(f"\n{folder}" + ("" if managed else " (not exported by repwritter, never deleted)"))
+        for relative_path, size in orphans:
+            print(f"   {relative_path} ({format_size(size)})")
+    if not results:
+        print(f"✅ No unused images in {len(folders)} writeup folders ({time.perf_counter() - started:.2f}s).")
+        return 0
+    summary = f"{count} unused file(s) in {len(results)} of {len(folders)} writeup folders, {format_size(total)}"
+    if not args.delete:
+        print(f"\n🗑️ {summary}. Run with --delete to remove them.")
+        return 0
+
+    repos, linked, freed, kept = {}, {}, 0, 0
+    for folder, orphans, managed in results:
+        if not managed:
+            kept += len(orphans)
+            continue
+        for relative_path, size in orphans:
+            path = os.path.join(folder, relative_path)
+            st = os.lstat(path)
+            if st.st_nlink == 1:
+                freed += size
+            else:
+                # Usually a link to the object store, which can go too once no copy uses it
+                linked[(st.st_dev, st.st_ino)] = (hash_file(path), size)
+            os.remove(path)
+            toplevel = git_toplevel(folder)
+            if toplevel:
+                repos.setdefault(toplevel, []).append(os.path.relpath(path, toplevel))
+    # Stage the removals so they go out with the next commit of each repository
+    for toplevel, paths in repos.items():
+        for i in range(0, len(paths), 500):
+            run_git(["rm", "-q", "--cached", "--ignore-unmatch", "--", *paths[i:i + 500]], toplevel, check=False)
+        print(f"📝 {len(paths)} removal(s) staged in {toplevel}, commit them with: git -C {toplevel} commit -m 'Remove unused images'")
+    for (dev, ino), (digest, size) in linked.items():
+        try:
+            st = os.lstat(object_path(digest))
+        except OSError:
+            continue
+        if (st.st_dev, st.st_ino) == (dev, ino) and st.st_nlink == 1:
+            os.remove(object_path(digest))
+            freed += size
+    print(f"\n✅ Removed {count - kept} unused file(s), {format_size(freed)} freed on disk "
+          f"(images still used by another writeup stay in the object store).")
+    if kept:
+        print(f"⚠️ Kept {kept} file(s) in folders without an export manifest; delete them by hand if they are unused.")
+    return 0
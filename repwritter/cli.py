@@ -0,0 +1,101 @@
+"""Command line parsing and dispatch. Command modules are imported only when their command runs."""
+import argparse
+import os
+import sys
+
+from .config import SITE_PATH, WRITEUPS_PATH
+
+# Module and function of every command, imported only when that command runs
+COMMANDS = {
+    "build": ("batch", "cmd_build"),
+    "search": ("search", "cmd_search"),
+    "reindex": ("search", "cmd_reindex"),
+    "import": ("batch", "cmd_import"),
+    "publish": ("publish", "cmd_publish"),
+    "gc": ("cleanup", "cmd_gc"),
+    "refs": ("sessions", "cmd_refs"),
+    "watch": ("watch", "cmd_watch"),
+    "site": ("static_site", "cmd_site"),
+    "hydrate": ("largefiles", "cmd_hydrate"),
+    "status": ("push_queue", "cmd_status"),
+    "push": ("push_queue", "cmd_push"),
+}
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="repwritter.py",
+        description="Create, edit and publish writeups. Runs the interactive menu when no command is given."
+    )
+    parser.add_argument("-q", "--quiet", action="store_true", help="Skip the banner in the interactive menu")
+    parser.add_argument("--trace", metavar="PATH", default=os.environ.get("REPWRITTER_TRACE"),
+                        help="Record phase and git timings as a Chrome/Perfetto trace (also REPWRITTER_TRACE)")
+    subparsers = parser.add_subparsers(dest="command")
+
+    build_parser = subparsers.add_parser("build", help="Build writeups from saved state files without prompts")
+    build_parser.add_argument("specs", nargs="+", help="Saved state .json files, globs or folders")
+    build_parser.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+
+    search_parser = subparsers.add_parser("search", help="Search titles, subtitles, descriptions and one-liners")
+    search_parser.add_argument("query", nargs="+", help="Words to look for")
+    search_parser.add_argument("-n", "--limit", type=int, default=20, help="Maximum number of results")
+    reindex_parser = subparsers.add_parser("reindex", help="Rebuild the search index from every writeup")
+    reindex_parser.add_argument("path", nargs="?", default=WRITEUPS_PATH, help="Writeups folder (default: ~/writeups)")
+    reindex_parser.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+
+    watch_parser = subparsers.add_parser("watch", help="Regenerate writeups as their saved state and source files change")
+    watch_parser.add_argument("specs", nargs="*", help="Saved state .json files, globs or folders (default: every saved writeup)")
+    watch_parser.add_argument("--poll", action="store_true", help="Poll for changes instead of using inotify")
+
+    import_parser = subparsers.add_parser("import", help="Turn existing README.md folders into saved writeups")
+    import_parser.add_argument("paths", nargs="*", default=[WRITEUPS_PATH], help="Folders to search (default: ~/writeups)")
+    import_parser.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+    import_parser.add_argument("--force", action="store_true", help="Import folders that were already imported again")
+
+    publish_parser = subparsers.add_parser("publish", help="Commit many saved writeups to a repository in a single commit")
+    publish_parser.add_argument("specs", nargs="+", help="Saved state .json files, globs or folders")
+    publish_parser.add_argument("--repo", help="Repository to publish to (default: the repo_path of the writeups)")
+    publish_parser.add_argument("--folder", default=".", help="Folder inside the repository for the writeups (default: its root)")
+    publish_parser.add_argument("--no-checkout", action="store_true",
+                                help="Only move the branch, leave the index and working tree as they are (even if they have local changes)")
+    publish_parser.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+
+    gc_parser = subparsers.add_parser("gc", help="List or remove images in img/ folders that no writeup uses")
+    gc_parser.add_argument("--delete", action="store_true", help="Remove them and stage the removals in git")
+    gc_parser.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+
+    refs_parser = subparsers.add_parser("refs", help="List, set or forget the saved URLs of [word] references")
+    refs_parser.add_argument("word", nargs="?", help="Reference to show, set or forget")
+    refs_parser.add_argument("url", nargs="?", help="New URL for the reference")
+    refs_parser.add_argument("--forget", action="store_true", help="Remove the saved URL of the reference")
+    refs_parser.add_argument("-n", "--limit", type=int, default=50, help="Maximum number of references listed")
+
+    hydrate_parser = subparsers.add_parser("hydrate", help="Restore large attachments from their pointer files")
+    hydrate_parser.add_argument("paths", nargs="*", default=["."], help="Pointer files or folders to search (default: .)")
+
+    site_parser = subparsers.add_parser("site", help="Render every writeup to a static HTML site")
+    site_parser.add_argument("path", nargs="?", default=WRITEUPS_PATH, help="Writeups folder (default: ~/writeups)")
+    site_parser.add_argument("-o", "--output", default=SITE_PATH, help="Output folder (default: ~/.repwritter/site)")
+    site_parser.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes (default: CPU count)")
+
+    subparsers.add_parser("status", help="Show queued pushes and the background publish worker")
+    subparsers.add_parser("push", help="Push every queued commit now, in the foreground")
+    subparsers.add_parser("publish-worker", help=argparse.SUPPRESS)
+
+    return parser.parse_args(argv)
+
+def main():
+    args = parse_args()
+    if args.trace:
+        from .tracing import enable_tracing
+        enable_tracing(args.trace)
+    if args.command == "publish-worker":
+        from .push_queue import drain_publish_queue
+        drain_publish_queue(log=lambda message: print(message, flush=True))
+        sys.exit(0)
+    if args.command:
+        import importlib
+        module, function = COMMANDS[args.command]
+        sys.exit(getattr(importlib.import_module(f".{module}", __package__), function)(args))
+
+    from .menu import run_menu
+    run_menu(args)
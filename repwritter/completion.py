@@ -0,0 +1,85 @@
+"""Tab completion of file paths for the interactive prompts."""
+import os
+import time
+
+COMPLETION_CACHE_TTL = 2.0  # seconds a directory listing is trusted before its mtime is checked again
+FUZZY_COMPLETION = os.environ.get("REPWRITTER_FUZZY_COMPLETION", "") not in ("", "0")
+# Directory listings for tab completion, keyed by directory: (mtime_ns, checked_at, entries)
+_listing_cache = {}
+_completion_state = {'text': None, 'matches': []}
+
+def setup_tab_completion():
+    """Configure tab completion for paths"""
+    import readline
+    readline.parse_and_bind('tab: complete')
+    readline.set_completer_delims(' \t\n;')
+    readline.set_completer(path_completer)
+
+def list_directory(directory):
+    """Return the cached (name, is_dir, mtime) entries of a directory, rescanning only when it changed."""
+    now = time.monotonic()
+    cached = _listing_cache.get(directory)
+    if cached and now - cached[1] < COMPLETION_CACHE_TTL:
+        return cached[2]
+    mtime_ns = os.stat(directory).st_mtime_ns
+    if cached and cached[0] == mtime_ns:
+        _listing_cache[directory] = (mtime_ns, now, cached[2])
+        return cached[2]
+    entries = []
+    with os.scandir(directory) as it:
+        for entry in it:
+            try:
+                # d_type answers is_dir without a stat call; only fuzzy ranking needs the mtime
+                is_dir = entry.is_dir()
+                if not is_dir and not entry.is_file():
+                    continue
+                mtime = entry.stat().st_mtime if FUZZY_COMPLETION else 0
+            except OSError:
+                continue
+            entries.append((entry.name, is_dir, mtime))
+    _listing_cache[directory] = (mtime_ns, now, entries)
+    return entries
+
+def is_subsequence(needle, haystack):
+    """Check whether the characters of needle appear in order in haystack."""
+    it = iter(haystack)
+    return all(c in it for c in needle)
+
+def completion_matches(text):
+    """Compute every completion for text once; readline then walks the list by state."""
+    if "~" in text:
+        text = os.path.expanduser(text)
+
+    if os.path.isdir(text) and text.endswith('/'):
+        directory = text
+        prefix = ''
+    else:
+        directory = os.path.dirname(text) or '.'
+        prefix = os.path.basename(text)
+
+    head = text[:len(text) - len(prefix)]
+    entries = list_directory(directory)
+    found = [e for e in entries if e[0].startswith(prefix)]
+    if FUZZY_COMPLETION:
+        if not found and prefix:
+            needle = prefix.lower()
+            found = [e for e in entries if is_subsequence(needle, e[0].lower())]
+            # No typed prefix is shared, so hand readline the newest match instead of a list it would truncate to
+            found = sorted(found, key=lambda e: -e[2])[:1]
+        found.sort(key=lambda e: (not e[1], -e[2]))
+    else:
+        found.sort(key=lambda e: (not e[1], e[0]))
+    return [head + name + ('/' if is_dir else '') for name, is_dir, _ in found]
+
+def path_completer(text, state):
+    """Enhanced path completer with better directory handling"""
+    try:
+        if state == 0 or _completion_state['text'] != text:
+            _completion_state['text'] = text
+            _completion_state['matches'] = completion_matches(text)
+        matches = _completion_state['matches']
+        if state < len(matches):
+            return matches[state]
+    except OSError:
+        pass
+    return None
@@ -0,0 +1,82 @@
+"""Paths and settings shared by every module, plus the GitHub token setup."""
+import os
+import sys
+
+GITENV_PATH = os.path.expanduser("~/.Gitenv")
+WRITEUPS_PATH = os.path.expanduser("~/writeups")
+REPWRITTER_PATH = os.path.expanduser("~/.repwritter")
+SAVED_WRITEUPS_PATH = os.path.join(REPWRITTER_PATH, "saved_writeups")
+OBJECTS_PATH = os.path.join(REPWRITTER_PATH, "objects")
+MANIFESTS_PATH = os.path.join(REPWRITTER_PATH, "manifests")
+DERIVED_PATH = os.path.join(REPWRITTER_PATH, "derived")
+CHUNKS_PATH = os.path.join(REPWRITTER_PATH, "chunks")
+IMAGE_FORMAT = os.environ.get("REPWRITTER_IMAGE_FORMAT", "png").lower()  # png or webp
+MACHINE_IMAGE_WIDTH = 400
+STEP_IMAGE_WIDTH = 600
+SEARCH_DB_PATH = os.path.join(REPWRITTER_PATH, "search.db")
+SITE_PATH = os.path.join(REPWRITTER_PATH, "site")
+SESSIONS_DB_PATH = os.path.join(REPWRITTER_PATH, "sessions.db")
+CATALOG_PAGE_SIZE = 20
+FOLDER_INDEX_PATH = os.path.join(REPWRITTER_PATH, "folder_index")
+RECENT_TARGETS_PATH = os.path.join(REPWRITTER_PATH, "recent_targets.json")
+PRUNED_FOLDERS = {'node_modules', '__pycache__', 'venv', 'env', 'vendor', 'target', 'build', 'dist'}
+PUBLISH_QUEUE_PATH = os.path.join(REPWRITTER_PATH, "publish_queue")
+PUBLISH_LOCK_PATH = os.path.join(REPWRITTER_PATH, "publish.lock")
+PUBLISH_LOG_PATH = os.path.join(REPWRITTER_PATH, "publish.log")
+FOOTER_MARKDOWN = (
+    "<div align='center'>\n"
+    "  <p>Thanks for reading! Follow me on my socials:</p>\n"
+    "  <a href='https://x.com/@imahian'><img src='https://www.vectorlogo.zone/logos/x/x-icon.svg' alt='X' width='40'></a>\n"
+    "  <a href='https://discord.gg/dbesG8EX'><img src='https://www.vectorlogo.zone/logos/discord/discord-icon.svg' alt='Discord' width='40'></a>\n"
+    "  <a href='https://youtube.com/@imahian'><img src='https://www.vectorlogo.zone/logos/youtube/youtube-icon.svg' alt='YouTube' width='40'></a>\n"
+    "  <a href='https://twitch.tv/imahian'><img src='https://www.vectorlogo.zone/logos/twitch/twitch-icon.svg' alt='Twitch' width='40'></a>\n"
+    "</div>\n\n"
+    "---\n"
+)
+EXPORT_WORKERS = min(8, (os.cpu_count() or 1) * 2)
+
+def setup_gitenv():
+    """Set up the GitHub token in ~/.Gitenv."""
+    if os.path.exists(GITENV_PATH):
+        print(f"Using existing GitHub token from {GITENV_PATH}.")
+        return
+    print("GitHub token not found. Let's set it up.")
+    try:
+        github_token = input("Enter your GitHub token: ").strip()
+        with open(GITENV_PATH, "w") as f:
+            f.write(f"GITHUB_TOKEN={github_token}")
+        print(f"GitHub token saved to {GITENV_PATH}.")
+    except KeyboardInterrupt:
+        print("\nCancelling setup and exiting...")
+        sys.exit(0)
+
+def get_github_token(prompt=True):
+    """Retrieve the GitHub token from ~/.Gitenv, asking for it when the file is missing unless prompt is False."""
+    if not os.path.exists(GITENV_PATH):
+        if not prompt:
+            return None
+        setup_gitenv()
+    from dotenv import load_dotenv
+    load_dotenv(GITENV_PATH)
+    return os.getenv("GITHUB_TOKEN")
+
+def ensure_writeups_folder():
+    """Ensure the ~/writeups folder exists."""
+    if not os.path.exists(WRITEUPS_PATH):
+        os.makedirs(WRITEUPS_PATH)
+        print(f"Created writeups folder at {WRITEUPS_PATH}.")
+    return WRITEUPS_PATH
+
+def ensure_saved_writeups_folder():
+    """Ensure the saved writeups folder exists."""
+    if not os.path.exists(SAVED_WRITEUPS_PATH):
+        os.makedirs(SAVED_WRITEUPS_PATH)
+        print(f"Created saved writeups folder at {SAVED_WRITEUPS_PATH}.")
+    return SAVED_WRITEUPS_PATH
+
+def format_size(size):
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
@@ -0,0 +1,1050 @@
+"""The writeup being edited: its sections, autosave journal, rendering and export."""
+import hashlib
+import io
+import json
+import os
+import re
+import shutil
+import sqlite3
+from datetime import datetime
+
+from .completion import setup_tab_completion
+from .config import (CHUNKS_PATH, EXPORT_WORKERS, FOOTER_MARKDOWN, IMAGE_FORMAT, MACHINE_IMAGE_WIDTH,
+                     SAVED_WRITEUPS_PATH, STEP_IMAGE_WIDTH, WRITEUPS_PATH, ensure_writeups_folder, format_size,
+                     get_github_token)
+from .largefiles import LARGE_FILE_THRESHOLD, POINTER_SUFFIX, is_large_file, store_asset
+from .leaks import confirm_leaks, leak_literals, scan_for_leaks
+from .push_queue import enqueue_push
+from .readme import parse_readme
+from .search import update_search_index
+from .sessions import SessionStore
+from .store import (ExportProgress, carry_over_files, create_staging_folder, load_manifest, materialize_object,
+                    object_path, save_manifest, swap_folder, transcode_images)
+from .tracing import print_git_timings, run_git, trace_span
+
+JOURNAL_COMPACT_EVERY = 200  # journal records per session before they are merged into its snapshot
+REFERENCE = re.compile(r"\[([^\[\]\n]+)\](?!\()")  # A bare [word] that is not a link yet
+
+class WriteupGenerator:
+    def __init__(self, repo_path):
+        self.repo_path = repo_path
+        self.repo_name = os.path.basename(os.path.normpath(repo_path))
+        self.sections = {
+            'title': False,
+            'image': False,
+            'description': False
+        }
+        self.images = []  # Standalone images
+        self.title = ""
+        self.steps = []  # Descriptions with their own images
+        self.flags = []
+        self.files = []  # Additional files to upload
+        self.writeup_name = None
+        self.input_order = []
+        self.raw_blocks = []  # Imported markdown that is not split into sections
+        self.tags = []  # Written as a comment under the title and used by the site listings
+        self.imported_from = None  # README folder this writeup was created from by the import command
+        self.fragments = {}  # Rendered markdown per (input_type, index)
+        self.session_id = None  # Key of this session in the autosave journal
+        self.store = None
+        self.journal_count = 0
+        self.saved = False
+
+    def title_markdown(self):
+        tags = f"<!-- tags: {', '.join(self.tags)} -->\n\n" if self.tags else ""
+        return f"# {self.title}\n\n{tags}"
+
+    def image_markdown(self, image_name):
+        return f"<div align='center'>\n  <img src='img/{image_name}.{IMAGE_FORMAT}' width='{MACHINE_IMAGE_WIDTH}' alt='Machine Image'>\n</div>\n\n"
+
+    def step_image_markdown(self, image_name, subtitle):
+        return f"<div align='center'>\n  <img src='img/{image_name}.{IMAGE_FORMAT}' width='{STEP_IMAGE_WIDTH}' alt='{subtitle}'>\n</div>\n\n"
+
+    def step_markdown(self, step):
+        subtitle, description, oneliner, image_info = step
+        markdown = f"## {subtitle}\n\n"
+        markdown += "\n".join(description) + "\n\n"
+        if oneliner:
+            markdown += f"```bash\n {oneliner}\n```\n\n"
+        if image_info:
+            markdown += self.step_image_markdown(image_info[0], subtitle)
+        return markdown
+
+    def flag_markdown(self, flag):
+        flag_length = len(flag)
+        blurred = flag[:flag_length // 2] + "*" * (flag_length - flag_length // 2)
+        return f"\n## Flag\n\n```bash\n{blurred}\n```\n"
+
+    def large_file_markdown(self, file_info):
+        # Regular attachments are not mentioned in the README, large ones need a way back
+        file_name, source_path = file_info
+        if not is_large_file(source_path):
+            return ""
+        return (f"\n> 📦 `{file_name}` ({format_size(os.path.getsize(source_path))}) is kept out of git: "
+                f"[{file_name}{POINTER_SUFFIX}](<{file_name}{POINTER_SUFFIX}>). "
+                f"Restore it with `python repwritter.py hydrate .`\n\n")
+
+    def render_fragment(self, input_type, index):
+        if input_type == 'title':
+            return self.title_markdown()
+        if input_type == 'image':
+            return self.image_markdown(self.images[index][0])
+        if input_type == 'step':
+            return self.step_markdown(self.steps[index])
+        if input_type == 'flag':
+            return self.flag_markdown(self.flags[index])
+        if input_type == 'raw':
+            return self.raw_blocks[index]
+        if input_type == 'file':
+            return self.large_file_markdown(self.files[index])
+        return ""
+
+    @property
+    def markdown(self):
+        """README body rendered from input_order, reusing the cached fragment of every unchanged section."""
+        parts = []
+        for input_type, index in self.input_order:
+            key = (input_type, index)
+            fragment = self.fragments.get(key)
+            if fragment is None:
+                fragment = self.fragments[key] = self.render_fragment(input_type, index)
+            parts.append(fragment)
+        return "".join(parts)
+
+    def mark_changed(self, input_type, index=None):
+        """Record that a section was added or edited so its fragment is rendered again and autosaved."""
+        self.fragments.pop((input_type, index), None)
+        self.saved = False
+        try:
+            self.journal(input_type, index)
+        except sqlite3.Error as e:
+            print(f"⚠️ Autosave failed: {e}")
+
+    def section_value(self, input_type, index):
+        if input_type == 'title':
+            return self.title
+        if input_type == 'tags':
+            return self.tags
+        return {'image': self.images, 'step': self.steps, 'flag': self.flags,
+                'file': self.files, 'raw': self.raw_blocks}[input_type][index]
+
+    def journal(self, input_type, index):
+        """Append the new value of one section to the session journal, compacting it now and then."""
+        if self.store is None:
+            self.store = SessionStore()
+        if self.session_id is None:
+            self.session_id = self.writeup_name or f"unsaved-{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}"
+        if self.journal_count == 0 and not self.store.has_snapshot(self.session_id):
+            self.store.compact(self.session_id, self.state_dict())
+            return
+        self.store.append(self.session_id, {'type': input_type, 'index': index,
+                                            'value': self.section_value(input_type, index)})
+        self.journal_count += 1
+        if self.journal_count >= JOURNAL_COMPACT_EVERY:
+            self.store.compact(self.session_id, self.state_dict())
+            self.journal_count = 0
+
+    def replay(self, record):
+        """Apply one journal record written by journal()."""
+        input_type, index, value = record['type'], record['index'], record['value']
+        if input_type == 'title':
+            self.title = value
+            self.sections['title'] = True
+        elif input_type == 'tags':
+            # Tags are rendered with the title and have no section of their own
+            self.tags = value
+            self.fragments.pop(('title', None), None)
+            return
+        else:
+            items = {'image': self.images, 'step': self.steps, 'flag': self.flags,
+                     'file': self.files, 'raw': self.raw_blocks}[input_type]
+            if input_type in ('image', 'file'):
+                value = tuple(value)
+            elif input_type == 'step':
+                value = (value[0], value[1], value[2], tuple(value[3]) if value[3] else None)
+            if index < len(items):
+                items[index] = value
+            else:
+                items.append(value)
+            if input_type == 'image':
+                self.sections['image'] = True
+            elif input_type == 'step':
+                self.sections['description'] = True
+        if (input_type, index) not in self.input_order:
+            self.input_order.append((input_type, index))
+        self.fragments.pop((input_type, index), None)
+
+    def restore_session(self, session_id, newer_than=None):
+        """Rebuild the session from its snapshot and journal. Returns the number of replayed changes or None.
+
+        Nothing is restored when the stored session is older than newer_than, e.g. a
+        saved file that was edited by hand afterwards.
+        """
+        if self.store is None:
+            self.store = SessionStore()
+        stored = self.store.load(session_id)
+        if stored is None:
+            return None
+        state, records, last_change = stored
+        if newer_than is not None and last_change < newer_than:
+            self.store.delete(session_id)
+            return None
+        self.apply_state(state)
+        for record in records:
+            self.replay(record)
+        self.session_id = session_id
+        self.journal_count = len(records)
+        return len(records)
+
+    def discard_session(self):
+        """Forget the autosaved changes of this session, e.g. when quitting without saving."""
+        if self.session_id:
+            try:
+                (self.store or SessionStore()).delete(self.session_id)
+            except sqlite3.Error:
+                pass
+
+    def show_menu(self):
+        print("\n" + "=" * 40)
+        print("WRITEUP GENERATOR")
+        print("=" * 40)
+
+        # Display current inputs in order
+        if self.input_order:
+            print("\nCurrent Writeup:")
+            for input_type, index in self.input_order:
+                if input_type == 'title':
+                    print(f"Title: {self.title}")
+                elif input_type == 'image':
+                    image_name, _ = self.images[index]
+                    print(f"Image: {image_name}")
+                elif input_type == 'step':
+                    subtitle, _, _, _ = self.steps[index]
+                    print(f"Description: {subtitle}")
+                elif input_type == 'flag':
+                    flag = self.flags[index]
+                    print(f"Flag: {flag[:4]}****")
+                elif input_type == 'file':
+                    file_name, _ = self.files[index]
+                    print(f"File: {file_name}")
+                elif input_type == 'raw':
+                    print(f"Imported: {self.raw_blocks[index].strip().splitlines()[0][:60]}")
+
+        options = [
+            ("1", "Add Title"),
+            ("2", "Add Image"),  # Changed from "Add Machine Image" for brevity
+            ("3", "Add Description with Subtitle, One-liner, and/or Image"),
+            ("4", "Add Flag"),
+            ("5", "Add File"),
+            ("6", "Edit Steps"),
+            ("7", "Set Tags"),
+            ("S", "Save Current Writeup"),
+            ("L", "Load Writeup"),
+            ("F", "Finish and Generate Writeup"),
+            ("Q", "Quit without Saving")
+        ]
+        print("\nOptions:")
+        for opt, label in options:
+            print(f"  {opt}. {label}")
+        return input("\nSelect an option: ")
+
+    def add_title(self):
+        try:
+            new_title = input("\nEnter the machine title: ").strip()
+            if new_title:
+                if not any(item[0] == 'title' for item in self.input_order):
+                    self.input_order.append(('title', None))
+                self.title = new_title
+                self.sections['title'] = True
+                self.mark_changed('title')
+                print("✅ Title updated.")
+            else:
+                print("❌ Title cannot be empty.")
+        except KeyboardInterrupt:
+            print("\nCancelled title input, returning to menu...")
+            return
+
+    def set_tags(self):
+        try:
+            print(f"\nCurrent tags: {', '.join(self.tags) or '(none)'}")
+            tags = input("Enter tags separated by commas (empty to clear): ")
+            self.tags = list(dict.fromkeys(tag.strip().lower() for tag in tags.split(",") if tag.strip()))
+            self.fragments.pop(('title', None), None)
+            self.mark_changed('tags')
+            print("✅ Tags updated.")
+        except KeyboardInterrupt:
+            print("\nCancelled tags input, returning to menu...")
+            return
+
+    def add_machine_image(self):
+        try:
+            image_name = input("\nEnter a unique name for the image: ").strip()
+            while not image_name or any(name == image_name for name, _ in self.images):
+                print("Image name already exists or is invalid. Choose another.")
+                image_name = input("Enter a unique name for the image: ").strip()
+
+            setup_tab_completion()
+            image_path = input(f"Enter the path to the image '{image_name}' (use Tab for completion): ").strip()
+            image_path = os.path.expanduser(image_path)
+            if os.path.isfile(image_path):
+                self.images.append((image_name, image_path))
+                self.input_order.append(('image', len(self.images) - 1))
+                self.sections['image'] = True
+                self.mark_changed('image', len(self.images) - 1)
+                print(f"✅ Image '{image_name}' added.")
+            else:
+                print("❌ File not found.")
+        except KeyboardInterrupt:
+            print("\nCancelled image input, returning to menu...")
+            return
+
+    def process_references(self, lines, interactive=True):
+        """Link every bare [word] in lines, taking known URLs from the saved references.
+
+        Unknown words are asked for once per block when interactive, and left as
+        plain text otherwise. Returns the new lines.
+        """
+        words = {}
+        for line in lines:
+            for match in REFERENCE.finditer(line):
+                words.setdefault(match.group(1).lower(), match.group(1))
+        if not words:
+            return lines
+
+        try:
+            if self.store is None:
+                self.store = SessionStore()
+            # Interactive linking counts every use when it saves the new URLs below
+            urls = self.store.reference_urls(words) if interactive else self.store.use_references(words)
+        except sqlite3.Error as e:
+            print(f"⚠️ Could not read the saved references: {e}")
+            urls = {}
+        if interactive:
+            if urls:
+                print(f"🔗 Linked saved references: {', '.join(words[word] for word in urls)}")
+            unknown = [word for word in words if word not in urls]
+            if unknown:
+                print("\nEnter URLs for references (leave empty to keep plain text):")
+            for word in unknown:
+                try:
+                    url = input(f"URL for '{words[word]}': ").strip()
+                except KeyboardInterrupt:
+                    print("\nCancelled URL input, leaving the remaining references as plain text...")
+                    break
+                if url:
+                    urls[word] = url
+            try:
+                self.store.remember_references(urls)
+            except sqlite3.Error as e:
+                print(f"⚠️ Could not save the references: {e}")
+
+        def link(match):
+            url = urls.get(match.group(1).lower())
+            return f"[{match.group(1)}]({url})" if url else match.group(0)
+
+        return [REFERENCE.sub(link, line) for line in lines]
+
+    def link_references(self):
+        """Fill bare [word] references in every step from the saved references, without asking."""
+        for index, (subtitle, description, oneliner, image_info) in enumerate(self.steps):
+            linked = self.process_references(description, interactive=False)
+            if linked != description:
+                self.steps[index] = (subtitle, linked, oneliner, image_info)
+                self.fragments.pop(('step', index), None)
+
+    def add_description(self):
+        try:
+            subtitle = input("\nEnter the subtitle for this section: ").strip()
+            print("\nEnter the description (type 'END' on a new line to finish):")
+            description = []
+            while True:
+                try:
+                    line = input()
+                    if line.strip().upper() == 'END':
+                        break
+                    description.append(line)
+                except KeyboardInterrupt:
+                    print("\nCancelled description input, saving current content...")
+                    break
+            description = self.process_references(description)
+
+            add_oneliner = input("Add a one-liner? (y/n): ").lower()
+            oneliner = None
+            if add_oneliner == 'y':
+                try:
+                    oneliner = input("Enter the one-liner (terminal style): ")
+                except KeyboardInterrupt:
+                    print("\nCancelled one-liner input, proceeding without...")
+                    oneliner = None
+
+            add_image = input("Add an image? (y/n): ").lower()
+            image_name = None
+            image_path = None
+            if add_image == 'y':
+                setup_tab_completion()
+                while True:
+                    try:
+                        image_path = input("Enter the path to the image (use Tab for completion): ").strip()
+                        image_path = os.path.expanduser(image_path)
+                        if os.path.isfile(image_path):
+                            image_name = input("Enter a name for the image (e.g., 'scan_results'): ")
+                            break
+                        else:
+                            print("❌ File not found. Please check the path.")
+                    except KeyboardInterrupt:
+                        print("\nCancelled image input, proceeding without...")
+                        break
+
+            self.steps.append((subtitle, description, oneliner, (image_name, image_path) if image_name else None))
+            self.input_order.append(('step', len(self.steps) - 1))
+            self.sections['description'] = True
+            self.mark_changed('step', len(self.steps) - 1)
+        except KeyboardInterrupt:
+            print("\nReturning to main menu...")
+            return
+
+    def add_flag(self):
+        try:
+            real_flag = input("\nEnter the flag: ").strip()
+            if not real_flag:
+                print("❌ Flag cannot be empty.")
+                return
+
+            self.flags.append(real_flag)
+            self.input_order.append(('flag', len(self.flags) - 1))
+            self.mark_changed('flag', len(self.flags) - 1)
+            print("✅ Flag added successfully.")
+        except KeyboardInterrupt:
+            print("\nCancelled flag input, returning to menu...")
+            return
+
+    def add_file(self):
+        try:
+            file_name = input("\nEnter a unique name for the file: ").strip()
+            while not file_name or any(name == file_name for name, _ in self.files):
+                print("File name already exists or is invalid. Choose another.")
+                file_name = input("Enter a unique name for the file: ").strip()
+
+            setup_tab_completion()
+            file_path = input(f"Enter the path to the file '{file_name}' (use Tab for completion): ").strip()
+            file_path = os.path.expanduser(file_path)
+            if os.path.isfile(file_path):
+                if is_large_file(file_path):
+                    print(f"📦 {format_size(os.path.getsize(file_path))} is over the "
+                          f"{format_size(LARGE_FILE_THRESHOLD)} limit: it will be published as "
+                          f"'{file_name}{POINTER_SUFFIX}' and kept in {CHUNKS_PATH}.")
+                self.files.append((file_name, file_path))
+                self.input_order.append(('file', len(self.files) - 1))
+                self.mark_changed('file', len(self.files) - 1)
+                print(f"✅ File '{file_name}' added.")
+            else:
+                print("❌ File not found.")
+        except KeyboardInterrupt:
+            print("\nCancelled file input, returning to menu...")
+            return
+
+    def edit_steps(self):
+        if not self.input_order:
+            print("No steps to edit.")
+            return
+
+        while True:
+            try:
+                print("\nEdit Steps:")
+                print("=" * 40)
+                options = []
+                for i, (input_type, index) in enumerate(self.input_order, 1):
+                    if input_type == 'title':
+                        label = f"Edit Title: {self.title}"
+                    elif input_type == 'image':
+                        image_name, image_path = self.images[index]
+                        label = f"Edit Image: {image_name} ({image_path})"
+                    elif input_type == 'step':
+                        subtitle, _, _, _ = self.steps[index]
+                        label = f"Edit Description: {subtitle}"
+                    elif input_type == 'flag':
+                        flag = self.flags[index]
+                        label = f"Edit Flag: {flag[:4]}****"
+                    elif input_type == 'file':
+                        file_name, file_path = self.files[index]
+                        label = f"Edit File: {file_name} ({file_path})"
+                    elif input_type == 'raw':
+                        label = f"Edit Imported Content: {self.raw_blocks[index].strip().splitlines()[0][:60]}"
+                    options.append((str(i), label))
+
+                options.append(("b", "Go back"))
+
+                print("\nAvailable Options:")
+                for opt, label in options:
+                    print(f"{opt:>3}. {label}")
+
+                choice = input("\nSelect an option: ").lower()
+                if choice == 'b':
+                    break
+
+                if choice.isdigit():
+                    choice = int(choice) - 1
+                    if 0 <= choice < len(self.input_order):
+                        input_type, index = self.input_order[choice]
+                        if input_type == 'title':
+                            self.add_title()
+                        elif input_type == 'image':
+                            self.edit_image(index)
+                        elif input_type == 'step':
+                            self.edit_description(index)
+                        elif input_type == 'flag':
+                            self.edit_flag(index)
+                        elif input_type == 'file':
+                            self.edit_file(index)
+                        elif input_type == 'raw':
+                            self.edit_raw_block(index)
+                    else:
+                        print("❌ Invalid option. Try again.")
+                else:
+                    print("❌ Invalid option. Try again.")
+            except KeyboardInterrupt:
+                print("\nReturning to main menu...")
+                break
+
+    def edit_image(self, index):
+        image_name, image_path = self.images[index]
+        print(f"\nEditing Image: {image_name} ({image_path})")
+        try:
+            new_path = input("Enter new image path (or press Enter to keep current): ").strip()
+            if new_path and os.path.isfile(os.path.expanduser(new_path)):
+                self.images[index] = (image_name, os.path.expanduser(new_path))
+                self.mark_changed('image', index)
+                print("✅ Image updated.")
+            elif new_path:
+                print("❌ File not found.")
+        except KeyboardInterrupt:
+            print("\nCancelled image edit, returning...")
+            return
+
+    def edit_flag(self, index):
+        current_flag = self.flags[index]
+        print(f"\nEditing Flag: {current_flag}")
+        try:
+            new_flag = input("Enter new flag (or press Enter to keep current): ").strip()
+            if new_flag:
+                self.flags[index] = new_flag
+                self.mark_changed('flag', index)
+                print("✅ Flag updated.")
+        except KeyboardInterrupt:
+            print("\nCancelled flag edit, returning...")
+            return
+
+    def edit_file(self, index):
+        file_name, file_path = self.files[index]
+        print(f"\nEditing File: {file_name} ({file_path})")
+        try:
+            new_name = input("Enter new file name (or press Enter to keep current): ").strip()
+            new_path = input("Enter new file path (or press Enter to keep current): ").strip()
+            if new_path and not os.path.isfile(os.path.expanduser(new_path)):
+                print("❌ File not found.")
+                return
+            if new_name or new_path:
+                self.files[index] = (
+                    new_name if new_name else file_name,
+                    os.path.expanduser(new_path) if new_path else file_path
+                )
+                self.mark_changed('file', index)
+                print("✅ File updated.")
+        except KeyboardInterrupt:
+            print("\nCancelled file edit, returning...")
+            return
+
+    def edit_raw_block(self, index):
+        print(f"\nCurrent imported content:\n{self.raw_blocks[index]}")
+        print("\nEnter new content (type 'END' on a new line to finish):")
+        new_content = []
+        try:
+            while True:
+                line = input()
+                if line.strip().upper() == 'END':
+                    break
+                new_content.append(line)
+        except KeyboardInterrupt:
+            print("\nCancelled content edit, returning...")
+            return
+        if new_content:
+            self.raw_blocks[index] = "\n".join(new_content) + "\n\n"
+            self.mark_changed('raw', index)
+            print("✅ Content updated.")
+
+    def edit_description(self, index):
+        while True:
+            # Re-read the step so every edit builds on the previous one
+            subtitle, description, oneliner, image_info = self.steps[index]
+            image_name, image_path = image_info if image_info else (None, None)
+            try:
+                print(f"\nEdit Description: {subtitle}")
+                print("=" * 40)
+                print(f"1. Edit Subtitle: {subtitle}")
+                print(f"2. Edit Description: {' '.join(description[:1])}...")
+                print(f"3. Edit Oneliner: {oneliner if oneliner else 'None'}")
+                print(f"4. Edit Image: {image_name if image_name else 'None'} ({image_path if image_path else 'No path'})")
+                print("b. Go back")
+
+                choice = input("\nSelect what to edit: ").lower()
+                if choice == 'b':
+                    break
+
+                if choice == '1':
+                    new_subtitle = input(f"New subtitle (current: '{subtitle}'): ").strip()
+                    if new_subtitle:
+                        self.steps[index] = (new_subtitle, description, oneliner, image_info)
+                        self.mark_changed('step', index)
+                        print("✅ Subtitle updated.")
+
+                elif choice == '2':
+                    print(f"\nCurrent description:\n{' '.join(description)}")
+                    print("\nEnter new description (type 'END' on a new line to finish):")
+                    new_description = []
+                    while True:
+                        try:
+                            line = input()
+                            if line.strip().upper() == 'END':
+                                break
+                            new_description.append(line)
+                        except KeyboardInterrupt:
+                            print("\nCancelled description edit, saving current...")
+                            break
+                    if new_description:
+                        new_description = self.process_references(new_description)
+                        self.steps[index] = (subtitle, new_description, oneliner, image_info)
+                        self.mark_changed('step', index)
+                        print("✅ Description updated.")
+
+                elif choice == '3':
+                    new_oneliner = input(f"New one-liner (current: '{oneliner if oneliner else 'None'}'): ").strip()
+                    if new_oneliner:
+                        self.steps[index] = (subtitle, description, new_oneliner, image_info)
+                        self.mark_changed('step', index)
+                        print("✅ Oneliner updated.")
+                    elif new_oneliner == "":
+                        self.steps[index] = (subtitle, description, None, image_info)
+                        self.mark_changed('step', index)
+                        print("✅ Oneliner removed.")
+
+                elif choice == '4':
+                    current_image_path = image_path if image_path else "None"
+                    print(f"Current image: {current_image_path}")
+                    new_image_path = input("Enter new image path (Tab for completion, Enter to keep current): ").strip()
+                    if new_image_path and os.path.isfile(os.path.expanduser(new_image_path)):
+                        new_image_name = input("Enter new image name (or press Enter to keep current): ").strip() or image_name or "default_image"
+                        self.steps[index] = (subtitle, description, oneliner, (new_image_name, os.path.expanduser(new_image_path)))
+                        self.mark_changed('step', index)
+                        print("✅ Image updated.")
+                    elif new_image_path:
+                        print("❌ Invalid image path")
+            except KeyboardInterrupt:
+                print("\nReturning to edit menu...")
+                break
+
+    def load_readme(self):
+        while True:
+            try:
+                print("\nLoad Writeup Options:")
+                print("=" * 40)
+                print("1. Load from ~/writeups/")
+                print("2. Load from any system path")
+                print("b. Go back")
+                choice = input("\nSelect an option: ").lower()
+
+                if choice == 'b':
+                    return False
+
+                if choice not in ['1', '2']:
+                    print("❌ Invalid option. Try again.")
+                    continue
+
+                setup_tab_completion()
+                if choice == '1':
+                    subfolders = [f for f in os.listdir(WRITEUPS_PATH) if os.path.isdir(os.path.join(WRITEUPS_PATH, f))]
+                    if subfolders:
+                        print("\nAvailable folders in ~/writeups/:")
+                        for i, folder in enumerate(subfolders, 1):
+                            print(f"{i}. {folder}")
+                        selection = input("\nSelect a folder by number: ")
+                        try:
+                            index = int(selection) - 1
+                            if 0 <= index < len(subfolders):
+                                full_path = os.path.join(WRITEUPS_PATH, subfolders[index])
+                            else:
+                                print("❌ Invalid selection. Try again.")
+                                continue
+                        except ValueError:
+                            print("❌ Invalid input. Please enter a number.")
+                            continue
+                    else:
+                        full_path = WRITEUPS_PATH
+                        print(f"❌ No subfolders found in {WRITEUPS_PATH}")
+                        create = input(f"Would you like to create a new writeup in {WRITEUPS_PATH}? (y/n): ").lower()
+                        if create == 'y':
+                            self.import_readme([], full_path)
+                            readme_path = os.path.join(full_path, "README.md")
+                            with open(readme_path, 'w') as f:
+                                f.write(self.markdown)
+                            self.saved = True
+                            print(f"✅ Created README.md in {full_path}. Returning to main menu.")
+                            return True
+                        else:
+                            print("Returning to load menu...")
+                            continue
+                else:
+                    full_path = input("Enter the full folder path (use Tab for completion): ").strip()
+                    full_path = os.path.expanduser(full_path)
+
+                if not os.path.isdir(full_path):
+                    print("❌ Folder does not exist.")
+                    continue
+
+                readme_path = os.path.join(full_path, "README.md")
+                if os.path.isfile(readme_path):
+                    with open(readme_path, 'r') as f:
+                        self.import_readme(f, full_path)
+                    self.saved = True
+                    print(f"✅ Loaded README.md from {full_path}")
+                    return True
+                else:
+                    print(f"❌ No README.md found in {full_path}")
+                    create = input("Would you like to create a new README.md in this folder? (y/n): ").lower()
+                    if create == 'y':
+                        self.import_readme([], full_path)
+                        with open(readme_path, 'w') as f:
+                            f.write(self.markdown)
+                        self.saved = True
+                        print(f"✅ Created README.md in {full_path}. Returning to main menu.")
+                        return True
+                    else:
+                        print("Returning to load menu...")
+            except KeyboardInterrupt:
+                print("\nReturning to main menu...")
+                return False
+
+    def import_readme(self, lines, folder):
+        """Start a new writeup from the lines of a README, named after its folder."""
+        state = parse_readme(lines, folder)
+        state['title'] = os.path.basename(os.path.normpath(folder))
+        if ('title', None) not in state['input_order']:
+            state['input_order'].insert(0, ('title', None))
+        state['sections']['title'] = True
+        self.apply_state({**state, 'repo_path': self.repo_path})
+
+    def apply_state(self, state):
+        """Populate the generator from a state dict as written by save_state."""
+        self.repo_path = state.get('repo_path', self.repo_path)
+        self.images = [(img[0], img[1]) for img in state.get('images', [])]
+        self.title = state.get('title', "")
+        self.steps = [(s, d, o, tuple(i) if i else None) for s, d, o, i in state.get('steps', [])]
+        self.flags = state.get('flags', [])
+        self.files = [(f[0], f[1]) for f in state.get('files', [])]
+        self.input_order = [tuple(item) for item in state.get('input_order', [])]
+        self.sections = state.get('sections', {
+            'title': bool(self.title),
+            'image': bool(self.images),
+            'description': bool(self.steps)
+        })
+        self.raw_blocks = state.get('raw_blocks', [])
+        self.tags = state.get('tags', [])
+        self.imported_from = state.get('imported_from')
+        if 'raw_blocks' not in state and self.input_order == [('title', None)] and state.get('markdown'):
+            # Sessions saved from a loaded README before the sections were stored separately
+            parsed = parse_readme(io.StringIO(state['markdown']), os.path.join(WRITEUPS_PATH, self.title))
+            self.images, self.steps, self.flags = parsed['images'], parsed['steps'], parsed['flags']
+            self.raw_blocks = parsed['raw_blocks']
+            self.input_order = [('title', None)] + [item for item in parsed['input_order'] if item[0] != 'title']
+            self.sections.update(image=bool(self.images), description=bool(self.steps))
+        self.fragments = {}
+        self.writeup_name = state.get('writeup_name')
+        # A different writeup starts a new autosave session
+        self.session_id = None
+        self.journal_count = 0
+
+    def load_state(self, file_path):
+        """Load the state from a saved .json file, plus any changes autosaved after it."""
+        try:
+            with open(file_path, 'r') as f:
+                state = json.load(f)
+
+            self.apply_state(state)
+            self.writeup_name = self.writeup_name or os.path.splitext(os.path.basename(file_path))[0]
+            self.session_id = self.writeup_name
+            self.journal_count = 0
+            self.saved = True
+            try:
+                restored = self.restore_session(self.writeup_name, newer_than=os.path.getmtime(file_path))
+            except sqlite3.Error as e:
+                print(f"⚠️ Could not read autosaved changes: {e}")
+                restored = None
+            if restored:
+                self.saved = False
+                print(f"♻️ Restored {restored} autosaved change(s) made after the last save.")
+
+            print(f"✅ Loaded writeup '{self.writeup_name}' from {file_path}")
+            return True
+        except Exception as e:
+            print(f"❌ Error loading writeup from {file_path}: {e}")
+            return False
+
+    def generate_writeup(self):
+        required_missing = [k for k, v in self.sections.items() if not v]
+        if required_missing:
+            print(f"\n⚠️ Missing required sections: {', '.join(required_missing)}")
+            return None
+
+        with trace_span("render") as span:
+            readme_text = self.markdown + FOOTER_MARKDOWN
+            span['bytes'] = len(readme_text)
+
+        # Save locally in title folder structure
+        writeups_folder = ensure_writeups_folder()
+        title_folder = os.path.join(writeups_folder, self.title)
+        file_path = os.path.join(title_folder, "README.md")
+        try:
+            changed, manifest = self.export_writeup(title_folder, readme_text)
+        except OSError as e:
+            print(f"\n❌ Export failed, {title_folder} was left untouched: {e}")
+            return None
+        save_manifest(manifest)
+        if "README.md" in changed:
+            try:
+                with trace_span("search index"):
+                    update_search_index(title_folder)
+            except sqlite3.Error as e:
+                print(f"⚠️ Could not update the search index: {e}")
+
+        self.saved = True
+        if changed:
+            print(f"\n✅ Writeup generated successfully: {file_path} ({len(changed)} updated)")
+        else:
+            print(f"\n✅ Writeup is up to date: {file_path}")
+        return file_path
+
+    def asset_plan(self):
+        """List (source path, path relative to the writeup folder, image width or None) for every asset."""
+        plan = [(image_path, os.path.join("img", f"{image_name}.{IMAGE_FORMAT}"), MACHINE_IMAGE_WIDTH)
+                for image_name, image_path in self.images]
+        plan += [(info[1], os.path.join("img", f"{info[0]}.{IMAGE_FORMAT}"), STEP_IMAGE_WIDTH)
+                 for _, _, _, info in self.steps if info]
+        plan += [(source_path, file_name + POINTER_SUFFIX if is_large_file(source_path) else file_name, None)
+                 for file_name, source_path in self.files]
+        return plan
+
+    def export_writeup(self, folder, readme_text, jobs=EXPORT_WORKERS, check=None, link=True):
+        """Write README.md and every asset into folder, skipping what the manifest shows unchanged.
+
+        All sources are checked before anything is written. Images are converted on a
+        process pool, then changed assets are linked into a staging folder on a thread
+        pool and the result replaces folder with a rename, so a failed export leaves the
+        previous folder untouched. Returns the relative paths that were written and the
+        updated manifest, which the caller saves once the export is final.
+
+        When something changed, check is called with (relative path, content hash, path)
+        for every file of the new folder before it replaces the old one. If it returns
+        False nothing is written and the relative paths are None.
+
+        Assets are hardlinked to the object store unless link is False, as for a git
+        work tree where files get edited; those get a reflink or a copy of their own.
+        """
+        with trace_span("export", folder=folder) as span:
+            changed, manifest, progress = self._export_writeup(folder, readme_text, jobs, check, link)
+            span['files'] = len(changed or [])
+            span['bytes'] = progress.done_bytes
+            span['checked'] = progress.done_files
+        return changed, manifest
+
+    def _export_writeup(self, folder, readme_text, jobs, check, link):
+        # Later entries win when two assets share a destination, as with the old sequential copy
+        plan = list({item[1]: item for item in self.asset_plan()}.values())
+        missing = [source_path for source_path, _, _ in plan if not os.path.isfile(source_path)]
+        if missing:
+            raise FileNotFoundError(f"Missing source files: {', '.join(missing)}")
+
+        previous = load_manifest(folder)
+        manifest = {'folder': previous['folder'], 'readme': None, 'assets': {}}
+        readme_bytes = readme_text.encode()
+        manifest['readme'] = hashlib.sha256(readme_bytes).hexdigest()
+        readme_changed = previous['readme'] != manifest['readme'] or not os.path.isfile(os.path.join(folder, "README.md"))
+
+        def unchanged_entry(item):
+            source_path, relative_path, width = item
+            entry = previous['assets'].get(relative_path)
+            if entry is None or entry.get('width') != width:
+                return None
+            dest_path = os.path.join(folder, relative_path)
+            if not os.path.isfile(dest_path) or os.path.getsize(dest_path) != entry['output_size']:
+                return None
+            # Hardlinked by an earlier version; replaced with a copy of its own
+            stored = object_path(entry['hash'])
+            if not link and os.path.exists(stored) and os.path.samefile(dest_path, stored):
+                return None
+            st = os.stat(source_path)
+            if entry['source'] == os.path.abspath(source_path) and entry['size'] == st.st_size \
+                    and entry['mtime'] == st.st_mtime_ns:
+                return entry
+            return None
+
+        pending = []
+        for item in plan:
+            entry = unchanged_entry(item)
+            if entry:
+                manifest['assets'][item[1]] = entry
+            else:
+                pending.append(item)
+        images = transcode_images({(source_path, width) for source_path, _, width in pending if width}, jobs)
+
+        staging = create_staging_folder(folder)
+        progress = ExportProgress(len(pending))
+
+        def export_asset(item):
+            # Images go to img/ and attachments to the folder root, all linked from the object store
+            source_path, relative_path, width = item
+            entry, mode = store_asset(source_path, relative_path, width, images)
+            previous_entry = previous['assets'].get(relative_path)
+            dest_path = os.path.join(folder, relative_path)
+            changed = not (previous_entry is not None and previous_entry['hash'] == entry['hash']
+                           and os.path.isfile(dest_path) and os.path.getsize(dest_path) == entry['output_size']
+                           and (link or not os.path.samefile(dest_path, object_path(entry['hash']))))
+            if changed:
+                materialize_object(entry['hash'], os.path.join(staging, relative_path), mode, link)
+            progress.advance(entry['output_size'] if changed else 0)
+            return relative_path, entry, changed
+
+        from concurrent.futures import ThreadPoolExecutor
+        try:
+            with ThreadPoolExecutor(max_workers=jobs) as executor:
+                results = list(executor.map(export_asset, pending))
+            changed = ["README.md"] if readme_changed else []
+            for relative_path, entry, asset_changed in results:
+                manifest['assets'][relative_path] = entry
+                if asset_changed:
+                    changed.append(relative_path)
+            if pending:
+                progress.finish(len(changed) - readme_changed)
+
+            if changed:
+                if readme_changed:
+                    with open(os.path.join(staging, "README.md"), 'wb') as f:
+                        f.write(readme_bytes)
+                if check is not None:
+                    files = [("README.md", manifest['readme'], os.path.join(staging if readme_changed else folder, "README.md"))]
+                    for relative_path, entry in manifest['assets'].items():
+                        path = object_path(entry['hash'])
+                        files.append((relative_path, entry['hash'],
+                                      path if os.path.exists(path) else os.path.join(folder, relative_path)))
+                    if not check(files):
+                        return None, manifest, progress
+                carry_over_files(folder, staging)
+                swap_folder(staging, folder)
+        finally:
+            shutil.rmtree(staging, ignore_errors=True)
+        return changed, manifest, progress
+
+    def upload_to_github(self, file_path, target_folder):
+        """Export the writeup into target_folder and commit it. Returns True once it is committed, or already was."""
+        import subprocess
+        # The token is only needed to publish, so it is read (or asked for) here rather than at startup
+        token = get_github_token()
+        # Use self.title for the folder name, save as README.md
+        machine_folder = os.path.join(target_folder, self.title)
+        with open(file_path, 'r') as f:
+            readme_text = f.read()
+        # Same objects as the local copy, reflinked or copied since the work tree gets edited. The leak scan runs on
+        # the new content before it replaces the folder, so a blocked publish leaves nothing behind in the checkout
+        try:
+            changed, manifest = self.export_writeup(machine_folder, readme_text, link=False,
+                                                    check=lambda files: self.check_leaks(files, token))
+        except OSError as e:
+            print(f"❌ Export failed, {machine_folder} was left untouched: {e}")
+            return False
+        if changed is None:
+            return False
+        if not changed:
+            print(f"\n✅ Writeup '{self.title}' is unchanged since the last upload, nothing to commit.")
+            return True
+        # Stage exactly what the export produced instead of scanning the whole repository
+        paths = [os.path.join(self.title, "README.md")] + [os.path.join(self.title, p) for p in manifest['assets']]
+        timings = []
+        try:
+            run_git(["add", "--", *paths], target_folder, timings)
+            staged = run_git(["diff", "--cached", "--quiet", "--", *paths], target_folder, timings, check=False)
+            if staged.returncode == 0:
+                save_manifest(manifest)
+                print(f"\n✅ Writeup '{self.title}' matches the last commit, nothing to commit.")
+                return True
+            run_git(["commit", "-m", f"Add writeup: {self.title}", "--", *paths], target_folder, timings)
+            # Only remember this export once it is committed, so a failed run is retried next time
+            save_manifest(manifest)
+            if self.writeup_name:
+                try:
+                    (self.store or SessionStore()).catalog_mark_published(self.writeup_name)
+                except sqlite3.Error:
+                    pass
+            # The push runs in a background worker so the session is not blocked on the network
+            with trace_span("enqueue push"):
+                enqueue_push(target_folder, self.title)
+            print(f"\n✅ Writeup, images, and files committed in folder: {self.title}")
+            print("📤 Push queued in the background. Check it with: python repwritter.py status")
+            return True
+        except subprocess.CalledProcessError as e:
+            print(f"❌ Error executing Git commands: {e}")
+            return False
+        finally:
+            print_git_timings(timings)
+
+    def check_leaks(self, files, token):
+        """Scan the files of an export for the writeup's flags, the GitHub token and secret patterns.
+
+        Returns True when the commit can go ahead. Flags and the token always block it,
+        generic patterns such as a private key found on the target ask first.
+        """
+        literals = leak_literals(self.flags, token)
+        with trace_span("leak scan", files=len(files)) as span:
+            hits, span['bytes'] = scan_for_leaks(files, literals)
+        return not hits or confirm_leaks([(os.path.join(self.title, path), *hit) for path, *hit in hits])
+
+    def save_state(self):
+        if not self.writeup_name:
+            self.writeup_name = input("Enter a name for this writeup: ").strip()
+            while not self.writeup_name or os.path.exists(os.path.join(SAVED_WRITEUPS_PATH, f"{self.writeup_name}.json")):
+                print("Name already exists or is invalid. Choose another.")
+                self.writeup_name = input("Enter a name for this writeup: ").strip()
+        state = self.state_dict()
+        save_file = os.path.join(SAVED_WRITEUPS_PATH, f"{self.writeup_name}.json")
+        tmp_path = f"{save_file}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, save_file)
+        # The saved file now holds everything, so the journal collapses into a fresh snapshot
+        try:
+            if self.store is None:
+                self.store = SessionStore()
+            if self.session_id and self.session_id != self.writeup_name:
+                self.store.rename(self.session_id, self.writeup_name)
+            self.session_id = self.writeup_name
+            self.store.compact(self.session_id, state)
+            self.journal_count = 0
+            self.store.catalog_update(self.writeup_name, state, os.stat(save_file))
+        except sqlite3.Error as e:
+            print(f"⚠️ Could not compact the autosave journal: {e}")
+        self.saved = True
+        print(f"Writeup saved to {save_file}")
+
+    def state_dict(self):
+        return {
+            'repo_path': self.repo_path,
+            'markdown': self.markdown,
+            'sections': self.sections,
+            'images': self.images,
+            'title': self.title,
+            'steps': self.steps,
+            'flags': self.flags,
+            'files': self.files,
+            'input_order': self.input_order,
+            'raw_blocks': self.raw_blocks,
+            'tags': self.tags,
+            'imported_from': self.imported_from,
+            'writeup_name': self.writeup_name
+        }
@@ -0,0 +1,156 @@
+"""Large attachments kept out of git: the chunk store, pointer files and hydrate."""
+import hashlib
+import json
+import os
+import re
+import threading
+
+from .config import CHUNKS_PATH, format_size
+from .store import file_digest, object_path, store_bytes, store_object, _digest_cache
+from .tracing import run_git
+
+# Attachments above this size are chunked into CHUNKS_PATH and published as a pointer file
+LARGE_FILE_THRESHOLD = int(float(os.environ.get("REPWRITTER_LARGE_FILE_MB", "20")) * 1024 * 1024)
+LARGE_FILE_CHUNK_SIZE = 4 * 1024 * 1024
+POINTER_SUFFIX = ".pointer.json"
+
+def is_large_file(path):
+    """Whether an attachment is big enough to be kept out of git behind a pointer file."""
+    try:
+        return os.path.getsize(path) > LARGE_FILE_THRESHOLD
+    except OSError:
+        return False
+
+def chunk_path(digest):
+    return os.path.join(CHUNKS_PATH, digest[:2], digest[2:])
+
+def store_large_file(source_path, name):
+    """Stream a file into the chunk store and return the pointer for it, published as name, as a dict.
+
+    The whole-file sha256 is computed while copying, and the file must not change
+    in the meantime, so the pointer always describes the chunks that were stored.
+    """
+    before = os.stat(source_path)
+    digest = hashlib.sha256()
+    chunks = []
+    with open(source_path, 'rb') as f:
+        for data in iter(lambda: f.read(LARGE_FILE_CHUNK_SIZE), b''):
+            digest.update(data)
+            chunk_digest = hashlib.sha256(data).hexdigest()
+            target = chunk_path(chunk_digest)
+            if not os.path.exists(target):
+                os.makedirs(os.path.dirname(target), exist_ok=True)
+                tmp_path = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp_path, 'wb') as chunk_file:
+                    chunk_file.write(data)
+                os.chmod(tmp_path, 0o444)
+                os.replace(tmp_path, target)
+            chunks.append(chunk_digest)
+    after = os.stat(source_path)
+    if (before.st_size, before.st_mtime_ns) != (after.st_size, after.st_mtime_ns):
+        raise OSError(f"{source_path} changed while it was being stored")
+    _digest_cache[(os.path.abspath(source_path), after.st_size, after.st_mtime_ns)] = digest.hexdigest()
+    return {
+        'repwritter_pointer': 1,
+        'name': name,
+        'size': after.st_size,
+        'sha256': digest.hexdigest(),
+        'chunk_size': LARGE_FILE_CHUNK_SIZE,
+        'chunks': chunks
+    }
+
+def store_asset(source_path, relative_path, width, images):
+    """Store one asset of a writeup in the object store the way it is exported.
+
+    Images come from images, which maps (source path, width) to the digest of the
+    transcoded file, and large attachments become pointers. Returns the manifest entry
+    and the mode to materialize the object with (None for images and pointers).
+    """
+    st = os.stat(source_path)
+    is_pointer = not width and relative_path.endswith(POINTER_SUFFIX) and is_large_file(source_path)
+    if width:
+        digest = images[(source_path, width)]
+    elif is_pointer:
+        pointer = store_large_file(source_path, os.path.basename(relative_path[:-len(POINTER_SUFFIX)]))
+        digest = store_bytes(json.dumps(pointer, indent=1).encode())
+    else:
+        digest = store_object(source_path)
+    return {
+        'source': os.path.abspath(source_path),
+        'size': st.st_size,
+        'mtime': st.st_mtime_ns,
+        'width': width,
+        'hash': digest,
+        'output_size': os.path.getsize(object_path(digest))
+    }, None if width or is_pointer else st.st_mode
+
+def hydrate_pointer(pointer_path):
+    """Rebuild the file a pointer describes next to it, checking its hash. Returns the restored path."""
+    with open(pointer_path, 'r') as f:
+        pointer = json.load(f)
+    dest_path = pointer_path[:-len(POINTER_SUFFIX)]
+    if os.path.isfile(dest_path) and os.path.getsize(dest_path) == pointer['size'] \
+            and file_digest(dest_path) == pointer['sha256']:
+        return dest_path
+    missing = [c for c in pointer['chunks'] if not os.path.exists(chunk_path(c))]
+    if missing:
+        raise FileNotFoundError(f"{len(missing)} of {len(pointer['chunks'])} chunks are not in {CHUNKS_PATH}")
+    digest = hashlib.sha256()
+    tmp_path = f"{dest_path}.repwritter-tmp"
+    try:
+        with open(tmp_path, 'wb') as out:
+            for chunk_digest in pointer['chunks']:
+                with open(chunk_path(chunk_digest), 'rb') as f:
+                    data = f.read()
+                digest.update(data)
+                out.write(data)
+        if digest.hexdigest() != pointer['sha256']:
+            raise OSError("hash mismatch, the chunk store is corrupted")
+        os.replace(tmp_path, dest_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.unlink(tmp_path)
+    return dest_path
+
+def exclude_from_git(path):
+    """Add a restored file to its repository's info/exclude so it is never committed by accident."""
+    result = run_git(["rev-parse", "--show-toplevel", "--git-path", "info/exclude"], os.path.dirname(path),
+                     check=False, capture_output=True, text=True)
+    if result.returncode != 0:
+        return
+    toplevel, exclude_path = result.stdout.splitlines()
+    exclude_path = os.path.join(os.path.dirname(path), exclude_path)
+    # Escape glob characters so the pattern matches exactly this file
+    pattern = "/" + re.sub(r"([\\*?\[\]!#])", r"\\\1", os.path.relpath(os.path.realpath(path), toplevel))
+    try:
+        with open(exclude_path, 'r') as f:
+            if pattern in f.read().splitlines():
+                return
+    except FileNotFoundError:
+        os.makedirs(os.path.dirname(exclude_path), exist_ok=True)
+    with open(exclude_path, 'a') as f:
+        f.write(pattern + "\n")
+
+def cmd_hydrate(args):
+    """Restore every large attachment under the given folders from the local chunk store."""
+    pointers = []
+    for path in args.paths:
+        if path.endswith(POINTER_SUFFIX) and os.path.isfile(path):
+            pointers.append(path)
+            continue
+        for root, dirnames, filenames in os.walk(path):
+            dirnames[:] = [d for d in dirnames if d != '.git']
+            pointers.extend(os.path.join(root, name) for name in filenames if name.endswith(POINTER_SUFFIX))
+    if not pointers:
+        print("No pointer files found.")
+        return 0
+    failed = 0
+    for pointer_path in sorted(pointers):
+        try:
+            dest_path = hydrate_pointer(pointer_path)
+            exclude_from_git(dest_path)
+            print(f"✅ {dest_path} ({format_size(os.path.getsize(dest_path))})")
+        except (OSError, ValueError, KeyError) as e:
+            failed += 1
+            print(f"❌ {pointer_path}: {e}")
+    return 1 if failed else 0
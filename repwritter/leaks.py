@@ -0,0 +1,160 @@
+"""Scanning the files about to be published for flags, the GitHub token and secret patterns."""
+import hashlib
+import json
+import os
+import re
+import sqlite3
+
+from .sessions import SessionStore
+
+# Secrets that must never be published, checked together with the writeup's flags before each commit
+LEAK_PATTERNS = [
+    ("GitHub token", rb"gh[pousr]_[A-Za-z0-9]{36,255}"),
+    ("GitHub token", rb"github_pat_[A-Za-z0-9_]{22,255}"),
+    ("AWS access key", rb"AKIA[0-9A-Z]{16}"),
+    ("Slack token", rb"xox[abprs]-[A-Za-z0-9-]{10,255}"),
+    ("private key", rb"-----BEGIN (?:[A-Z]+ )?PRIVATE KEY-----"),
+]
+LEAK_MIN_SECRET = 6  # shorter flags would match by chance
+LEAK_SCAN_CHUNK = 4 * 1024 * 1024
+LEAK_SCAN_OVERLAP = 1024  # longer than any match, so one split across two chunks is still found
+LEAK_SCAN_SEGMENT = 64 * 1024 * 1024  # large files are split into segments scanned in parallel
+LEAK_HITS_SHOWN = 20
+
+def leak_matchers(literals):
+    """Return (label, bytes pattern) pairs for every known secret in literals ({secret: label}) and LEAK_PATTERNS.
+
+    Each pattern starts with a literal, which the regex engine searches for at memchr
+    speed; an alternation of all of them would be checked byte by byte instead.
+    """
+    matchers = [(label, re.escape(secret.encode())) for secret, label in sorted(literals.items())]
+    return tuple(matchers + LEAK_PATTERNS)
+
+_leak_regexes = {}
+
+def scan_segment(path, start, end, matchers):
+    """Scan bytes [start, end) of path, reading LEAK_SCAN_CHUNK at a time with an overlap so no match is split.
+
+    Returns (hits, newlines) where hits are (offset, label, newlines before the hit
+    within the segment, matched bytes) and newlines counts the segment's line breaks.
+    Runs inside a worker process for large files.
+    """
+    regexes = _leak_regexes.get(matchers)
+    if regexes is None:
+        regexes = _leak_regexes[matchers] = [(label, re.compile(pattern)) for label, pattern in matchers]
+    hits, newlines, tail = [], 0, b""
+    reported = set()  # offsets already reported, by an earlier chunk or a more specific pattern
+    with open(path, 'rb') as f:
+        f.seek(start)
+        pos = start  # file offset of the first byte after the tail
+        while pos < end:
+            chunk = f.read(min(LEAK_SCAN_CHUNK, end - pos))
+            if not chunk:
+                break
+            # Past the segment end, read just enough to complete a match that starts inside it
+            extra = f.read(LEAK_SCAN_OVERLAP) if pos + len(chunk) >= end else b""
+            data = tail + chunk + extra
+            for label, regex in regexes:
+                for match in regex.finditer(data):
+                    offset = pos - len(tail) + match.start()
+                    if offset >= end:
+                        break
+                    # Matches that end inside the tail were reported with the previous chunk
+                    if match.end() <= len(tail) or offset in reported:
+                        continue
+                    reported.add(offset)
+                    if match.start() >= len(tail):
+                        line_breaks = newlines + data.count(b"\n", len(tail), match.start())
+                    else:
+                        line_breaks = newlines - data.count(b"\n", match.start(), len(tail))
+                    hits.append((offset, label, line_breaks, match.group()))
+            newlines += chunk.count(b"\n")
+            tail = data[max(0, len(tail) + len(chunk) - LEAK_SCAN_OVERLAP):len(tail) + len(chunk)]
+            pos += len(chunk)
+    return sorted(hits), newlines
+
+def scan_for_leaks(files, literals, jobs=None):
+    """Scan files ((shown path, content hash, path) triples) for the secrets in literals and LEAK_PATTERNS.
+
+    Each content is read once, and contents already found clean for the same secrets
+    are skipped by hash. Large files are split into LEAK_SCAN_SEGMENT pieces that are
+    scanned on a process pool. Returns (hits, bytes scanned), hits being (shown path,
+    line, byte offset, label, preview).
+    """
+    matchers = leak_matchers(literals)
+    fingerprint = hashlib.sha256(json.dumps([[label, pattern.decode('latin-1')] for label, pattern in matchers]).encode()).hexdigest()
+    try:
+        store = SessionStore()
+        clean = store.clean_scans({digest for _, digest, _ in files}, fingerprint)
+    except sqlite3.Error:
+        store, clean = None, set()
+
+    segments = []
+    for relative_path, digest, path in files:
+        if digest in clean:
+            continue
+        clean.add(digest)
+        size = os.path.getsize(path)
+        segments += [(relative_path, digest, path, start, min(start + LEAK_SCAN_SEGMENT, size))
+                     for start in range(0, max(size, 1), LEAK_SCAN_SEGMENT)]
+    scanned = sum(end - start for _, _, _, start, end in segments)
+
+    args = [(path, start, end, matchers) for _, _, path, start, end in segments]
+    if scanned > LEAK_SCAN_SEGMENT:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            results = list(executor.map(scan_segment, *zip(*args)))
+    else:
+        results = [scan_segment(*arg) for arg in args]
+
+    hits, dirty = [], set()
+    lines_before = {}  # line breaks in the earlier segments of each file
+    for (relative_path, digest, _, _, _), (segment_hits, newlines) in zip(segments, results):
+        for offset, label, line_breaks, matched in segment_hits:
+            text = matched.decode(errors='replace')
+            preview = text[:4] + "…" if len(text) > 4 else "…"
+            hits.append((relative_path, lines_before.get(relative_path, 0) + line_breaks + 1, offset, label, preview))
+            dirty.add(digest)
+        lines_before[relative_path] = lines_before.get(relative_path, 0) + newlines
+    if store is not None:
+        try:
+            store.record_clean_scans({digest for _, digest, _, _, _ in segments} - dirty, fingerprint)
+        except sqlite3.Error:
+            pass
+    return hits, scanned
+
+def is_blurred_flag(flag):
+    """True for a flag read back from a README, which only keeps the blurred value flag_markdown writes."""
+    return bool(flag) and flag[len(flag) // 2:] == "*" * (len(flag) - len(flag) // 2)
+
+def leak_literals(flags, token):
+    """The exact secrets to look for: real flags long enough not to match by chance, and the GitHub token.
+
+    Blurred flags are what the README is supposed to show, so they are not secrets.
+    """
+    literals = {flag: "flag" for flag in flags if len(flag) >= LEAK_MIN_SECRET and not is_blurred_flag(flag)}
+    if token and len(token) >= LEAK_MIN_SECRET:
+        literals[token] = "GitHub token from ~/.Gitenv"
+    return literals
+
+def confirm_leaks(hits):
+    """Show the hits of a leak scan and decide whether the commit can go ahead.
+
+    Flags and the token always block it, generic patterns such as a private key found
+    on the target ask first.
+    """
+    print(f"\n🚫 Found {len(hits)} possible secret(s) in the files about to be committed:")
+    for path, line, offset, label, preview in hits[:LEAK_HITS_SHOWN]:
+        print(f"   {path}:{line} (byte {offset}): {label} {preview}")
+    if len(hits) > LEAK_HITS_SHOWN:
+        print(f"   ... and {len(hits) - LEAK_HITS_SHOWN} more")
+    if any(label in ("flag", "GitHub token from ~/.Gitenv") for _, _, _, label, _ in hits):
+        print("❌ Publish blocked, nothing was committed. Remove the flag or token and finish again.")
+        return False
+    try:
+        publish = input("Publish anyway? (y/N): ").strip().lower() == 'y'
+    except (KeyboardInterrupt, EOFError):
+        publish = False
+    if not publish:
+        print("❌ Publish cancelled, nothing was committed.")
+    return publish
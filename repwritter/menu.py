@@ -0,0 +1,374 @@
+"""The interactive menu, the saved writeup picker and the target folder selector."""
+import hashlib
+import json
+import os
+import sqlite3
+import sys
+import threading
+from datetime import datetime
+
+from .completion import is_subsequence, setup_tab_completion
+from .config import (CATALOG_PAGE_SIZE, FOLDER_INDEX_PATH, PRUNED_FOLDERS, RECENT_TARGETS_PATH, REPWRITTER_PATH,
+                     SAVED_WRITEUPS_PATH, ensure_saved_writeups_folder)
+from .generator import WriteupGenerator
+from .sessions import SessionStore
+from .tracing import print_trace_summary, run_git, _trace
+
+RECENT_TARGETS_KEPT = 10
+FOLDER_MATCHES_SHOWN = 20
+
+def get_repo_path():
+    """Ask for the repository path with tab completion."""
+    setup_tab_completion()
+    while True:
+        try:
+            repo_path = input("\nEnter the path to the repository (use Tab for completion): ").strip()
+            repo_path = os.path.expanduser(repo_path)
+            if os.path.isdir(repo_path) and os.path.exists(os.path.join(repo_path, ".git")):
+                return repo_path
+            print("❌ Invalid repository path. Please provide a valid path containing a .git folder.")
+        except KeyboardInterrupt:
+            print("\nExiting program...")
+            sys.exit(0)
+
+def load_menu(generator):
+    """Pick a saved writeup from the catalog, with paging, sorting and filtering."""
+    try:
+        store = SessionStore()
+        store.catalog_sync()
+        has_saved = store.conn.execute("SELECT EXISTS (SELECT 1 FROM catalog)").fetchone()[0]
+        # Autosaved sessions that never reached a saved file, e.g. after a crash
+        recovered = [entry for entry in store.unsaved_sessions() if entry[0] != generator.session_id]
+    except sqlite3.Error as e:
+        print(f"❌ Could not read the saved writeups catalog: {e}")
+        generator.load_readme()
+        return
+    if not has_saved and not recovered:
+        print("\nNo saved writeups found.")
+        generator.load_readme()
+        return
+
+    text, order, page = "", "modified", 0
+    orders = ["modified", "title", "size"]
+    while True:
+        try:
+            total, rows = store.catalog_page(text, order, page * CATALOG_PAGE_SIZE)
+            pages = max(1, (total + CATALOG_PAGE_SIZE - 1) // CATALOG_PAGE_SIZE)
+            print(f"\nAvailable Saved Writeups (page {page + 1}/{pages}, {total} found, sorted by {order}"
+                  + (f", filter '{text}'" if text else "") + "):")
+            for i, (name, title, mtime, size, steps, images, files, published) in enumerate(rows, 1):
+                status = f"published {datetime.fromtimestamp(published):%Y-%m-%d}" if published else "not published"
+                print(f"{i:>3}. {name} — {title or 'Untitled'} · {steps} steps, {images} images, {files} files · "
+                      f"{datetime.fromtimestamp(mtime):%Y-%m-%d %H:%M} · {size / 1024:.1f} KB · {status}")
+            for i, (session_id, title, changed) in enumerate(recovered, len(rows) + 1):
+                print(f"{i:>3}. [autosaved] {title or 'Untitled'} ({session_id}, {datetime.fromtimestamp(changed):%Y-%m-%d %H:%M})")
+            print("\n  n/p: next/previous page · s: change sort · /text: filter · c: clear filter")
+            print("  b. Go back or load from README")
+            selection = input("\nSelect a writeup to load (number) or a command: ").strip()
+
+            if selection.lower() == 'b':
+                generator.load_readme()
+                return
+            if selection.lower() == 'n':
+                page = min(page + 1, pages - 1)
+            elif selection.lower() == 'p':
+                page = max(page - 1, 0)
+            elif selection.lower() == 's':
+                order = orders[(orders.index(order) + 1) % len(orders)]
+                page = 0
+            elif selection.startswith('/'):
+                text, page = selection[1:].strip(), 0
+            elif selection.lower() == 'c':
+                text, page = "", 0
+            elif selection.isdigit() and 0 < int(selection) <= len(rows):
+                # Only the chosen writeup is opened in full
+                file_path = os.path.join(SAVED_WRITEUPS_PATH, f"{rows[int(selection) - 1][0]}.json")
+                if generator.load_state(file_path):
+                    print("Writeup loaded successfully. You can now edit it.")
+                else:
+                    print("Failed to load writeup.")
+                return
+            elif selection.isdigit() and 0 < int(selection) - len(rows) <= len(recovered):
+                session_id = recovered[int(selection) - len(rows) - 1][0]
+                generator.restore_session(session_id)
+                generator.saved = False
+                print(f"✅ Recovered autosaved session '{session_id}'. Save it with S to keep it.")
+                return
+            else:
+                print("❌ Invalid input. Please enter a number or a command.")
+        except KeyboardInterrupt:
+            print("\nReturning to main menu...")
+            return
+
+def folder_index_path(repo_path):
+    """Path of the cached directory index of a repository."""
+    key = hashlib.sha1(os.path.abspath(repo_path).encode()).hexdigest()
+    return os.path.join(FOLDER_INDEX_PATH, f"{key}.json")
+
+def scan_repo_folders(repo_path):
+    """List every folder of a repository relative to its root, without .git or ignored trees."""
+    try:
+        result = run_git(["ls-files", "-z", "--cached", "--others", "--exclude-standard"], repo_path,
+                         check=False, capture_output=True, text=True, errors='surrogateescape')
+    except OSError:
+        result = None
+    if result and result.returncode == 0:
+        folders = set()
+        for path in result.stdout.split("\0"):
+            folder = os.path.dirname(path)
+            # Parents of a known folder are already in the set, so stop climbing there
+            while folder and folder not in folders:
+                folders.add(folder)
+                folder = os.path.dirname(folder)
+        return sorted(folders)
+
+    folders = []
+    for root, dirnames, _ in os.walk(repo_path):
+        dirnames[:] = sorted(d for d in dirnames if not d.startswith('.') and d not in PRUNED_FOLDERS)
+        rel_root = os.path.relpath(root, repo_path)
+        folders.extend(d if rel_root == '.' else os.path.join(rel_root, d) for d in dirnames)
+    return folders
+
+def refresh_folder_index(repo_path, index):
+    """Rescan a repository and store the result both in index and on disk."""
+    index['folders'] = scan_repo_folders(repo_path)
+    path = folder_index_path(repo_path)
+    os.makedirs(FOLDER_INDEX_PATH, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({'repo': os.path.abspath(repo_path), 'folders': index['folders']}, f)
+    os.replace(tmp_path, path)
+
+def load_folder_index(repo_path):
+    """Return the cached folder index of a repository and refresh it in the background.
+
+    The picker works on the cached list right away; the rescan replaces it as soon as it finishes.
+    Without a cache the first scan runs in the foreground.
+    """
+    index = {'folders': None}
+    try:
+        with open(folder_index_path(repo_path), 'r') as f:
+            cached = json.load(f)
+        if cached.get('repo') == os.path.abspath(repo_path):
+            index['folders'] = cached['folders']
+    except (OSError, ValueError, KeyError):
+        pass
+    if index['folders'] is None:
+        print("Indexing repository folders...")
+        refresh_folder_index(repo_path, index)
+    else:
+        threading.Thread(target=refresh_folder_index, args=(repo_path, index), daemon=True).start()
+    return index
+
+def load_recent_targets(repo_path):
+    try:
+        with open(RECENT_TARGETS_PATH, 'r') as f:
+            return json.load(f).get(os.path.abspath(repo_path), [])
+    except (OSError, ValueError):
+        return []
+
+def remember_target(repo_path, folder):
+    """Move a publish target to the front of the recent list of its repository."""
+    try:
+        with open(RECENT_TARGETS_PATH, 'r') as f:
+            recent = json.load(f)
+    except (OSError, ValueError):
+        recent = {}
+    key = os.path.abspath(repo_path)
+    rel = os.path.relpath(folder, repo_path)
+    recent[key] = ([rel] + [r for r in recent.get(key, []) if r != rel])[:RECENT_TARGETS_KEPT]
+    os.makedirs(REPWRITTER_PATH, exist_ok=True)
+    tmp_path = f"{RECENT_TARGETS_PATH}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(recent, f)
+    os.replace(tmp_path, RECENT_TARGETS_PATH)
+
+def match_folders(folders, query):
+    """Rank folders against a fuzzy query: every word must appear in order in the path."""
+    words = query.lower().split()
+    ranked = []
+    for folder in folders:
+        lowered = folder.lower()
+        if not all(is_subsequence(word, lowered) for word in words):
+            continue
+        name = os.path.basename(lowered)
+        # Whole words in the folder name beat words in the path, which beat scattered letters
+        score = sum(0 if word in name else 1 if word in lowered else 2 for word in words)
+        ranked.append((score, len(folder), folder))
+    ranked.sort()
+    return [folder for _, _, folder in ranked]
+
+def get_target_folder(repo_path):
+    """Pick the folder to publish into from a cached index of the repository."""
+    print("\nSelect the folder to save the writeup:")
+    try:
+        index = load_folder_index(repo_path)
+        known = set(index['folders'])
+        shown = [r for r in load_recent_targets(repo_path)
+                 if r in known or os.path.isdir(os.path.join(repo_path, r))]
+        heading = "Recent targets:"
+        while True:
+            print(f"\n{heading}")
+            if not shown:
+                print("     (none)")
+            for i, folder in enumerate(shown[:FOLDER_MATCHES_SHOWN], 1):
+                print(f"{i:>3}. {folder}")
+            if len(shown) > FOLDER_MATCHES_SHOWN:
+                print(f"     ... {len(shown) - FOLDER_MATCHES_SHOWN} more, keep typing to narrow it down")
+            print("\nType to filter (fuzzy), a number to select, a path ending in '/' to use it as is, "
+                  "'.' for the repository root or 'b' to go back.")
+            choice = input("Folder: ").strip()
+
+            if choice.lower() == 'b':
+                print("❌ No folder selected.")
+                return None
+            if choice == '.':
+                target_folder = repo_path
+            elif choice.isdigit() and 0 < int(choice) <= min(len(shown), FOLDER_MATCHES_SHOWN):
+                target_folder = os.path.join(repo_path, shown[int(choice) - 1])
+            elif (choice.endswith('/') and not os.path.normpath(choice).startswith(('..', os.sep))
+                  and os.path.isdir(os.path.join(repo_path, choice))):
+                # An exact relative path, e.g. an empty folder git does not list. The trailing '/' keeps
+                # a filter that happens to name a folder, such as 'htb', from being picked on the spot
+                target_folder = os.path.join(repo_path, choice)
+            else:
+                shown = match_folders(index['folders'], choice) if choice else load_recent_targets(repo_path)
+                heading = f"{len(shown)} folders match '{choice}':" if choice else "Recent targets:"
+                continue
+            target_folder = os.path.normpath(target_folder)
+            remember_target(repo_path, target_folder)
+            return target_folder
+    except KeyboardInterrupt:
+        print("\nReturning to main menu...")
+        return None
+
+def run_menu(args):
+    """Run the interactive writeup menu."""
+    setup_tab_completion()
+    if not args.quiet:
+        print("""
+    .------------------------------------------------------------------------------.
+    |                             .mmMMMMMMMMMMMMMmm.                              |
+    |                         .mMMMMMMMMMMMMMMMMMMMMMMMm.                          |
+    |                      .mMMMMMMMMMMMMMMMMMMMMMMMMMMMMMm.                       |
+    |                    .MMMMMMMMMMMMMMMMMMMMMMMMMMMMMMMMMMM.                     |
+    |                  .MMMMMMMMMMMMMMMMMMMMMMMMMMMMMMMMMMMMMMM.                   |
+    |                 MMMMMMMM'  `"MMMMM~~~~~~~MMMM""`  'MMMMMMMM                  |
+    |                MMMMMMMMM                           MMMMMMMMM                 |
+    |               MMMMMMMMMM:                         :MMMMMMMMMM                |
+    |              .MMMMMMMMMM                           MMMMMMMMMM.               |
+    |              MMMMMMMMM"                             "MMMMMMMMM               |
+    |              MMMMMMMMM                               MMMMMMMMM               |
+    |              MMMMMMMMM           REPWRITTER          MMMMMMMMM               |
+    |              MMMMMMMMMM                             MMMMMMMMMM               |
+    |              `MMMMMMMMMM                           MMMMMMMMMM`               |
+    |               MMMMMMMMMMMM.                     .MMMMMMMMMMMM                |
+    |                MMMMMM  MMMMMMMMMM         MMMMMMMMMMMMMMMMMM                 |
+    |                 MMMMMM  'MMMMMMM           MMMMMMMMMMMMMMMM                  |
+    |                  `MMMMMM  "MMMMM           MMMMMMMMMMMMMM`                   |
+    |                    `MMMMMm                 MMMMMMMMMMMM`                     |
+    |                      `"MMMMMMMMM           MMMMMMMMM"`                       |
+    |                         `"MMMMMM           MMMMMM"`                          |
+    |                             `""M           M""`                              |
+    '------------------------------------------------------------------------------'
+    """)
+
+    try:
+        repo_path = get_repo_path()
+        ensure_saved_writeups_folder()
+
+        generator = WriteupGenerator(repo_path)
+
+        while True:
+            try:
+                choice = generator.show_menu().lower()
+
+                if choice == '1':
+                    generator.add_title()
+                elif choice == '2':
+                    generator.add_machine_image()
+                elif choice == '3':
+                    generator.add_description()
+                elif choice == '4':
+                    generator.add_flag()
+                elif choice == '5':
+                    generator.add_file()
+                elif choice == '6':
+                    generator.edit_steps()
+                elif choice == '7':
+                    generator.set_tags()
+                elif choice == 's':
+                    generator.save_state()
+                elif choice == 'l':
+                    load_menu(generator)
+                elif choice == 'f':
+                    first_event = len(_trace['events'])
+                    md_file = generator.generate_writeup()
+                    if md_file:
+                        target_folder = get_target_folder(repo_path)
+                        if not target_folder:
+                            continue
+                        if not os.path.exists(target_folder):
+                            print(f"❌ Target folder not found: {target_folder}")
+                            continue
+                        published = generator.upload_to_github(md_file, target_folder)
+                        print_trace_summary(first_event)
+                        if published and not generator.writeup_name:
+                            # An unsaved session is done once it is published, so L stops offering it for recovery
+                            generator.discard_session()
+                        if generator.writeup_name and input("Delete saved writeup state? (y/n): ").lower() == 'y':
+                            save_file = os.path.join(SAVED_WRITEUPS_PATH, f"{generator.writeup_name}.json")
+                            generator.discard_session()
+                            if os.path.exists(save_file):
+                                os.remove(save_file)
+                                print("Saved state deleted.")
+                    break
+                elif choice == 'q':
+                    if not generator.saved and (generator.title or generator.images or generator.steps or generator.flags or generator.files):
+                        print("\nYou have unsaved changes. Do you want to exit without saving?")
+                        print("S/s: Save and exit")
+                        print("Q/q: Quit without saving")
+                        exit_choice = input("Select an option: ").lower()
+                        if exit_choice == 's':
+                            generator.save_state()
+                            print("Exiting program...")
+                            sys.exit(0)
+                        elif exit_choice == 'q':
+                            generator.discard_session()
+                            print("\nExiting without saving...")
+                            sys.exit(0)
+                        else:
+                            print("Invalid choice, returning to menu...")
+                            continue
+                    print("\n❌ Operation canceled")
+                    break
+                else:
+                    print("\n⚠️ Invalid option, try again")
+            except KeyboardInterrupt:
+                if not generator.saved and (generator.title or generator.images or generator.steps or generator.flags or generator.files):
+                    print("\nYou have unsaved changes. Do you want to exit without saving?")
+                    print("S/s: Save and exit")
+                    print("Q/q: Quit without saving")
+                    try:
+                        exit_choice = input("Select an option: ").lower()
+                        if exit_choice == 's':
+                            generator.save_state()
+                            print("Exiting program...")
+                            sys.exit(0)
+                        elif exit_choice == 'q':
+                            generator.discard_session()
+                            print("\nExiting without saving...")
+                            sys.exit(0)
+                        else:
+                            print("Invalid choice, returning to menu...")
+                            continue
+                    except KeyboardInterrupt:
+                        print("\nForcing exit without saving...")
+                        sys.exit(0)
+                else:
+                    print("\nExiting program...")
+                    sys.exit(0)
+
+    except Exception as e:
+        print(f"\n❌ An error occurred: {e}")
+        sys.exit(1)
@@ -0,0 +1,234 @@
+"""The publish command: commit many writeups at once through git fast-import."""
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import time
+
+from .batch import expand_spec_paths
+from .config import EXPORT_WORKERS, FOOTER_MARKDOWN, format_size, get_github_token
+from .generator import WriteupGenerator
+from .largefiles import store_asset
+from .leaks import LEAK_HITS_SHOWN, confirm_leaks, leak_literals, scan_for_leaks
+from .push_queue import enqueue_push
+from .sessions import SessionStore
+from .store import COPY_CHUNK_SIZE, materialize_object, object_path, save_manifest, store_bytes, transcode_images
+from .tracing import print_git_timings, print_trace_summary, run_git, trace_span, _trace
+
+def git_blob_id(path):
+    """The id git gives the content of a file, computed without starting git."""
+    digest = hashlib.sha1(b"blob %d\0" % os.path.getsize(path))
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(COPY_CHUNK_SIZE), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def fast_import_path(path):
+    """Quote a path for a git fast-import command."""
+    quoted = path.encode().replace(b"\\", b"\\\\").replace(b'"', b'\\"').replace(b"\n", b"\\n")
+    return b'"' + quoted + b'"'
+
+def writeup_objects(generator, images):
+    """Store the README and every asset of a writeup in the object store, as an export would.
+
+    images maps (source path, width) to the digest of the transcoded image. Returns
+    (README bytes, [(relative path, digest, git mode, manifest entry)]).
+    """
+    readme_bytes = (generator.markdown + FOOTER_MARKDOWN).encode()
+    files = [("README.md", store_bytes(readme_bytes), 0o100644, None)]
+    for source_path, relative_path, width in {item[1]: item for item in generator.asset_plan()}.values():
+        entry, mode = store_asset(source_path, relative_path, width, images)
+        executable = mode is not None and mode & 0o111
+        files.append((relative_path, entry['hash'], 0o100755 if executable else 0o100644, entry))
+    return readme_bytes, files
+
+def cmd_publish(args):
+    """Commit many writeups to a repository at once through git fast-import, then queue the push."""
+    import subprocess
+    started = time.perf_counter()
+    first_event = len(_trace['events'])
+    spec_paths = expand_spec_paths(args.specs)
+    if not spec_paths:
+        print("❌ No spec files matched.")
+        return 1
+
+    generators, failed = [], []
+    for spec_path in spec_paths:
+        try:
+            with open(spec_path, 'r') as f:
+                state = json.load(f)
+        except (OSError, ValueError) as e:
+            failed.append((spec_path, str(e)))
+            continue
+        generator = WriteupGenerator(state.get('repo_path') or "")
+        generator.apply_state(state)
+        generator.link_references()
+        generator.writeup_name = generator.writeup_name or os.path.splitext(os.path.basename(spec_path))[0]
+        missing = [k for k, v in generator.sections.items() if not v]
+        sources = [source_path for source_path, _, _ in generator.asset_plan() if not os.path.isfile(source_path)]
+        if missing or sources:
+            failed.append((spec_path, f"Missing sections: {', '.join(missing)}" if missing
+                           else f"Missing source files: {', '.join(sources)}"))
+            continue
+        generators.append(generator)
+
+    repos = {os.path.abspath(os.path.expanduser(args.repo or generator.repo_path)) for generator in generators}
+    if len(repos) > 1 or "" in {args.repo or generator.repo_path for generator in generators}:
+        print("❌ The writeups do not share one repository, choose it with --repo.")
+        return 1
+    if not generators:
+        for spec_path, error in failed:
+            print(f"❌ {spec_path}: {error}")
+        return 1
+    repo = repos.pop()
+    timings = []
+    try:
+        toplevel = run_git(["rev-parse", "--show-toplevel"], repo, timings, capture_output=True, text=True).stdout.strip()
+        branch = run_git(["symbolic-ref", "-q", "--short", "HEAD"], repo, timings, check=False,
+                         capture_output=True, text=True).stdout.strip()
+    except subprocess.CalledProcessError as e:
+        print(f"❌ {repo} is not a git repository: {e}")
+        return 1
+    if not branch:
+        print(f"❌ {toplevel} is not on a branch, check one out first.")
+        return 1
+    head = run_git(["rev-parse", "-q", "--verify", "HEAD"], toplevel, timings, check=False,
+                   capture_output=True, text=True).stdout.strip()
+    prefix = os.path.relpath(os.path.abspath(os.path.join(repo, args.folder)), toplevel)
+    prefix = "" if prefix == "." else prefix
+    if prefix.startswith(os.pardir):
+        print(f"❌ {args.folder} is outside of {toplevel}.")
+        return 1
+
+    # Later specs win when two writeups share a title, as two uploads in a row would
+    writeups = {}
+    for generator in generators:
+        writeups[os.path.join(prefix, generator.title)] = generator
+    images = transcode_images({(source_path, width) for generator in writeups.values()
+                               for source_path, _, width in generator.asset_plan() if width}, args.jobs)
+    from concurrent.futures import ThreadPoolExecutor
+    with trace_span("store", files=len(writeups)), ThreadPoolExecutor(max_workers=EXPORT_WORKERS) as executor:
+        objects = dict(zip(writeups, executor.map(lambda generator: writeup_objects(generator, images), writeups.values())))
+
+    # Subcommands never prompt, so without ~/.Gitenv there is simply no token to look for
+    literals = leak_literals([flag for generator in writeups.values() for flag in generator.flags],
+                             get_github_token(prompt=False))
+    scan_files = [(os.path.join(folder, relative_path), digest, object_path(digest))
+                  for folder, (_, files) in objects.items() for relative_path, digest, _, _ in files]
+    with trace_span("leak scan", files=len(scan_files)) as span:
+        hits, span['bytes'] = scan_for_leaks(scan_files, literals, args.jobs)
+    if hits and not confirm_leaks(hits):
+        return 1
+
+    # Only the files whose content or mode differs from the branch go into the commit
+    existing = {}
+    if head:
+        listing = run_git(["ls-tree", "-r", "-z", "HEAD", "--", *writeups], toplevel, timings,
+                          capture_output=True).stdout
+        for record in listing.split(b"\0"):
+            if record:
+                meta, path = record.split(b"\t", 1)
+                mode, _, blob = meta.split()
+                existing[os.fsdecode(path)] = (int(mode, 8), blob.decode())
+    blob_ids, changed = {}, []
+    for folder, (_, files) in objects.items():
+        for relative_path, digest, mode, _ in files:
+            if digest not in blob_ids:
+                blob_ids[digest] = git_blob_id(object_path(digest))
+            path = os.path.join(folder, relative_path)
+            if existing.get(path) != (mode, blob_ids[digest]):
+                changed.append((path, digest, mode))
+    changed_folders = sorted({folder for folder, (_, files) in objects.items()
+                              if any(path.startswith(folder + os.sep) for path, _, _ in changed)})
+    if not changed:
+        print(f"✅ All {len(writeups)} writeups already match {branch}, nothing to commit.")
+        print_git_timings(timings)
+        print_trace_summary(first_event)
+        return 1 if failed else 0
+
+    # Local edits in the published folders would be overwritten, so they have to be committed or stashed first
+    if not args.no_checkout:
+        status = run_git(["status", "--porcelain", "-z", "--untracked-files=all", "--", *changed_folders], toplevel,
+                         timings, capture_output=True).stdout
+        dirty, records = [], iter(status.split(b"\0"))
+        for record in records:
+            if record[2:3] != b" ":
+                continue
+            dirty.append(os.fsdecode(record[3:]))
+            if b"R" in record[:2] or b"C" in record[:2]:
+                next(records, None)  # Renames and copies are followed by a field with the original path
+        if dirty:
+            print(f"❌ {len(dirty)} uncommitted change(s) in the folders to publish, nothing was committed:")
+            for path in dirty[:LEAK_HITS_SHOWN]:
+                print(f"   {path}")
+            print("Commit or stash them first, or publish with --no-checkout to leave the working tree alone.")
+            print_git_timings(timings)
+            return 1
+
+    titles = [writeups[folder].title for folder in changed_folders]
+    message = f"Add {len(titles)} writeups" if len(titles) > 1 else f"Add writeup: {titles[0]}"
+    message += "\n\n" + "\n".join(f"- {title}" for title in titles) + "\n"
+    ident = run_git(["var", "GIT_COMMITTER_IDENT"], toplevel, timings, capture_output=True, text=True).stdout.strip()
+    fast_import_started = time.perf_counter()
+    written = 0
+    with trace_span("git fast-import", files=len(changed)) as span:
+        process = subprocess.Popen(["git", "fast-import", "--quiet", "--done"], cwd=toplevel, stdin=subprocess.PIPE)
+        try:
+            write = process.stdin.write
+            write(b"commit refs/heads/%s\ncommitter %s\ndata %d\n%s\n"
+                  % (branch.encode(), ident.encode(), len(message.encode()), message.encode()))
+            if head:
+                write(b"from %s\n" % head.encode())
+            for path, digest, mode in changed:
+                size = os.path.getsize(object_path(digest))
+                write(b"M %o inline %s\ndata %d\n" % (mode, fast_import_path(path), size))
+                with open(object_path(digest), 'rb') as f:
+                    shutil.copyfileobj(f, process.stdin, COPY_CHUNK_SIZE)
+                write(b"\n")
+                written += size
+            write(b"done\n")
+            process.stdin.close()
+        except BrokenPipeError:
+            pass
+        returncode = process.wait()
+        span['bytes'] = written
+    timings.append(("fast-import", time.perf_counter() - fast_import_started))
+    if returncode != 0:
+        print(f"❌ git fast-import failed (exit code {returncode}), {branch} was left as it was.")
+        print_git_timings(timings)
+        return 1
+
+    # The branch moved under the checkout: point the index at the new blobs and copy (or reflink) the changed files
+    # from the object store, which the clean check above makes safe
+    if not args.no_checkout:
+        index_info = b"".join(b"%o %s\t%s\0" % (mode, blob_ids[digest].encode(), os.fsencode(path))
+                              for path, digest, mode in changed)
+        run_git(["update-index", "-z", "--index-info"], toplevel, timings, input=index_info)
+        for path, digest, mode in changed:
+            materialize_object(digest, os.path.join(toplevel, path), mode if mode & 0o111 else None, link=False)
+        for folder in changed_folders:
+            readme_bytes, files = objects[folder]
+            save_manifest({'folder': os.path.join(toplevel, folder),
+                           'readme': hashlib.sha256(readme_bytes).hexdigest(),
+                           'assets': {relative_path: entry for relative_path, _, _, entry in files if entry}})
+    try:
+        store = SessionStore()
+        for folder in changed_folders:
+            store.catalog_mark_published(writeups[folder].writeup_name)
+    except sqlite3.Error:
+        pass
+    with trace_span("enqueue push"):
+        enqueue_push(toplevel, titles[0] if len(titles) == 1 else f"{len(titles)} writeups")
+
+    print(f"✅ Committed {len(changed)} file(s) ({format_size(written)}) of {len(changed_folders)} writeups to {branch} "
+          f"in one commit ({time.perf_counter() - started:.2f}s); {len(writeups) - len(changed_folders)} unchanged.")
+    if args.no_checkout:
+        print(f"⚠️ The index and working tree were not updated, run 'git -C {toplevel} checkout HEAD -- .' "
+              "to see the files.")
+    print("📤 Push queued in the background. Check it with: python repwritter.py status")
+    print_git_timings(timings)
+    print_trace_summary(first_event)
+    for spec_path, error in failed:
+        print(f"❌ {spec_path}: {error}")
+    return 1 if failed else 0
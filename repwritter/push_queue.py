@@ -0,0 +1,180 @@
+"""Queued pushes and the detached worker that drains them."""
+import contextlib
+import os
+import sys
+import time
+
+from .config import PUBLISH_LOCK_PATH, PUBLISH_LOG_PATH, PUBLISH_QUEUE_PATH, REPWRITTER_PATH
+from .tracing import run_git, _trace
+
+PUBLISH_MAX_BACKOFF = 300  # seconds between retries once the remote keeps failing
+PUBLISH_MAX_ATTEMPTS = 12  # the background worker stops after this many tries; the jobs stay queued
+
+def enqueue_push(repo_dir, title):
+    """Queue a push of the current branch of repo_dir and make sure a background worker drains it."""
+    toplevel, commit, branch = run_git(["rev-parse", "--show-toplevel", "HEAD", "--abbrev-ref", "HEAD"], repo_dir,
+                                       capture_output=True, text=True).stdout.splitlines()
+    remote = run_git(["config", f"branch.{branch}.remote"], repo_dir, check=False,
+                     capture_output=True, text=True).stdout.strip() or "origin"
+    job = {
+        'repo': toplevel,
+        'remote': remote,
+        'branch': branch,
+        'commit': commit,
+        'title': title,
+        'queued_at': time.time(),
+        'attempts': 0,
+        'next_attempt': 0,
+        'last_error': None
+    }
+    os.makedirs(PUBLISH_QUEUE_PATH, exist_ok=True)
+    job_path = os.path.join(PUBLISH_QUEUE_PATH, f"{time.time_ns()}-{os.getpid()}.json")
+    write_job(job_path, job)
+    start_publish_worker()
+    return job_path
+
+def write_job(job_path, job):
+    import json
+    tmp_path = f"{job_path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(job, f)
+    os.replace(tmp_path, job_path)
+
+def load_publish_jobs():
+    """Return (path, job) for every queued push, oldest first."""
+    import json
+    jobs = []
+    for name in sorted(os.listdir(PUBLISH_QUEUE_PATH)) if os.path.isdir(PUBLISH_QUEUE_PATH) else []:
+        if not name.endswith(".json"):
+            continue
+        path = os.path.join(PUBLISH_QUEUE_PATH, name)
+        try:
+            with open(path, 'r') as f:
+                jobs.append((path, json.load(f)))
+        except (OSError, ValueError):
+            continue
+    return jobs
+
+@contextlib.contextmanager
+def publish_lock(blocking=False):
+    """Hold the publish worker lock. Yields False when another worker already holds it."""
+    import fcntl
+    os.makedirs(REPWRITTER_PATH, exist_ok=True)
+    with open(PUBLISH_LOCK_PATH, 'a') as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def start_publish_worker():
+    """Start a detached worker process that drains the publish queue."""
+    import subprocess
+    with publish_lock() as acquired:
+        if not acquired:
+            return  # A worker is already running and will pick the new job up
+    env = dict(os.environ)
+    env.pop("REPWRITTER_TRACE", None)
+    if _trace['path']:
+        # The worker keeps its own trace next to ours, e.g. out-push.json
+        env["REPWRITTER_TRACE"] = f"{os.path.splitext(_trace['path'])[0]}-push.json"
+    # -m repwritter has to find this same copy of the package, installed or not
+    package_parent = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [package_parent, env.get("PYTHONPATH")]))
+    with open(PUBLISH_LOG_PATH, 'a') as log:
+        subprocess.Popen([sys.executable, "-m", "repwritter", "publish-worker"],
+                         stdin=subprocess.DEVNULL, stdout=log, stderr=log, start_new_session=True, env=env)
+
+def drain_publish_queue(retry_now=False, log=print):
+    """Push every queued job, one push per repository branch, retrying failures with backoff.
+
+    Returns the number of jobs still queued when the worker gives up.
+    """
+    seen = set()
+    while True:
+        with publish_lock() as acquired:
+            if not acquired:
+                log("Another publish worker is running.")
+                return len(load_publish_jobs())
+            remaining = push_queued_jobs(retry_now, log, seen)
+        # enqueue_push starts no worker while we hold the lock, so a job queued after our
+        # last look would wait for the next publish unless we pick it up ourselves
+        if all(path in seen for path, _ in load_publish_jobs()):
+            return remaining
+
+def push_queued_jobs(retry_now, log, seen):
+    """The body of drain_publish_queue, run with the lock held. Adds every job it looked at to seen."""
+    while True:
+        jobs = load_publish_jobs()
+        if not jobs:
+            return 0
+        seen.update(path for path, _ in jobs)
+        now = time.time()
+        groups = {}
+        for path, job in jobs:
+            groups.setdefault((job['repo'], job['remote'], job['branch']), []).append((path, job))
+        for (repo, remote, branch), group in groups.items():
+            if not retry_now and min(job['next_attempt'] for _, job in group) > now:
+                continue
+            # One push carries every commit queued for this branch
+            result = run_git(["push", remote, branch], repo, check=False, capture_output=True, text=True)
+            titles = ", ".join(job['title'] for _, job in group)
+            if result.returncode == 0:
+                for path, _ in group:
+                    os.remove(path)
+                log(f"{time.strftime('%Y-%m-%d %H:%M:%S')} ✅ Pushed {len(group)} commit(s) to {remote}/{branch}: {titles}")
+                continue
+            lines = (result.stderr or result.stdout).strip().splitlines()
+            errors = [line for line in lines if line.startswith(("fatal:", "error:", " ! "))]
+            error = (errors or lines or [f"git push exited with {result.returncode}"])[0].strip()
+            log(f"{time.strftime('%Y-%m-%d %H:%M:%S')} ❌ Push to {remote}/{branch} failed: {error}")
+            for path, job in group:
+                job['attempts'] += 1
+                job['next_attempt'] = time.time() + min(PUBLISH_MAX_BACKOFF, 5 * 2 ** job['attempts'])
+                job['last_error'] = error
+                write_job(path, job)
+        jobs = load_publish_jobs()
+        if retry_now or not jobs or all(job['attempts'] >= PUBLISH_MAX_ATTEMPTS for _, job in jobs):
+            return len(jobs)
+        # Wake up at least every second so 'push' and newly queued jobs are picked up quickly
+        time.sleep(min(1.0, max(0.1, min(job['next_attempt'] for _, job in jobs) - time.time())))
+
+def cmd_status(args):
+    """Show the publish queue."""
+    jobs = load_publish_jobs()
+    with publish_lock() as acquired:
+        worker = "idle" if acquired else "running"
+    print(f"Publish worker: {worker}")
+    if not jobs:
+        print("✅ Publish queue is empty.")
+        return 0
+    print(f"{len(jobs)} queued push(es):")
+    for _, job in jobs:
+        queued = time.strftime('%Y-%m-%d %H:%M', time.localtime(job['queued_at']))
+        line = f"  - {job['title']} → {job['remote']}/{job['branch']} ({job['repo']}), queued {queued}"
+        if job['attempts']:
+            wait = max(0, job['next_attempt'] - time.time())
+            line += f", {job['attempts']} failed attempt(s), next retry in {wait:.0f}s: {job['last_error']}"
+        print(line)
+    return 0
+
+def cmd_push(args):
+    """Drain the publish queue in the foreground, retrying failed pushes right away."""
+    for path, job in load_publish_jobs():
+        job['next_attempt'] = 0
+        write_job(path, job)
+    with publish_lock() as acquired:
+        running = not acquired
+    if running:
+        print("📤 The background worker is retrying every queued push now. Check it with: python repwritter.py status")
+        return 0
+    remaining = drain_publish_queue(retry_now=True)
+    if remaining:
+        print(f"❌ {remaining} push(es) still queued. See 'repwritter.py status'.")
+        return 1
+    print("✅ Publish queue is empty.")
+    return 0
@@ -0,0 +1,153 @@
+"""Parsing READMEs written by this tool back into sections."""
+import os
+import re
+
+from .config import STEP_IMAGE_WIDTH
+
+IMAGE_TAG = re.compile(r"<img src='img/([^']+)' width='(\d+)' alt='([^']*)'>")
+# Any link target, generated or written by hand: quoted or bare src/href values, markdown
+# link targets (<...> or bare, with balanced parentheses) and reference definitions
+LINK_TARGET = re.compile(r"""\b(?:src|href)\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s'"<>]+))"""
+                         r"""|\]\(\s*(?:<([^<>\n]*)>|((?:[^\s()]|\([^\s()]*\))+))"""
+                         r"""|^ {0,3}\[[^\]\n]+\]:\s*(?:<([^<>\n]*)>|(\S+))""", re.IGNORECASE | re.MULTILINE)
+TAGS_COMMENT = re.compile(r"^<!-- tags: (.*) -->$")
+FOOTER_MARKER = "<p>Thanks for reading!"
+
+def img_references(text):
+    """Paths inside img/ that the links in text point to, without query or fragment and percent-decoded."""
+    import urllib.parse
+    references = set()
+    for groups in LINK_TARGET.findall(text):
+        target = next((group for group in groups if group), "").split('#', 1)[0].split('?', 1)[0]
+        path = os.path.normpath(urllib.parse.unquote(target))
+        if path.startswith("img" + os.sep):
+            references.add(os.path.relpath(path, "img"))
+    return references
+
+def parse_readme(lines, folder):
+    """Rebuild the sections of a README written by this tool in a single pass over its lines.
+
+    Returns a state dict in the save_state format. Images point to the files in
+    folder/img, flags keep the blurred value (the real one is not in the README) and
+    anything that is not a known block is kept as an imported 'raw' section.
+    """
+    state = {'title': "", 'images': [], 'steps': [], 'flags': [], 'files': [], 'input_order': [], 'raw_blocks': [],
+             'tags': []}
+    raw = []
+    step = None  # [subtitle, description, oneliner, image] being read
+    pending = None  # one-line ```bash block that is the step's one-liner if nothing but blank lines follow it
+
+    def flush_raw():
+        if any(line.strip() for line in raw):
+            state['raw_blocks'].append("\n".join(raw).strip("\n") + "\n\n")
+            state['input_order'].append(('raw', len(state['raw_blocks']) - 1))
+        raw.clear()
+
+    def flush_pending():
+        nonlocal pending
+        if pending:
+            step[1].extend(pending)
+            pending = None
+
+    def close_step(oneliner_ok=True):
+        nonlocal step, pending
+        if step is None:
+            return
+        if pending and oneliner_ok:
+            step[2] = pending[1][1:]
+            pending = None
+        flush_pending()
+        while step[1] and not step[1][-1].strip():
+            step[1].pop()
+        state['steps'].append(step)
+        state['input_order'].append(('step', len(state['steps']) - 1))
+        step = None
+
+    lines = iter(line.rstrip("\n") for line in lines)
+    for line in lines:
+        stripped = line.strip()
+        if FOOTER_MARKER in stripped:
+            break
+
+        if pending is not None and stripped and not (stripped.startswith("#") or stripped == "<div align='center'>"):
+            # More text follows, so the code block belongs to the description
+            flush_pending()
+
+        if line.startswith("# ") and not state['title'] and step is None:
+            state['title'] = line[2:].strip()
+            state['input_order'].append(('title', None))
+        elif step is None and state['title'] and not state['tags'] and not state['input_order'][1:] \
+                and TAGS_COMMENT.match(stripped) and not any(raw):
+            state['tags'] = [tag.strip() for tag in TAGS_COMMENT.match(stripped).group(1).split(",") if tag.strip()]
+        elif line.startswith("## "):
+            close_step()
+            flush_raw()
+            subtitle = line[3:].strip()
+            if subtitle == "Flag":
+                block = [next(lines, None) for _ in range(4)]
+                if block[0] == "" and block[1] == "```bash" and block[3] == "```" and block[2]:
+                    state['flags'].append(block[2])
+                    state['input_order'].append(('flag', len(state['flags']) - 1))
+                    continue
+                # Not the generated flag block, read it as a regular section
+                step = [subtitle, [], None, None]
+                step[1].extend(item for item in block[1:] if item is not None)
+                continue
+            step = [subtitle, [], None, None]
+            first = next(lines, None)
+            if first:
+                step[1].append(first.rstrip("\n"))
+        elif stripped == "<div align='center'>":
+            img_line = next(lines, None)
+            match = IMAGE_TAG.search(img_line or "")
+            if match is None or FOOTER_MARKER in (img_line or ""):
+                if img_line is not None and FOOTER_MARKER in img_line:
+                    break
+                (step[1] if step else raw).extend(item for item in (line, img_line) if item is not None)
+                continue
+            close_div = next(lines, None)
+            file_name, width, alt = match.groups()
+            image = (os.path.splitext(file_name)[0], os.path.join(folder, "img", file_name))
+            if step is not None and step[3] is None and width == str(STEP_IMAGE_WIDTH):
+                step[3] = image
+                close_step()
+            else:
+                close_step()
+                flush_raw()
+                state['images'].append(image)
+                state['input_order'].append(('image', len(state['images']) - 1))
+            if close_div is not None and close_div.strip() != "</div>":
+                raw.append(close_div)
+        elif stripped.startswith("```"):
+            # Read fenced blocks whole so pasted tool output cannot open a section
+            block = [line]
+            for code_line in lines:
+                block.append(code_line)
+                if code_line.strip() == "```":
+                    break
+            if step is None:
+                raw.extend(block)
+                continue
+            flush_pending()
+            if step[2] is None and len(block) == 3 and block[0] == "```bash" \
+                    and block[1].startswith(" ") and block[2] == "```":
+                pending = block
+            else:
+                step[1].extend(block)
+        elif step is not None:
+            if pending is not None and not stripped:
+                pending.append(line)  # Blank lines between the one-liner and the next block
+                continue
+            step[1].append(line)
+        else:
+            raw.append(line)
+
+    close_step()
+    flush_raw()
+    state['steps'] = [(subtitle, description, oneliner, image) for subtitle, description, oneliner, image in state['steps']]
+    state['sections'] = {
+        'title': bool(state['title']),
+        'image': bool(state['images']),
+        'description': bool(state['steps'])
+    }
+    return state
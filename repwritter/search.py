@@ -0,0 +1,117 @@
+"""Full-text search index over ~/writeups."""
+import os
+import sqlite3
+import time
+
+from .config import REPWRITTER_PATH, SEARCH_DB_PATH
+from .readme import parse_readme
+
+def open_search_index():
+    """Open the full-text index of ~/writeups, creating it on first use."""
+    os.makedirs(REPWRITTER_PATH, exist_ok=True)
+    conn = sqlite3.connect(SEARCH_DB_PATH)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("CREATE TABLE IF NOT EXISTS documents (folder TEXT PRIMARY KEY, title TEXT, mtime INTEGER, size INTEGER)")
+    conn.execute("CREATE VIRTUAL TABLE IF NOT EXISTS writeups USING fts5("
+                 "folder UNINDEXED, title, subtitles, descriptions, oneliners, tokenize='porter unicode61')")
+    return conn
+
+def search_fields(folder):
+    """Read the searchable text of a writeup folder. Returns None when it has no README.md."""
+    readme_path = os.path.join(folder, "README.md")
+    try:
+        st = os.stat(readme_path)
+        with open(readme_path, 'r', errors='replace') as f:
+            state = parse_readme(f, folder)
+    except OSError:
+        return None
+    steps = state['steps']
+    descriptions = [line for _, description, _, _ in steps for line in description]
+    descriptions += state['raw_blocks']
+    return {
+        'folder': os.path.abspath(folder),
+        'mtime': st.st_mtime_ns,
+        'size': st.st_size,
+        'title': state['title'] or os.path.basename(os.path.normpath(folder)),
+        'subtitles': "\n".join(subtitle for subtitle, _, _, _ in steps),
+        'descriptions': "\n".join(descriptions),
+        'oneliners': "\n".join(oneliner for _, _, oneliner, _ in steps if oneliner)
+    }
+
+def index_document(conn, fields):
+    conn.execute("DELETE FROM writeups WHERE folder = ?", (fields['folder'],))
+    conn.execute("INSERT INTO writeups (folder, title, subtitles, descriptions, oneliners) VALUES (?, ?, ?, ?, ?)",
+                 (fields['folder'], fields['title'], fields['subtitles'], fields['descriptions'], fields['oneliners']))
+    conn.execute("INSERT OR REPLACE INTO documents (folder, title, mtime, size) VALUES (?, ?, ?, ?)",
+                 (fields['folder'], fields['title'], fields['mtime'], fields['size']))
+
+def update_search_index(folder):
+    """Index one writeup folder unless its README is unchanged since the last indexing."""
+    folder = os.path.abspath(folder)
+    conn = open_search_index()
+    try:
+        st = os.stat(os.path.join(folder, "README.md"))
+        row = conn.execute("SELECT mtime, size FROM documents WHERE folder = ?", (folder,)).fetchone()
+        if row == (st.st_mtime_ns, st.st_size):
+            return False
+        fields = search_fields(folder)
+        if fields:
+            with conn:
+                index_document(conn, fields)
+        return True
+    finally:
+        conn.close()
+
+def fts_query(text):
+    """Turn free text into an FTS5 query matching every word, the last one as a prefix."""
+    terms = ['"' + term.replace('"', '""') + '"' for term in text.split()]
+    if terms:
+        terms[-1] += "*"
+    return " ".join(terms)
+
+def cmd_search(args):
+    """Print the best matching writeups for a query."""
+    query = fts_query(" ".join(args.query))
+    if not query:
+        print("❌ Empty query.")
+        return 1
+    started = time.perf_counter()
+    conn = open_search_index()
+    try:
+        rows = conn.execute(
+            "SELECT folder, title, snippet(writeups, -1, '[', ']', '…', 12) FROM writeups "
+            "WHERE writeups MATCH ? ORDER BY bm25(writeups, 0, 10.0, 5.0, 1.0, 2.0) LIMIT ?",
+            (query, args.limit)).fetchall()
+    finally:
+        conn.close()
+    elapsed = (time.perf_counter() - started) * 1000
+    if not rows:
+        print(f"No writeups match '{' '.join(args.query)}' ({elapsed:.1f} ms).")
+        return 1
+    print(f"{len(rows)} result(s) in {elapsed:.1f} ms:")
+    for i, (folder, title, snippet) in enumerate(rows, 1):
+        print(f"{i:>3}. {title} ({folder})")
+        print(f"     {' '.join(snippet.split())}")
+    return 0
+
+def cmd_reindex(args):
+    """Rebuild the search index from every writeup folder, parsing READMEs in parallel."""
+    root = os.path.expanduser(args.path)
+    folders = [entry.path for entry in os.scandir(root)
+               if entry.is_dir() and os.path.isfile(os.path.join(entry.path, "README.md"))] if os.path.isdir(root) else []
+    started = time.perf_counter()
+    conn = open_search_index()
+    try:
+        with conn:
+            conn.execute("DELETE FROM writeups")
+            conn.execute("DELETE FROM documents")
+            from concurrent.futures import ProcessPoolExecutor
+            with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+                for fields in executor.map(search_fields, folders, chunksize=32):
+                    if fields:
+                        index_document(conn, fields)
+        conn.execute("INSERT INTO writeups(writeups) VALUES ('optimize')")
+    finally:
+        conn.close()
+    print(f"✅ Indexed {len(folders)} writeups from {root} in {time.perf_counter() - started:.2f}s")
+    return 0
@@ -0,0 +1,212 @@
+"""SQLite storage for autosave sessions, the saved writeup catalog, references and scan results."""
+import json
+import os
+import sqlite3
+import time
+from datetime import datetime
+
+from .config import CATALOG_PAGE_SIZE, SAVED_WRITEUPS_PATH, SESSIONS_DB_PATH
+
+REFERENCES_KEPT = 2000  # saved reference URLs, the least recently used are dropped first
+
+class SessionStore:
+    """Journaled session storage: one snapshot per session plus every change made since."""
+
+    def __init__(self, path=SESSIONS_DB_PATH):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        # WAL with NORMAL sync survives a killed process, only an OS crash can drop the last records
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        with self.conn:
+            self.conn.execute("CREATE TABLE IF NOT EXISTS snapshots "
+                              "(session TEXT PRIMARY KEY, state TEXT, seq INTEGER, updated REAL)")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS journal "
+                              "(seq INTEGER PRIMARY KEY AUTOINCREMENT, session TEXT, record TEXT, created REAL)")
+            self.conn.execute("CREATE INDEX IF NOT EXISTS journal_session ON journal (session, seq)")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS catalog "
+                              "(name TEXT PRIMARY KEY, title TEXT, mtime REAL, size INTEGER, "
+                              "steps INTEGER, images INTEGER, files INTEGER, published REAL)")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS clean_scans "
+                              "(hash TEXT, fingerprint TEXT, scanned REAL, PRIMARY KEY (hash, fingerprint))")
+            self.conn.execute("CREATE TABLE IF NOT EXISTS refs "
+                              "(word TEXT PRIMARY KEY, url TEXT, uses INTEGER, last_used REAL)")
+
+    def has_snapshot(self, session):
+        return self.conn.execute("SELECT 1 FROM snapshots WHERE session = ?", (session,)).fetchone() is not None
+
+    def append(self, session, record):
+        with self.conn:
+            self.conn.execute("INSERT INTO journal (session, record, created) VALUES (?, ?, ?)",
+                              (session, json.dumps(record), time.time()))
+
+    def compact(self, session, state):
+        """Replace the session snapshot with state and drop the journal records it covers."""
+        with self.conn:
+            seq = self.conn.execute("SELECT COALESCE(MAX(seq), 0) FROM journal WHERE session = ?", (session,)).fetchone()[0]
+            self.conn.execute("INSERT OR REPLACE INTO snapshots (session, state, seq, updated) VALUES (?, ?, ?, ?)",
+                              (session, json.dumps(state), seq, time.time()))
+            self.conn.execute("DELETE FROM journal WHERE session = ? AND seq <= ?", (session, seq))
+
+    def load(self, session):
+        """Return (snapshot state, journal records, last change time) or None."""
+        row = self.conn.execute("SELECT state, seq, updated FROM snapshots WHERE session = ?", (session,)).fetchone()
+        if row is None:
+            return None
+        state, seq, updated = row
+        records = self.conn.execute("SELECT record, created FROM journal WHERE session = ? AND seq > ? ORDER BY seq",
+                                    (session, seq)).fetchall()
+        last_change = records[-1][1] if records else updated
+        return json.loads(state), [json.loads(record) for record, _ in records], last_change
+
+    def rename(self, old, new):
+        with self.conn:
+            self.conn.execute("DELETE FROM snapshots WHERE session = ?", (new,))
+            self.conn.execute("DELETE FROM journal WHERE session = ?", (new,))
+            self.conn.execute("UPDATE snapshots SET session = ? WHERE session = ?", (new, old))
+            self.conn.execute("UPDATE journal SET session = ? WHERE session = ?", (new, old))
+
+    def delete(self, session):
+        with self.conn:
+            self.conn.execute("DELETE FROM snapshots WHERE session = ?", (session,))
+            self.conn.execute("DELETE FROM journal WHERE session = ?", (session,))
+
+    def catalog_update(self, name, state, st):
+        """Record the summary of a saved file, keeping its publish status."""
+        images = len(state.get('images', [])) + sum(1 for step in state.get('steps', []) if step[3])
+        with self.conn:
+            self.conn.execute(
+                "INSERT INTO catalog (name, title, mtime, size, steps, images, files) VALUES (?, ?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(name) DO UPDATE SET title = excluded.title, mtime = excluded.mtime, size = excluded.size, "
+                "steps = excluded.steps, images = excluded.images, files = excluded.files",
+                (name, state.get('title', ""), st.st_mtime, st.st_size, len(state.get('steps', [])), images,
+                 len(state.get('files', []))))
+
+    def catalog_sync(self, folder=SAVED_WRITEUPS_PATH):
+        """Bring the catalog in line with the saved files, opening only the ones that changed."""
+        known = {name: (mtime, size) for name, mtime, size in self.conn.execute("SELECT name, mtime, size FROM catalog")}
+        seen = set()
+        for entry in os.scandir(folder) if os.path.isdir(folder) else []:
+            if not entry.name.endswith(".json") or not entry.is_file():
+                continue
+            name = entry.name[:-len(".json")]
+            seen.add(name)
+            st = entry.stat()
+            if known.get(name) == (st.st_mtime, st.st_size):
+                continue
+            try:
+                with open(entry.path, 'r') as f:
+                    state = json.load(f)
+            except (OSError, ValueError):
+                state = {'title': "⚠️ unreadable"}
+            self.catalog_update(name, state, st)
+        with self.conn:
+            self.conn.executemany("DELETE FROM catalog WHERE name = ?", [(name,) for name in set(known) - seen])
+
+    def catalog_page(self, text="", order="modified", offset=0, limit=CATALOG_PAGE_SIZE):
+        """Return (total matches, rows) of the catalog filtered by name or title."""
+        order_by = {'modified': "mtime DESC", 'title': "title COLLATE NOCASE, name", 'size': "size DESC"}[order]
+        pattern = f"%{text}%"
+        total = self.conn.execute("SELECT COUNT(*) FROM catalog WHERE name LIKE ? OR title LIKE ?",
+                                  (pattern, pattern)).fetchone()[0]
+        rows = self.conn.execute(
+            f"SELECT name, title, mtime, size, steps, images, files, published FROM catalog "
+            f"WHERE name LIKE ? OR title LIKE ? ORDER BY {order_by} LIMIT ? OFFSET ?",
+            (pattern, pattern, limit, offset)).fetchall()
+        return total, rows
+
+    def catalog_mark_published(self, name):
+        with self.conn:
+            self.conn.execute("UPDATE catalog SET published = ? WHERE name = ?", (time.time(), name))
+
+    def clean_scans(self, digests, fingerprint):
+        """The digests already scanned without hits for the secrets behind fingerprint."""
+        digests = list(digests)
+        rows = self.conn.execute(f"SELECT hash FROM clean_scans WHERE fingerprint = ? "
+                                 f"AND hash IN ({', '.join('?' * len(digests))})", [fingerprint, *digests])
+        return {digest for digest, in rows}
+
+    def record_clean_scans(self, digests, fingerprint):
+        now = time.time()
+        with self.conn:
+            self.conn.executemany("INSERT OR REPLACE INTO clean_scans (hash, fingerprint, scanned) VALUES (?, ?, ?)",
+                                  [(digest, fingerprint, now) for digest in digests])
+
+    def reference_urls(self, words):
+        """Saved URLs for the given lowercase words."""
+        rows = self.conn.execute(f"SELECT word, url FROM refs WHERE word IN ({', '.join('?' * len(words))})",
+                                 list(words)).fetchall()
+        return dict(rows)
+
+    def use_references(self, words):
+        """Saved URLs for the given lowercase words, counting a use of every one that is found.
+
+        The update runs first so the lookup happens inside its transaction, and a
+        reference cannot be dropped between being read and being counted.
+        """
+        placeholders = ', '.join('?' * len(words))
+        with self.conn:
+            self.conn.execute(f"UPDATE refs SET uses = uses + 1, last_used = ? WHERE word IN ({placeholders})",
+                              [time.time(), *words])
+            rows = self.conn.execute(f"SELECT word, url FROM refs WHERE word IN ({placeholders})", list(words)).fetchall()
+        return dict(rows)
+
+    def remember_references(self, urls):
+        """Save word -> URL pairs and count their use, dropping the least recently used past REFERENCES_KEPT."""
+        now = time.time()
+        with self.conn:
+            self.conn.executemany("INSERT INTO refs (word, url, uses, last_used) VALUES (?, ?, 1, ?) "
+                                  "ON CONFLICT (word) DO UPDATE SET url = excluded.url, uses = uses + 1, "
+                                  "last_used = excluded.last_used",
+                                  [(word, url, now) for word, url in urls.items()])
+            self.conn.execute("DELETE FROM refs WHERE word NOT IN "
+                              "(SELECT word FROM refs ORDER BY last_used DESC LIMIT ?)", (REFERENCES_KEPT,))
+
+    def forget_reference(self, word):
+        with self.conn:
+            return self.conn.execute("DELETE FROM refs WHERE word = ?", (word,)).rowcount
+
+    def references(self, limit):
+        """(word, url, uses, last used) of the most used references."""
+        return self.conn.execute("SELECT word, url, uses, last_used FROM refs ORDER BY uses DESC, last_used DESC LIMIT ?",
+                                 (limit,)).fetchall()
+
+    def unsaved_sessions(self):
+        """(session, title, last change time) for every stored session without a saved file, newest first."""
+        return self.conn.execute(
+            "SELECT s.session, COALESCE(json_extract(s.state, '$.title'), ''), "
+            "MAX(s.updated, COALESCE(MAX(j.created), 0)) AS changed "
+            "FROM snapshots s LEFT JOIN journal j ON j.session = s.session "
+            "WHERE s.session NOT IN (SELECT name FROM catalog) "
+            "GROUP BY s.session ORDER BY changed DESC").fetchall()
+
+def cmd_refs(args):
+    """List, set or forget saved reference URLs."""
+    store = SessionStore()
+    if args.forget:
+        if not args.word:
+            print("❌ --forget needs a word.")
+            return 1
+        if not store.forget_reference(args.word.lower()):
+            print(f"❌ No saved reference for '{args.word}'.")
+            return 1
+        print(f"✅ Forgot '{args.word}'.")
+        return 0
+    if args.word and args.url:
+        store.remember_references({args.word.lower(): args.url})
+        print(f"✅ [{args.word}] → {args.url}")
+        return 0
+    if args.word:
+        url = store.reference_urls([args.word.lower()]).get(args.word.lower())
+        if not url:
+            print(f"❌ No saved reference for '{args.word}'.")
+            return 1
+        print(url)
+        return 0
+    rows = store.references(args.limit)
+    if not rows:
+        print("No saved references yet, they are added as you link [words] in descriptions.")
+        return 0
+    for word, url, uses, last_used in rows:
+        print(f"{uses:>5}× {word} → {url} (last used {datetime.fromtimestamp(last_used):%Y-%m-%d})")
+    return 0
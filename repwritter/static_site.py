@@ -0,0 +1,265 @@
+"""Rendering the writeups to a static HTML site."""
+import hashlib
+import json
+import os
+import re
+import shutil
+import time
+
+from .readme import FOOTER_MARKER, TAGS_COMMENT
+from .store import carry_over_files, create_staging_folder, swap_folder
+from .tracing import merge_trace, run_traced, trace_span, _trace
+
+SITE_VERSION = 2  # Bump to re-render every page after changing the HTML output
+SITE_TAGS_FOLDER = "_tags"  # Generated tag pages; a writeup folder with this name would collide and is skipped
+MD_LINK = re.compile(r"\[([^\]]+)\]\((?:&lt;(.+?)&gt;|([^)\s]+))\)")
+MD_BOLD = re.compile(r"\*\*(.+?)\*\*")
+MD_HEADING = re.compile(r"^(#{1,6}) (.*)$")
+SITE_STYLE = """
+body { max-width: 900px; margin: 2em auto; padding: 0 1em; font-family: system-ui, sans-serif; line-height: 1.5; color: #1f2328; }
+pre { background: #f6f8fa; padding: 1em; overflow-x: auto; border-radius: 6px; }
+code { font-family: ui-monospace, monospace; font-size: 0.9em; }
+blockquote { border-left: 4px solid #d0d7de; margin: 0; padding: 0 1em; color: #57606a; }
+img { max-width: 100%; }
+nav, .tags { margin: 1em 0; }
+.tags a { background: #ddf4ff; border-radius: 1em; padding: 0.1em 0.6em; margin-right: 0.3em; text-decoration: none; }
+li { margin: 0.4em 0; }
+"""
+
+def inline_html(text):
+    """Escape a line of markdown and render its code spans, links and bold text."""
+    import html
+    parts = text.split("`")
+    out = []
+    for i, part in enumerate(parts):
+        if i % 2 and i < len(parts) - 1:
+            out.append(f"<code>{html.escape(part)}</code>")
+            continue
+        escaped = html.escape(("`" if i % 2 else "") + part, quote=False)
+        escaped = MD_LINK.sub(lambda m: f'<a href="{html.escape(html.unescape(m.group(2) or m.group(3)))}">{m.group(1)}</a>',
+                              escaped)
+        out.append(MD_BOLD.sub(r"<strong>\1</strong>", escaped))
+    return "".join(out)
+
+def markdown_to_html(text):
+    """Render the markdown this tool writes (headings, paragraphs, fenced code, quotes and raw HTML)."""
+    import html
+    out, paragraph = [], []
+
+    def flush_paragraph():
+        if paragraph:
+            out.append("<p>" + "\n".join(inline_html(line) for line in paragraph) + "</p>")
+            paragraph.clear()
+
+    lines = iter(text.splitlines())
+    for line in lines:
+        stripped = line.strip()
+        heading = MD_HEADING.match(stripped)
+        if stripped.startswith("```"):
+            flush_paragraph()
+            language = stripped[3:].strip()
+            code = []
+            for code_line in lines:
+                if code_line.strip() == "```":
+                    break
+                code.append(code_line)
+            css_class = f' class="language-{html.escape(language)}"' if language else ""
+            out.append(f"<pre><code{css_class}>{html.escape(chr(10).join(code))}</code></pre>")
+        elif heading:
+            flush_paragraph()
+            level = len(heading.group(1))
+            out.append(f"<h{level}>{inline_html(heading.group(2))}</h{level}>")
+        elif stripped.startswith("<"):
+            # Raw HTML (image blocks, the footer, comments) runs until the next blank line
+            flush_paragraph()
+            block = [line]
+            for html_line in lines:
+                if not html_line.strip():
+                    break
+                block.append(html_line)
+            out.append("\n".join(block))
+        elif stripped.startswith(">"):
+            flush_paragraph()
+            quote = [stripped[1:].strip()]
+            for quote_line in lines:
+                if not quote_line.strip().startswith(">"):
+                    break
+                quote.append(quote_line.strip()[1:].strip())
+            out.append("<blockquote><p>" + "\n".join(inline_html(q) for q in quote) + "</p></blockquote>")
+        elif stripped in ("---", "***"):
+            flush_paragraph()
+            out.append("<hr>")
+        elif not stripped:
+            flush_paragraph()
+        else:
+            paragraph.append(stripped)
+    flush_paragraph()
+    return "\n".join(out) + "\n"
+
+def site_page(title, body, root):
+    """Wrap a rendered body in the site layout; root is the relative path back to the site root."""
+    import html
+    return (f"<!DOCTYPE html>\n<html lang='en'>\n<head>\n<meta charset='utf-8'>\n"
+            f"<meta name='viewport' content='width=device-width, initial-scale=1'>\n"
+            f"<title>{html.escape(title)}</title>\n<style>{SITE_STYLE}</style>\n</head>\n<body>\n"
+            f"<nav><a href='{root}index.html'>All writeups</a></nav>\n{body}</body>\n</html>\n")
+
+def tag_links(tags, root):
+    import html
+    from urllib.parse import quote
+    links = "".join(f"<a href='{root}{SITE_TAGS_FOLDER}/{quote(tag, safe='')}.html'>{html.escape(tag)}</a>" for tag in tags)
+    return f"<div class='tags'>{links}</div>\n" if tags else ""
+
+def writeup_signature(folder):
+    """Fingerprint of a writeup folder: name, size, mtime and inode of README.md and every asset."""
+    entries = []
+    for root in (folder, os.path.join(folder, "img")):
+        try:
+            with os.scandir(root) as it:
+                for entry in it:
+                    if entry.is_file():
+                        st = entry.stat()
+                        entries.append((os.path.relpath(entry.path, folder), st.st_size, st.st_mtime_ns, st.st_ino))
+        except FileNotFoundError:
+            pass
+    return hashlib.sha1(repr(sorted(entries)).encode()).hexdigest()
+
+def render_site_writeup(folder, output):
+    """Render one writeup folder to output/<name>/index.html with its assets linked next to it.
+
+    Runs in a worker process and returns the page details for the index.
+    """
+    name = os.path.basename(folder)
+    signature = writeup_signature(folder)
+    with open(os.path.join(folder, "README.md"), 'r') as f:
+        readme = f.read()
+    title, tags, steps = name, [], 0
+    for line in readme.splitlines():
+        if line.startswith("# ") and title == name:
+            title = line[2:].strip()
+        elif line.startswith("## ") and line[3:].strip() != "Flag":
+            steps += 1
+        elif not tags and TAGS_COMMENT.match(line.strip()):
+            tags = [t.strip() for t in TAGS_COMMENT.match(line.strip()).group(1).split(",") if t.strip()]
+    body = markdown_to_html(readme.split(FOOTER_MARKER)[0].rsplit("<div align='center'>", 1)[0]
+                            if FOOTER_MARKER in readme else readme)
+    dest = os.path.join(output, name)
+    staging = create_staging_folder(dest)
+    try:
+        with open(os.path.join(staging, "index.html"), 'w') as f:
+            f.write(site_page(title, tag_links(tags, "../") + body, "../"))
+        carry_over_files(folder, staging)
+        swap_folder(staging, dest)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+    return name, {'title': title, 'tags': tags, 'steps': steps, 'signature': signature}
+
+def write_if_changed(path, content):
+    """Write a text file unless it already holds content, so unchanged pages keep their mtime."""
+    try:
+        with open(path, 'r') as f:
+            if f.read() == content:
+                return False
+    except FileNotFoundError:
+        pass
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+    return True
+
+def cmd_site(args):
+    """Render every writeup to a static HTML site, re-rendering only the writeups that changed."""
+    import html
+    from urllib.parse import quote
+    root, output = os.path.abspath(args.path), os.path.abspath(args.output)
+    started = time.perf_counter()
+    tags_folder = os.path.join(output, SITE_TAGS_FOLDER)
+    os.makedirs(tags_folder, exist_ok=True)
+    manifest_file = os.path.join(output, ".site-manifest.json")
+    try:
+        with open(manifest_file, 'r') as f:
+            manifest = json.load(f)
+        if manifest.get('version') == 1 and "tags" not in manifest.get('pages', {}):
+            # Version 1 kept the tag pages in tags/, the name of a possible writeup folder
+            shutil.rmtree(os.path.join(output, "tags"), ignore_errors=True)
+        if manifest.get('version') != SITE_VERSION or manifest.get('source') != root:
+            raise ValueError("stale manifest")
+    except (OSError, ValueError):
+        manifest = {'version': SITE_VERSION, 'source': root, 'pages': {}}
+    pages = manifest['pages']
+
+    folders = sorted(entry.path for entry in os.scandir(root)
+                     if entry.is_dir() and os.path.isfile(os.path.join(entry.path, "README.md"))) if os.path.isdir(root) else []
+    if os.path.join(root, SITE_TAGS_FOLDER) in folders:
+        print(f"⚠️ Skipping {os.path.join(root, SITE_TAGS_FOLDER)}: {SITE_TAGS_FOLDER} is where the tag pages go, rename the folder to publish it.")
+        folders.remove(os.path.join(root, SITE_TAGS_FOLDER))
+    names = {os.path.basename(folder) for folder in folders}
+    pending = [folder for folder in folders
+               if pages.get(os.path.basename(folder), {}).get('signature') != writeup_signature(folder)
+               or not os.path.isfile(os.path.join(output, os.path.basename(folder), "index.html"))]
+    for name in set(pages) - names:
+        shutil.rmtree(os.path.join(output, name), ignore_errors=True)
+        del pages[name]
+
+    failed = 0
+    with trace_span("site", files=len(pending)):
+        if len(pending) <= 1:
+            results = []
+            for folder in pending:
+                try:
+                    results.append(render_site_writeup(folder, output))
+                except (OSError, UnicodeDecodeError) as e:
+                    failed += 1
+                    print(f"❌ {folder}: {e}")
+        else:
+            from concurrent.futures import ProcessPoolExecutor, as_completed
+            results = []
+            with ProcessPoolExecutor(max_workers=args.jobs) as executor:
+                futures = {executor.submit(run_traced, _trace['path'], render_site_writeup, folder, output): folder
+                           for folder in pending}
+                for future in as_completed(futures):
+                    try:
+                        results.append(merge_trace(future))
+                    except (OSError, UnicodeDecodeError) as e:
+                        failed += 1
+                        print(f"❌ {futures[future]}: {e}")
+        for name, page in results:
+            pages[name] = page
+
+    # The listings are cheap to rebuild, they are only rewritten when their content changes
+    by_tag = {}
+    for name, page in pages.items():
+        for tag in page['tags']:
+            by_tag.setdefault(tag, []).append(name)
+
+    def listing(names, root_prefix):
+        items = []
+        for name in sorted(names, key=lambda n: pages[n]['title'].lower()):
+            page = pages[name]
+            items.append(f"<li><a href='{root_prefix}{quote(name)}/index.html'>{html.escape(page['title'])}</a> "
+                         f"<small>{page['steps']} steps</small>{tag_links(page['tags'], root_prefix)}</li>")
+        return "<ul>\n" + "\n".join(items) + "\n</ul>\n"
+
+    tag_index = " ".join(f"<a href='{SITE_TAGS_FOLDER}/{quote(tag, safe='')}.html'>{html.escape(tag)}</a> ({len(by_tag[tag])})"
+                         for tag in sorted(by_tag))
+    write_if_changed(os.path.join(output, "index.html"), site_page(
+        "Writeups", f"<h1>Writeups ({len(pages)})</h1>\n<div class='tags'>{tag_index}</div>\n" + listing(pages, ""), ""))
+    tag_files = set()
+    for tag, tagged in by_tag.items():
+        tag_file = f"{quote(tag, safe='')}.html"
+        tag_files.add(tag_file)
+        write_if_changed(os.path.join(tags_folder, tag_file), site_page(
+            f"Tag: {tag}", f"<h1>{html.escape(tag)} ({len(tagged)})</h1>\n" + listing(tagged, "../"), "../"))
+    for entry in os.scandir(tags_folder):
+        if entry.is_file() and entry.name not in tag_files:
+            os.remove(entry.path)
+
+    tmp_path = f"{manifest_file}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, manifest_file)
+    print(f"✅ Site in {output}: {len(pending) - failed} of {len(folders)} writeups rendered, "
+          f"{len(by_tag)} tags, in {time.perf_counter() - started:.2f}s")
+    print(f"   Open {os.path.join(output, 'index.html')}")
+    return 1 if failed else 0
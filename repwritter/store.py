@@ -0,0 +1,352 @@
+"""Content-addressed object store, export manifests, image transcoding and staged folder swaps."""
+import glob
+import hashlib
+import io
+import json
+import os
+import shutil
+import stat
+import sys
+import threading
+import time
+
+from .config import DERIVED_PATH, IMAGE_FORMAT, MANIFESTS_PATH, OBJECTS_PATH
+from .tracing import trace_span
+
+TRANSCODE_VERSION = 1  # Bump to invalidate every derived image after changing the encoder settings
+COPY_CHUNK_SIZE = 1024 * 1024
+FICLONE = 0x40049409  # Linux ioctl that shares extents between two files (reflink)
+# Content hash of every source file seen in this process, keyed by (path, size, mtime)
+_digest_cache = {}
+# Whether a stored object still matched its digest, keyed by (digest, size, mtime, inode)
+_verified_objects = {}
+
+def hash_file(path):
+    """Return the sha256 hex digest of a file, reading it in chunks."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(COPY_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def object_path(digest):
+    """Path of an object in the content-addressed store."""
+    return os.path.join(OBJECTS_PATH, digest[:2], digest[2:])
+
+def object_intact(digest):
+    """True when the object exists and still hashes to digest.
+
+    Objects are read-only, but a chmod and an edit through one of their hardlinks
+    would change every copy, so content is checked once per process before it is reused.
+    """
+    try:
+        st = os.stat(object_path(digest))
+    except FileNotFoundError:
+        return False
+    key = (digest, st.st_size, st.st_mtime_ns, st.st_ino)
+    if key not in _verified_objects:
+        _verified_objects[key] = hash_file(object_path(digest)) == digest
+    return _verified_objects[key]
+
+def mark_verified(digest):
+    st = os.stat(object_path(digest))
+    _verified_objects[(digest, st.st_size, st.st_mtime_ns, st.st_ino)] = True
+
+def warn_if_modified(digest):
+    if os.path.exists(object_path(digest)):
+        print(f"⚠️ Stored object {digest[:12]} was modified through a hardlink, storing it again.")
+
+def reflink_file(source_path, dest_path):
+    """Clone source_path into dest_path sharing extents. Raises OSError when unsupported."""
+    import fcntl
+    with open(source_path, 'rb') as src, open(dest_path, 'wb') as dst:
+        try:
+            fcntl.ioctl(dst.fileno(), FICLONE, src.fileno())
+        except OSError:
+            dst.close()
+            os.unlink(dest_path)
+            raise
+
+def file_digest(source_path):
+    """Return the content hash of a file, reusing the hash while size and mtime are unchanged."""
+    st = os.stat(source_path)
+    cache_key = (os.path.abspath(source_path), st.st_size, st.st_mtime_ns)
+    digest = _digest_cache.get(cache_key)
+    if digest is None:
+        digest = hash_file(source_path)
+        _digest_cache[cache_key] = digest
+    return digest
+
+def store_object(source_path):
+    """Add a file to the object store (once per content) and return its digest."""
+    digest = file_digest(source_path)
+    target = object_path(digest)
+    if not object_intact(digest):
+        warn_if_modified(digest)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp_path = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            reflink_file(source_path, tmp_path)
+        except OSError:
+            shutil.copyfile(source_path, tmp_path)
+        # Objects are shared by every hardlink, so keep them read-only
+        os.chmod(tmp_path, 0o444)
+        os.replace(tmp_path, target)
+        mark_verified(digest)
+    return digest
+
+def store_bytes(data):
+    """Add in-memory content to the object store and return its digest."""
+    digest = hashlib.sha256(data).hexdigest()
+    target = object_path(digest)
+    if not object_intact(digest):
+        warn_if_modified(digest)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        tmp_path = f"{target}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp_path, 0o444)
+        os.replace(tmp_path, target)
+        mark_verified(digest)
+    return digest
+
+def materialize_object(digest, dest_path, mode=None, link=True):
+    """Place a stored object at dest_path as a hardlink, reflink or plain copy.
+
+    Hardlinks share the object's inode, so only outputs that are never edited by hand
+    should get one; with link=False the file is always a reflink or a copy of its own.
+    """
+    source = object_path(digest)
+    if not object_intact(digest):
+        raise OSError(f"Stored object {digest} is missing or was modified, export again to restore it")
+    if link and os.path.exists(dest_path) and os.path.samefile(source, dest_path):
+        return
+    os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+    tmp_path = f"{dest_path}.repwritter-tmp"
+    if os.path.lexists(tmp_path):
+        os.unlink(tmp_path)
+    # A hardlink shares the object's permissions, so executables get their own copy
+    executable = mode is not None and mode & 0o111
+    linked = False
+    if link and not executable:
+        try:
+            os.link(source, tmp_path)
+            linked = True
+        except OSError:
+            pass
+    if not linked:
+        try:
+            reflink_file(source, tmp_path)
+        except OSError:
+            shutil.copyfile(source, tmp_path)
+        os.chmod(tmp_path, stat.S_IMODE(mode) if mode is not None else 0o644)
+    os.replace(tmp_path, dest_path)
+
+def manifest_path(folder):
+    """Path of the build manifest for a rendered writeup folder."""
+    key = hashlib.sha1(os.path.abspath(folder).encode()).hexdigest()
+    return os.path.join(MANIFESTS_PATH, f"{key}.json")
+
+def load_manifest(folder):
+    """Load the build manifest of a folder, or an empty one."""
+    try:
+        with open(manifest_path(folder), 'r') as f:
+            manifest = json.load(f)
+        if manifest.get('folder') == os.path.abspath(folder):
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {'folder': os.path.abspath(folder), 'readme': None, 'assets': {}}
+
+def save_manifest(manifest):
+    """Atomically write a build manifest."""
+    path = manifest_path(manifest['folder'])
+    os.makedirs(MANIFESTS_PATH, exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(manifest, f)
+    os.replace(tmp_path, path)
+
+def derived_key(source_digest, width):
+    """Cache key of a transcoded image: source content plus every encoder parameter."""
+    return hashlib.sha256(f"{source_digest}:{width}:{IMAGE_FORMAT}:{TRANSCODE_VERSION}".encode()).hexdigest()
+
+def lookup_derived(key):
+    """Digest of a cached transcoded image, or None when it has to be encoded."""
+    try:
+        with open(os.path.join(DERIVED_PATH, key[:2], key[2:]), 'r') as f:
+            digest = f.read().strip()
+    except OSError:
+        return None
+    return digest if object_intact(digest) else None
+
+def record_derived(key, digest):
+    path = os.path.join(DERIVED_PATH, key[:2], key[2:])
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(digest)
+    os.replace(tmp_path, path)
+
+def transcode_image(source_path, width):
+    """Re-encode an image as IMAGE_FORMAT, no wider than width and without metadata.
+
+    Runs in a worker process and returns the encoded bytes.
+    """
+    from PIL import Image, ImageOps
+    with Image.open(source_path) as original:
+        # Apply the EXIF orientation before the metadata is dropped
+        image = ImageOps.exif_transpose(original)
+        has_alpha = image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+        image = image.convert('RGBA' if has_alpha else 'RGB')
+        if image.width > width:
+            image = image.resize((width, max(1, round(image.height * width / image.width))), Image.LANCZOS)
+        image.info = {}
+        output = io.BytesIO()
+        if IMAGE_FORMAT == 'webp':
+            image.save(output, format='WEBP', quality=90, method=6)
+        else:
+            image.save(output, format='PNG', optimize=True)
+        return output.getvalue()
+
+def transcode_images(images, jobs=None):
+    """Transcode (source path, width) pairs, using the derived-image cache. Returns {pair: digest}.
+
+    Images that cannot be decoded, or every image when Pillow is not installed, are
+    published as the original bytes.
+    """
+    digests, pending = {}, {}
+    for source_path, width in images:
+        key = derived_key(file_digest(source_path), width)
+        digest = lookup_derived(key)
+        if digest:
+            digests[(source_path, width)] = digest
+        else:
+            pending[(source_path, width)] = key
+    if not pending:
+        return digests
+
+    try:
+        import PIL  # noqa: F401
+    except ImportError:
+        print("⚠️ Pillow is not installed (pip install Pillow), images are published without conversion.")
+        for source_path, width in pending:
+            digests[(source_path, width)] = store_object(source_path)
+        return digests
+
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+    started = time.perf_counter()
+    # Batch builds already run one writeup per process, so they encode inline
+    if len(pending) == 1 or multiprocessing.parent_process() is not None:
+        executor = ThreadPoolExecutor(max_workers=1)
+    else:
+        executor = ProcessPoolExecutor(max_workers=jobs)
+    with trace_span("transcode", files=len(pending)), executor:
+        futures = {executor.submit(transcode_image, source_path, width): (source_path, width) for source_path, width in pending}
+        for future in as_completed(futures):
+            source_path, width = futures[future]
+            try:
+                digest = store_bytes(future.result())
+                record_derived(pending[(source_path, width)], digest)
+            except Exception as e:
+                print(f"⚠️ Could not convert {source_path}, publishing it unchanged: {e}")
+                digest = store_object(source_path)
+                # Remember the fallback too, so the next build does not try again
+                record_derived(pending[(source_path, width)], digest)
+            digests[(source_path, width)] = digest
+    print(f"🖼️ Converted {len(pending)} images to {IMAGE_FORMAT} in {time.perf_counter() - started:.2f}s")
+    return digests
+
+class ExportProgress:
+    """Single-line progress and throughput report for an export."""
+
+    def __init__(self, total_files, label="Exporting"):
+        self.total_files = total_files
+        self.label = label
+        self.done_files = 0
+        self.done_bytes = 0
+        self.started = time.perf_counter()
+        self.lock = threading.Lock()
+        self.interactive = sys.stdout.isatty()
+
+    def rate(self):
+        elapsed = max(time.perf_counter() - self.started, 1e-6)
+        return self.done_bytes / elapsed / (1024 * 1024)
+
+    def advance(self, size):
+        with self.lock:
+            self.done_files += 1
+            self.done_bytes += size
+            if self.interactive:
+                print(f"\r  {self.label} [{self.done_files}/{self.total_files}] "
+                      f"{self.done_bytes / (1024 * 1024):.1f} MB at {self.rate():.1f} MB/s", end="", flush=True)
+
+    def finish(self, written_files):
+        if self.interactive and self.total_files:
+            print()
+        print(f"📦 Checked {self.done_files} assets, wrote {written_files} "
+              f"({self.done_bytes / (1024 * 1024):.1f} MB) in {time.perf_counter() - self.started:.2f}s "
+              f"({self.rate():.1f} MB/s)")
+
+def process_alive(pid):
+    """True when a process with this PID exists, even if it belongs to another user."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+def create_staging_folder(folder):
+    """Create an empty staging folder next to folder, removing leftovers of interrupted runs.
+
+    Staging folders end in the PID of the process that made them, so the ones of exports
+    still running in other processes are left alone.
+    """
+    parent, name = os.path.split(os.path.abspath(folder))
+    os.makedirs(parent, exist_ok=True)
+    prefix = f".{name}.staging-"
+    for leftover in glob.glob(os.path.join(parent, glob.escape(prefix) + "*")):
+        pid = os.path.basename(leftover)[len(prefix):]
+        if pid.isdigit() and (int(pid) == os.getpid() or not process_alive(int(pid))):
+            shutil.rmtree(leftover, ignore_errors=True)
+    staging = os.path.join(parent, f".{name}.staging-{os.getpid()}")
+    os.makedirs(os.path.join(staging, "img"))
+    return staging
+
+def carry_over_files(folder, staging):
+    """Link every file of the live folder that the export did not replace into staging."""
+    if not os.path.isdir(folder):
+        return
+    for root, dirs, files in os.walk(folder):
+        target_root = os.path.join(staging, os.path.relpath(root, folder))
+        os.makedirs(target_root, exist_ok=True)
+        for name in files:
+            source = os.path.join(root, name)
+            target = os.path.join(target_root, name)
+            if os.path.lexists(target):
+                continue
+            if os.path.islink(source):
+                os.symlink(os.readlink(source), target)
+                continue
+            try:
+                os.link(source, target)
+            except OSError:
+                shutil.copy2(source, target)
+
+def swap_folder(staging, folder):
+    """Move a finished staging folder into place with renames, keeping the old folder on failure."""
+    if not os.path.exists(folder):
+        os.rename(staging, folder)
+        return
+    parent, name = os.path.split(os.path.abspath(folder))
+    backup = os.path.join(parent, f".{name}.old-{os.getpid()}")
+    os.rename(folder, backup)
+    try:
+        os.rename(staging, folder)
+    except OSError:
+        os.rename(backup, folder)
+        raise
+    shutil.rmtree(backup, ignore_errors=True)
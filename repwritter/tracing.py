@@ -0,0 +1,101 @@
+"""Chrome/Perfetto trace spans and timed git commands."""
+import contextlib
+import os
+import sys
+import time
+
+# Spans recorded with --trace / REPWRITTER_TRACE, written out in Chrome trace format
+_trace = {'path': None, 'events': []}
+
+def enable_tracing(path):
+    """Record spans from now on and write them to path when the program exits."""
+    import atexit
+    _trace['path'] = os.path.abspath(path)
+    _trace['events'].append({'name': 'process_name', 'ph': 'M', 'pid': os.getpid(),
+                             'args': {'name': f"repwritter {' '.join(sys.argv[1:2]) or 'menu'}"}})
+    atexit.register(write_trace)
+
+@contextlib.contextmanager
+def trace_span(name, **args):
+    """Time the enclosed block as a trace span. Yields its args so callers can add counts."""
+    if not _trace['path']:
+        yield args
+        return
+    started = time.perf_counter()
+    try:
+        yield args
+    finally:
+        import threading
+        _trace['events'].append({
+            'name': name, 'ph': 'X', 'pid': os.getpid(), 'tid': threading.get_ident(),
+            'ts': started * 1e6, 'dur': (time.perf_counter() - started) * 1e6, 'args': args
+        })
+
+def run_traced(trace_path, function, *args):
+    """Call function inside a worker process and return (result, spans it recorded).
+
+    Worker processes never write the trace themselves, so the parent adds the returned
+    spans to its own with merge_trace.
+    """
+    _trace['path'] = trace_path
+    first_event = len(_trace['events'])
+    result = function(*args)
+    events = _trace['events'][first_event:]
+    del _trace['events'][first_event:]
+    return result, events
+
+def merge_trace(future):
+    """Result of a run_traced future, keeping the spans the worker recorded."""
+    result, events = future.result()
+    _trace['events'].extend(events)
+    return result
+
+def write_trace():
+    import json
+    if not _trace['path']:
+        return
+    tmp_path = f"{_trace['path']}.{os.getpid()}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump({'traceEvents': _trace['events'], 'displayTimeUnit': 'ms'}, f)
+    os.replace(tmp_path, _trace['path'])
+
+def print_trace_summary(first_event):
+    """Print one line with the time, files and bytes per span recorded since first_event, and save the trace."""
+    events = [e for e in _trace['events'][first_event:] if e['ph'] == 'X']
+    if not events:
+        return
+    totals = {}
+    for event in events:
+        total = totals.setdefault(event['name'], {'dur': 0, 'files': 0, 'bytes': 0})
+        total['dur'] += event['dur']
+        total['files'] += event['args'].get('files', 0)
+        total['bytes'] += event['args'].get('bytes', 0)
+    parts = []
+    for name, total in totals.items():
+        counts = []
+        if total['files']:
+            counts.append(f"{total['files']} files")
+        if total['bytes'] >= 1024 * 1024:
+            counts.append(f"{total['bytes'] / (1024 * 1024):.1f} MB")
+        elif total['bytes']:
+            counts.append(f"{total['bytes'] / 1024:.1f} KB")
+        parts.append(f"{name} {total['dur'] / 1e6:.2f}s" + (f" ({', '.join(counts)})" if counts else ""))
+    wall = (max(e['ts'] + e['dur'] for e in events) - min(e['ts'] for e in events)) / 1e6
+    write_trace()
+    print(f"⏱️ {wall:.2f}s: " + " · ".join(parts) + f" · trace: {_trace['path']}")
+
+def run_git(args, cwd, timings=None, check=True, **kwargs):
+    """Run a git command in cwd with literal pathspecs, recording its duration in timings."""
+    import subprocess
+    started = time.perf_counter()
+    try:
+        with trace_span(f"git {args[0]}", argv=" ".join(args[:6])):
+            return subprocess.run(["git", "--literal-pathspecs", *args], cwd=cwd, check=check, **kwargs)
+    finally:
+        if timings is not None:
+            timings.append((args[0], time.perf_counter() - started))
+
+def print_git_timings(timings):
+    # With tracing on, the trace summary already breaks the git time down
+    if timings and not _trace['path']:
+        print("⏱️ " + " · ".join(f"git {command} {elapsed:.2f}s" for command, elapsed in timings))
@@ -0,0 +1,245 @@
+"""The watch command: rebuild writeups as their saved state and source files change."""
+import contextlib
+import io
+import json
+import os
+import time
+from datetime import datetime
+
+from .batch import expand_spec_paths
+from .config import SAVED_WRITEUPS_PATH
+from .generator import WriteupGenerator
+
+WATCH_DEBOUNCE = 0.15  # seconds without events that end a burst of changes
+WATCH_DEBOUNCE_MAX = 1.0  # rebuild at least this often while files keep changing
+WATCH_POLL_INTERVAL = 0.5
+
+class InotifyWatcher:
+    """Report changed paths inside a set of directories, using Linux inotify through ctypes."""
+
+    IN_DELETE_SELF, IN_MOVE_SELF, IN_IGNORED = 0x400, 0x800, 0x8000
+    # IN_ATTRIB, IN_CLOSE_WRITE, IN_MOVED_FROM, IN_MOVED_TO, IN_CREATE, IN_DELETE, IN_DELETE_SELF, IN_MOVE_SELF
+    MASK = 0x4 | 0x8 | 0x40 | 0x80 | 0x100 | 0x200 | 0x400 | 0x800
+
+    def __init__(self):
+        import ctypes
+        self.libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs = {}  # watch descriptor -> directory
+        self.lost = set()  # watched directories that were deleted or moved away, watched again once they are back
+
+    def watch(self, directories):
+        for directory in set(directories) - set(self.dirs.values()):
+            wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK)
+            if wd >= 0:
+                self.dirs[wd] = directory
+                self.lost.discard(directory)
+
+    def restore_lost(self):
+        """Watch the lost directories that exist again. Returns their files, which may have changed meanwhile."""
+        changed = set()
+        for directory in [d for d in self.lost if os.path.isdir(d)]:
+            self.watch([directory])
+            if directory not in self.lost:
+                with contextlib.suppress(OSError), os.scandir(directory) as it:
+                    changed.update(entry.path for entry in it)
+        return changed
+
+    def wait(self, timeout):
+        """Return the set of paths changed within timeout seconds (empty when nothing happened)."""
+        import select
+        import struct
+        changed = self.restore_lost()
+        if changed or not select.select([self.fd], [], [], timeout)[0]:
+            return changed
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return changed
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = struct.unpack_from("iIII", data, offset)
+            name = data[offset + 16:offset + 16 + length].rstrip(b"\0")
+            offset += 16 + length
+            if wd not in self.dirs:
+                continue
+            if mask & (self.IN_DELETE_SELF | self.IN_MOVE_SELF | self.IN_IGNORED):
+                # Exports swap whole folders, so the path is usually back already under a new inode
+                directory = self.dirs.pop(wd)
+                if mask & self.IN_MOVE_SELF:
+                    self.libc.inotify_rm_watch(self.fd, wd)
+                self.lost.add(directory)
+                continue
+            if name:
+                changed.add(os.path.join(self.dirs[wd], os.fsdecode(name)))
+        # Also covers a lost directory created or moved back inside another watched one (IN_CREATE/IN_MOVED_TO)
+        return changed | self.restore_lost()
+
+class PollingWatcher:
+    """Same interface as InotifyWatcher, comparing stat results of every file in the watched directories."""
+
+    def __init__(self):
+        self.dirs = set()
+        self.snapshot = {}
+
+    def scan(self):
+        snapshot = {}
+        for directory in self.dirs:
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        try:
+                            st = entry.stat()
+                            snapshot[entry.path] = (st.st_size, st.st_mtime_ns, st.st_ino)
+                        except OSError:
+                            pass
+            except OSError:
+                pass
+        return snapshot
+
+    def watch(self, directories):
+        self.dirs |= set(directories)
+        self.snapshot = self.scan()
+
+    def wait(self, timeout):
+        deadline = time.monotonic() + timeout
+        while True:
+            snapshot = self.scan()
+            changed = {path for path in set(snapshot) | set(self.snapshot)
+                       if snapshot.get(path) != self.snapshot.get(path)}
+            self.snapshot = snapshot
+            if changed or time.monotonic() >= deadline:
+                return changed
+            time.sleep(min(WATCH_POLL_INTERVAL, max(0, deadline - time.monotonic())))
+
+def watched_paths(generator):
+    """Every source file a writeup is built from."""
+    paths = [path for _, path in generator.images]
+    paths += [info[1] for _, _, _, info in generator.steps if info]
+    paths += [path for _, path in generator.files]
+    return {os.path.abspath(os.path.expanduser(path)) for path in paths}
+
+def reload_spec(spec_path, generator=None):
+    """Load a saved state into generator, keeping the rendered fragments of every unchanged section."""
+    with open(spec_path, 'r') as f:
+        state = json.load(f)
+    if generator is None:
+        generator = WriteupGenerator(state.get('repo_path') or "")
+        generator.apply_state(state)
+        generator.link_references()
+        return generator
+    keys = set(generator.input_order)
+    previous = {key: generator.section_value(*key) for key in keys if key[0] != 'title'}
+    previous_title = (generator.title, list(generator.tags))
+    fragments = generator.fragments
+    generator.apply_state(state)
+    generator.link_references()
+    for key, fragment in fragments.items():
+        if key not in generator.input_order:
+            continue
+        if key[0] == 'title':
+            unchanged = previous_title == (generator.title, list(generator.tags))
+        else:
+            try:
+                unchanged = json.dumps(previous.get(key)) == json.dumps(generator.section_value(*key))
+            except (IndexError, KeyError):
+                unchanged = False
+        if unchanged:
+            generator.fragments[key] = fragment
+    return generator
+
+def cmd_watch(args):
+    """Regenerate writeups whenever their saved state or one of their source files changes."""
+    follow_folder = not args.specs
+    spec_paths = [os.path.abspath(p) for p in expand_spec_paths(args.specs or [SAVED_WRITEUPS_PATH])]
+    try:
+        watcher = PollingWatcher() if args.poll else InotifyWatcher()
+    except (OSError, AttributeError) as e:
+        print(f"⚠️ inotify is not available ({e}), polling every {WATCH_POLL_INTERVAL}s instead.")
+        watcher = PollingWatcher()
+
+    generators, sources = {}, {}
+
+    def load(spec_path):
+        try:
+            generators[spec_path] = reload_spec(spec_path, generators.get(spec_path))
+            sources[spec_path] = watched_paths(generators[spec_path])
+        except (OSError, ValueError) as e:
+            print(f"❌ {spec_path}: {e}")
+            generators.pop(spec_path, None)
+            sources.pop(spec_path, None)
+            return False
+        return True
+
+    def build(spec_path):
+        started = time.perf_counter()
+        generator = generators[spec_path]
+        missing = [path for path in sources[spec_path] if not os.path.isfile(path)]
+        if missing:
+            # A screenshot that is still being written, or a path typed by hand; wait for the next change
+            print(f"⏳ {os.path.basename(spec_path)}: waiting for {', '.join(os.path.basename(m) for m in missing)}")
+            return
+        output = io.StringIO()
+        with contextlib.redirect_stdout(output):
+            readme_path = generator.generate_writeup()
+        if readme_path:
+            print(f"✅ {datetime.now():%H:%M:%S} {readme_path} ({time.perf_counter() - started:.2f}s)")
+        else:
+            lines = output.getvalue().strip().splitlines()
+            print(f"❌ {os.path.basename(spec_path)}: {lines[-1].strip(' ❌⚠️') if lines else 'generation failed'}")
+
+    for spec_path in spec_paths:
+        if load(spec_path):
+            build(spec_path)
+
+    def rewatch():
+        directories = {os.path.dirname(path) for paths in sources.values() for path in paths}
+        directories |= {os.path.dirname(spec_path) for spec_path in spec_paths}
+        if follow_folder:
+            directories.add(os.path.abspath(SAVED_WRITEUPS_PATH))
+        watcher.watch(d for d in directories if os.path.isdir(d))
+
+    rewatch()
+    kind = "inotify" if isinstance(watcher, InotifyWatcher) else "polling"
+    print(f"👀 Watching {len(generators)} writeups and {sum(len(p) for p in sources.values())} files ({kind}). "
+          "Press Ctrl+C to stop.")
+    try:
+        while True:
+            changed = watcher.wait(1.0)
+            if not changed:
+                continue
+            # Editors and screenshot tools touch files several times in a row; wait for the burst to end
+            deadline = time.monotonic() + WATCH_DEBOUNCE_MAX
+            while time.monotonic() < deadline:
+                more = watcher.wait(WATCH_DEBOUNCE)
+                if not more:
+                    break
+                changed |= more
+
+            affected = set()
+            for path in changed:
+                if path in spec_paths or (follow_folder and path.endswith(".json")
+                                          and os.path.dirname(path) == os.path.abspath(SAVED_WRITEUPS_PATH)):
+                    if not os.path.isfile(path):
+                        continue
+                    if path not in spec_paths:
+                        spec_paths.append(path)
+                    if load(path):
+                        affected.add(path)
+                for spec_path, paths in sources.items():
+                    if path in paths:
+                        affected.add(spec_path)
+                        # The size of an attachment decides whether the README links its pointer file
+                        generator = generators[spec_path]
+                        for index, (_, source_path) in enumerate(generator.files):
+                            if os.path.abspath(os.path.expanduser(source_path)) == path:
+                                generator.fragments.pop(('file', index), None)
+            for spec_path in sorted(affected):
+                if spec_path in generators:
+                    build(spec_path)
+            rewatch()
+    except KeyboardInterrupt:
+        print("\nStopped watching.")
+    return 0
@@ -0,0 +1,7 @@
+import os
+import sys
+import tempfile
+
+# repwritter resolves its folders from HOME at import time, so the tests get a throwaway one
+os.environ["HOME"] = tempfile.mkdtemp(prefix="repwritter-tests-")
+sys.path.insert(0, os.path.normpath(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir)))
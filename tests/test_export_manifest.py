@@ -0,0 +1,95 @@
+import base64
+import os
+
+import pytest
+
+from repwritter import generator as generator_module
+from repwritter import store
+from repwritter.generator import WriteupGenerator
+
+PNG = base64.b64decode("iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg==")
+LARGER_PNG = base64.b64decode("iVBORw0KGgoAAAANSUhEUgAAAAIAAAACCAIAAAD91JpzAAAAFklEQVR4nGM8wcXFwMDAxMDAwMDAAAALOADgEfTV1gAAAABJRU5ErkJggg==")
+
+
+@pytest.fixture
+def calls(tmp_path, monkeypatch):
+    """Record what every export transcodes and writes."""
+    monkeypatch.setattr(store, "MANIFESTS_PATH", str(tmp_path / "manifests"))
+    recorded = {'transcoded': [], 'written': []}
+    transcode_images, materialize_object = store.transcode_images, store.materialize_object
+
+    def recording_transcode(images, jobs=None):
+        recorded['transcoded'].extend(images)
+        return transcode_images(images, jobs)
+
+    def recording_materialize(digest, dest_path, mode=None, link=True):
+        recorded['written'].append(os.path.basename(dest_path))
+        return materialize_object(digest, dest_path, mode, link)
+
+    monkeypatch.setattr(generator_module, "transcode_images", recording_transcode)
+    monkeypatch.setattr(generator_module, "materialize_object", recording_materialize)
+    return recorded
+
+
+def make_writeup(tmp_path):
+    (tmp_path / "machine.png").write_bytes(PNG)
+    (tmp_path / "notes.txt").write_text("nothing to see\n")
+    writeup = WriteupGenerator(str(tmp_path))
+    writeup.title = "Manifest Box"
+    writeup.images = [("machine", str(tmp_path / "machine.png"))]
+    writeup.files = [("notes.txt", str(tmp_path / "notes.txt"))]
+    writeup.input_order = [('title', None), ('image', 0), ('file', 0)]
+    return writeup
+
+
+def export(writeup, folder, calls):
+    for recorded in calls.values():
+        recorded.clear()
+    changed, manifest = writeup.export_writeup(str(folder), writeup.markdown, jobs=1)
+    store.save_manifest(manifest)
+    return sorted(changed)
+
+
+def test_unchanged_rebuild_skips_transcode_and_write(tmp_path, calls):
+    writeup = make_writeup(tmp_path)
+    folder = tmp_path / "out" / "Manifest Box"
+    image = f"machine.{generator_module.IMAGE_FORMAT}"
+
+    assert export(writeup, folder, calls) == ["README.md", f"img/{image}", "notes.txt"]
+    assert calls['transcoded'] == [(str(tmp_path / "machine.png"), generator_module.MACHINE_IMAGE_WIDTH)]
+    assert sorted(calls['written']) == [image, "notes.txt"]
+
+    assert export(writeup, folder, calls) == []
+    assert calls == {'transcoded': [], 'written': []}
+    assert sorted(os.listdir(folder)) == ["README.md", "img", "notes.txt"]
+
+
+def test_new_source_size_invalidates_the_entry(tmp_path, calls):
+    writeup = make_writeup(tmp_path)
+    folder = tmp_path / "out" / "Manifest Box"
+    image = f"machine.{generator_module.IMAGE_FORMAT}"
+    export(writeup, folder, calls)
+
+    # Same name, different content and size, e.g. a screenshot taken again
+    (tmp_path / "machine.png").write_bytes(LARGER_PNG)
+
+    assert export(writeup, folder, calls) == [f"img/{image}"]
+    assert calls['transcoded'] == [(str(tmp_path / "machine.png"), generator_module.MACHINE_IMAGE_WIDTH)]
+    assert calls['written'] == [image]
+
+
+def test_new_image_format_invalidates_the_entry(tmp_path, calls, monkeypatch):
+    writeup = make_writeup(tmp_path)
+    folder = tmp_path / "out" / "Manifest Box"
+    export(writeup, folder, calls)
+
+    monkeypatch.setattr(generator_module, "IMAGE_FORMAT", "webp")
+    monkeypatch.setattr(store, "IMAGE_FORMAT", "webp")
+    writeup.fragments.clear()
+
+    changed = export(writeup, folder, calls)
+
+    assert "img/machine.webp" in changed
+    assert calls['transcoded'] == [(str(tmp_path / "machine.png"), generator_module.MACHINE_IMAGE_WIDTH)]
+    assert calls['written'] == ["machine.webp"]
+    assert "notes.txt" not in changed
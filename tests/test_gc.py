@@ -0,0 +1,69 @@
+import argparse
+
+import pytest
+
+from repwritter import cleanup, store
+
+README = """# Box
+
+<div align='center'>
+  <img src='img/machine shot.png' width='400' alt='Machine Image'>
+</div>
+
+![scan](img/nmap.png?raw=true) ![login](img/login%20form.png#top)
+<img src="img/root shell.png" width="600">
+![notes](<img/user flag.png> "user")
+"""
+USED = ["machine shot.png", "nmap.png", "login form.png", "root shell.png", "user flag.png"]
+
+
+@pytest.fixture
+def writeups(tmp_path, monkeypatch):
+    monkeypatch.setattr(cleanup, "WRITEUPS_PATH", str(tmp_path / "writeups"))
+    monkeypatch.setattr(cleanup, "MANIFESTS_PATH", str(tmp_path / "manifests"))
+    monkeypatch.setattr(cleanup, "SAVED_WRITEUPS_PATH", str(tmp_path / "saved_writeups"))
+    monkeypatch.setattr(store, "MANIFESTS_PATH", str(tmp_path / "manifests"))
+    return tmp_path / "writeups"
+
+
+def make_folder(writeups, name, exported=True):
+    folder = writeups / name
+    (folder / "img").mkdir(parents=True)
+    (folder / "README.md").write_text(README)
+    for image in USED + ["unused.png"]:
+        (folder / "img" / image).write_bytes(image.encode())
+    if exported:
+        store.save_manifest({'folder': str(folder), 'readme': "0" * 64, 'assets': {}})
+    return folder
+
+
+def run_gc(delete):
+    return cleanup.cmd_gc(argparse.Namespace(delete=delete, jobs=1))
+
+
+def test_dry_run_lists_only_unreferenced_images(writeups, capsys):
+    folder = make_folder(writeups, "Box")
+
+    assert run_gc(delete=False) == 0
+
+    output = capsys.readouterr().out
+    assert "img/unused.png" in output
+    assert not any(f"img/{image}" in output for image in USED)
+    assert sorted(path.name for path in (folder / "img").iterdir()) == sorted(USED + ["unused.png"])
+
+
+def test_delete_keeps_images_linked_with_spaces_queries_and_html(writeups):
+    folder = make_folder(writeups, "Box")
+
+    assert run_gc(delete=True) == 0
+
+    assert sorted(path.name for path in (folder / "img").iterdir()) == sorted(USED)
+
+
+def test_delete_skips_folders_without_a_manifest(writeups, capsys):
+    folder = make_folder(writeups, "Hand Written", exported=False)
+
+    assert run_gc(delete=True) == 0
+
+    assert "img/unused.png" in capsys.readouterr().out
+    assert (folder / "img" / "unused.png").exists()
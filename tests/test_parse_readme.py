@@ -0,0 +1,77 @@
+import base64
+import os
+
+import pytest
+
+from repwritter.config import FOOTER_MARKDOWN
+from repwritter.generator import WriteupGenerator
+
+PNG = base64.b64decode("iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg==")
+
+
+def write_image(folder, name):
+    path = os.path.join(folder, f"{name}.png")
+    with open(path, 'wb') as f:
+        f.write(PNG)
+    return path
+
+
+def make_writeup(tmp_path, title, steps, flags=(), tags=()):
+    """A generator holding a machine image, the given steps and flags, in that order."""
+    generator = WriteupGenerator(str(tmp_path))
+    generator.title = title
+    generator.tags = list(tags)
+    generator.images = [("machine", write_image(tmp_path, "machine"))]
+    generator.steps = list(steps)
+    generator.flags = list(flags)
+    generator.input_order = ([('title', None), ('image', 0)] + [('step', i) for i in range(len(steps))]
+                             + [('flag', i) for i in range(len(flags))])
+    generator.sections = {'title': True, 'image': True, 'description': bool(steps)}
+    return generator
+
+
+def round_trip(generator):
+    """Generate the README, load it back like option L does and return (written, rendered again)."""
+    readme_path = generator.generate_writeup()
+    assert readme_path
+    with open(readme_path) as f:
+        written = f.read()
+    loaded = WriteupGenerator(generator.repo_path)
+    with open(readme_path) as f:
+        loaded.import_readme(f, os.path.dirname(readme_path))
+    return written, loaded, loaded.markdown + FOOTER_MARKDOWN
+
+
+def test_generated_readme_renders_back_identically(tmp_path):
+    step_image = ("enum", write_image(tmp_path, "enum"))
+    generator = make_writeup(tmp_path, "Round Trip", [
+        ("Enumeration", ["Open ports:", "", "- 22 ssh", "- 80 http"], "nmap -sCV 10.10.10.10", step_image),
+        ("Foothold", ["The login form is injectable."], None, None),
+        ("Privilege Escalation", ["sudo -l shows vim."], "sudo vim -c ':!/bin/sh'", None),
+    ], flags=["HTB{round_trip_user}", "HTB{round_trip_root}"], tags=["linux", "easy"])
+
+    written, loaded, rendered = round_trip(generator)
+
+    assert rendered == written
+    assert loaded.tags == ["linux", "easy"]
+    assert [step[0] for step in loaded.steps] == ["Enumeration", "Foothold", "Privilege Escalation"]
+    assert loaded.steps[0][2] == "nmap -sCV 10.10.10.10"
+    assert loaded.steps[0][3][0] == "enum"
+    assert not loaded.raw_blocks
+
+
+@pytest.mark.parametrize("description, oneliner", [
+    # Pasted tool output that looks like markdown must not open sections
+    (["```", "## not a heading", "<div align='center'>", "```"], None),
+    # A one-line bash block inside the description, followed by more text
+    (["```bash", " id", "```", "", "Then read the flag."], "cat /root/root.txt"),
+    # A description ending in a code block, with no one-liner after it
+    (["```python", "print('hi')", "```"], None),
+])
+def test_code_blocks_in_descriptions_render_back_identically(tmp_path, description, oneliner):
+    generator = make_writeup(tmp_path, "Code Blocks", [("Notes", description, oneliner, None)])
+
+    written, loaded, rendered = round_trip(generator)
+
+    assert rendered == written
+    assert loaded.steps == [("Notes", description, oneliner, None)]
@@ -0,0 +1,98 @@
+import base64
+import json
+import subprocess
+
+import pytest
+
+from repwritter import publish
+from repwritter.cli import parse_args
+
+PNG = base64.b64decode("iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg==")
+
+
+def git(repo, *args):
+    return subprocess.run(["git", *args], cwd=repo, check=True, capture_output=True, text=True).stdout
+
+
+@pytest.fixture
+def repo(tmp_path, monkeypatch):
+    for key in ("GIT_AUTHOR_NAME", "GIT_COMMITTER_NAME"):
+        monkeypatch.setenv(key, "tests")
+    for key in ("GIT_AUTHOR_EMAIL", "GIT_COMMITTER_EMAIL"):
+        monkeypatch.setenv(key, "tests@localhost")
+    repo = tmp_path / "repo"
+    repo.mkdir()
+    git(repo, "init", "-q", "-b", "main")
+    (repo / "LICENSE").write_text("MIT\n")
+    git(repo, "add", "LICENSE")
+    git(repo, "commit", "-q", "-m", "Initial commit")
+    return repo
+
+
+@pytest.fixture
+def pushes(monkeypatch):
+    queued = []
+    monkeypatch.setattr(publish, "enqueue_push", lambda repo_dir, title: queued.append(title))
+    return queued
+
+
+def write_spec(tmp_path, title, notes):
+    (tmp_path / "machine.png").write_bytes(PNG)
+    (tmp_path / "notes.txt").write_text(notes)
+    state = {
+        'title': title,
+        'images': [["machine", str(tmp_path / "machine.png")]],
+        'steps': [["Enumeration", ["Open ports: 22, 80."], "nmap -sCV 10.10.10.10", None]],
+        'files': [["notes.txt", str(tmp_path / "notes.txt")]],
+        'input_order': [["title", None], ["image", 0], ["step", 0], ["file", 0]],
+    }
+    spec_path = tmp_path / "spec.json"
+    spec_path.write_text(json.dumps(state))
+    return str(spec_path)
+
+
+def run_publish(spec_path, repo):
+    return publish.cmd_publish(parse_args(["publish", spec_path, "--repo", str(repo), "-j", "1"]))
+
+
+def test_publish_commits_the_writeup_tree_and_leaves_a_clean_checkout(tmp_path, repo, pushes):
+    spec_path = write_spec(tmp_path, "My Box", "creds: none\n")
+
+    assert run_publish(spec_path, repo) == 0
+
+    assert git(repo, "ls-tree", "-r", "--name-only", "HEAD").splitlines() == [
+        "LICENSE", "My Box/README.md", "My Box/img/machine.png", "My Box/notes.txt"]
+    assert git(repo, "show", "HEAD:My Box/notes.txt") == "creds: none\n"
+    assert git(repo, "show", "HEAD:My Box/README.md") == (repo / "My Box" / "README.md").read_text()
+    assert git(repo, "log", "-1", "--format=%s") == "Add writeup: My Box\n"
+    assert git(repo, "status", "--porcelain", "--untracked-files=all") == ""
+    assert pushes == ["My Box"]
+
+
+def test_publish_without_changes_makes_no_commit(tmp_path, repo, pushes, capsys):
+    spec_path = write_spec(tmp_path, "My Box", "creds: none\n")
+    assert run_publish(spec_path, repo) == 0
+    head = git(repo, "rev-parse", "HEAD")
+
+    assert run_publish(spec_path, repo) == 0
+
+    assert "nothing to commit" in capsys.readouterr().out
+    assert git(repo, "rev-parse", "HEAD") == head
+    assert git(repo, "status", "--porcelain", "--untracked-files=all") == ""
+    assert pushes == ["My Box"]
+
+
+def test_publish_lists_a_staged_rename_once(tmp_path, repo, pushes, capsys):
+    spec_path = write_spec(tmp_path, "My Box", "creds: none\n")
+    assert run_publish(spec_path, repo) == 0
+    head = git(repo, "rev-parse", "HEAD")
+    git(repo, "mv", "My Box/notes.txt", "My Box/old notes.txt")
+    (tmp_path / "notes.txt").write_text("creds: admin\n")
+    capsys.readouterr()
+
+    assert run_publish(spec_path, repo) == 1
+
+    output = capsys.readouterr().out
+    assert "1 uncommitted change(s)" in output
+    assert "   My Box/old notes.txt\n" in output
+    assert git(repo, "rev-parse", "HEAD") == head
@@ -0,0 +1,63 @@
+import subprocess
+import time
+
+import pytest
+
+from repwritter import push_queue
+
+
+@pytest.fixture
+def queue(tmp_path, monkeypatch):
+    monkeypatch.setattr(push_queue, "REPWRITTER_PATH", str(tmp_path))
+    monkeypatch.setattr(push_queue, "PUBLISH_QUEUE_PATH", str(tmp_path / "publish_queue"))
+    monkeypatch.setattr(push_queue, "PUBLISH_LOCK_PATH", str(tmp_path / "publish.lock"))
+    pushes = []
+
+    def fake_git(args, cwd, **kwargs):
+        pushes.append((cwd, *args))
+        return subprocess.CompletedProcess(args, 0, "", "")
+
+    monkeypatch.setattr(push_queue, "run_git", fake_git)
+    return tmp_path / "publish_queue", pushes
+
+
+def queue_job(queue_path, title):
+    queue_path.mkdir(exist_ok=True)
+    job = {'repo': "/repo", 'remote': "origin", 'branch': "main", 'commit': "0" * 40, 'title': title,
+           'queued_at': time.time(), 'attempts': 0, 'next_attempt': 0, 'last_error': None}
+    push_queue.write_job(str(queue_path / f"{time.time_ns()}.json"), job)
+
+
+def test_job_queued_while_worker_holds_the_lock_is_pushed(queue, monkeypatch):
+    queue_path, pushes = queue
+    started = []
+    real_load = push_queue.load_publish_jobs
+
+    def racing_load():
+        jobs = real_load()
+        if not jobs and not started:
+            # enqueue_push right after the worker found the queue empty: the lock is still
+            # held, so the new worker it starts gives up at once
+            queue_job(queue_path, "Late Box")
+            with push_queue.publish_lock() as acquired:
+                assert not acquired
+            started.append(True)
+        return jobs
+
+    monkeypatch.setattr(push_queue, "load_publish_jobs", racing_load)
+
+    assert push_queue.drain_publish_queue(log=lambda message: None) == 0
+
+    assert pushes == [("/repo", "push", "origin", "main")]
+    assert real_load() == []
+
+
+def test_drain_pushes_each_branch_once(queue):
+    queue_path, pushes = queue
+    queue_job(queue_path, "Box 1")
+    queue_job(queue_path, "Box 2")
+
+    assert push_queue.drain_publish_queue(log=lambda message: None) == 0
+
+    assert pushes == [("/repo", "push", "origin", "main")]
+    assert not any(queue_path.iterdir())
@@ -0,0 +1,98 @@
+from repwritter import generator as generator_module
+from repwritter.generator import WriteupGenerator
+from repwritter.sessions import SessionStore
+
+
+def new_session(tmp_path):
+    writeup = WriteupGenerator(str(tmp_path))
+    writeup.store = SessionStore(str(tmp_path / "sessions.db"))
+    writeup.writeup_name = "box"
+    return writeup
+
+
+def edit(writeup, input_type, index, value):
+    """Change one section the way the menu options do."""
+    if input_type == 'title':
+        writeup.title = value
+        writeup.sections['title'] = True
+    else:
+        items = {'step': writeup.steps, 'flag': writeup.flags}[input_type]
+        if index < len(items):
+            items[index] = value
+        else:
+            items.append(value)
+        if input_type == 'step':
+            writeup.sections['description'] = True
+    if (input_type, index) not in writeup.input_order:
+        writeup.input_order.append((input_type, index))
+    writeup.mark_changed(input_type, index)
+
+
+def make_edits(writeup, steps):
+    edit(writeup, 'title', None, "Journal Box")
+    for i in range(steps):
+        edit(writeup, 'step', i, (f"Step {i}", [f"draft {i}"], None, None))
+        edit(writeup, 'step', i, (f"Step {i}", [f"line {i}", "", "- item"], f"id #{i}", None))
+    edit(writeup, 'flag', 0, "HTB{journal_flag}")
+
+
+def recovered(tmp_path):
+    """What the L option rebuilds after the program was killed: a fresh process and connection."""
+    writeup = WriteupGenerator(str(tmp_path))
+    writeup.store = SessionStore(str(tmp_path / "sessions.db"))
+    replayed = writeup.restore_session("box")
+    return writeup, replayed
+
+
+def test_unsaved_edits_are_replayed_after_a_crash(tmp_path):
+    writeup = new_session(tmp_path)
+    make_edits(writeup, steps=3)
+    # Killed without saving: the connection just goes away
+    writeup.store.conn.close()
+
+    restored, replayed = recovered(tmp_path)
+
+    # The first change becomes the snapshot, every later one a journal record
+    assert replayed == 1 + 3 * 2
+    assert restored.title == "Journal Box"
+    assert restored.steps == writeup.steps
+    assert restored.flags == ["HTB{journal_flag}"]
+    assert restored.input_order == writeup.input_order
+    assert restored.markdown == writeup.markdown
+
+
+def test_journal_is_compacted_into_the_snapshot(tmp_path, monkeypatch):
+    monkeypatch.setattr(generator_module, "JOURNAL_COMPACT_EVERY", 4)
+    writeup = new_session(tmp_path)
+    make_edits(writeup, steps=5)
+    writeup.store.conn.close()
+
+    store = SessionStore(str(tmp_path / "sessions.db"))
+    state, records, _ = store.load("box")
+    # 11 records after the snapshot, compacted after every 4th: 3 remain
+    assert len(records) == 3
+    assert store.conn.execute("SELECT COUNT(*) FROM journal WHERE session = 'box'").fetchone()[0] == 3
+    assert [step[0] for step in state['steps']] == [f"Step {i}" for i in range(4)]
+
+    restored, replayed = recovered(tmp_path)
+
+    assert replayed == 3
+    assert restored.steps == writeup.steps
+    assert restored.flags == writeup.flags
+    assert restored.markdown == writeup.markdown
+
+
+def test_linking_a_saved_reference_counts_its_use(tmp_path):
+    store = SessionStore(str(tmp_path / "sessions.db"))
+    store.remember_references({'nmap': "https://nmap.org"})
+    store.conn.execute("UPDATE refs SET last_used = 0")
+    writeup = WriteupGenerator(str(tmp_path))
+    writeup.store = store
+    writeup.steps = [("Enumeration", ["Ran [nmap] and [unknown]."], None, None)]
+
+    writeup.link_references()
+
+    assert writeup.steps[0][1] == ["Ran [nmap](https://nmap.org) and [unknown]."]
+    (word, _, uses, last_used), = store.references(10)
+    assert (word, uses) == ("nmap", 2)
+    assert last_used > 0
@@ -0,0 +1,47 @@
+from repwritter import static_site
+from repwritter.cli import parse_args
+
+
+def write_writeup(root, folder, title, tags):
+    (root / folder).mkdir(parents=True)
+    (root / folder / "README.md").write_text(f"# {title}\n\n<!-- tags: {', '.join(tags)} -->\n\n## Enumeration\n\nnmap\n")
+
+
+def build_site(root, output):
+    return static_site.cmd_site(parse_args(["site", str(root), "--output", str(output), "-j", "1"]))
+
+
+def test_writeup_named_tags_does_not_collide_with_tag_pages(tmp_path):
+    root, output = tmp_path / "writeups", tmp_path / "site"
+    write_writeup(root, "tags", "Tags", ["linux"])
+    write_writeup(root, "Other", "Other", ["linux", "web"])
+
+    assert build_site(root, output) == 0
+    assert build_site(root, output) == 0
+
+    assert "<h1>Tags</h1>" in (output / "tags" / "index.html").read_text()
+    assert sorted(path.name for path in (output / static_site.SITE_TAGS_FOLDER).iterdir()) == ["linux.html", "web.html"]
+    assert f"href='../{static_site.SITE_TAGS_FOLDER}/web.html'" in (output / "Other" / "index.html").read_text()
+
+
+def test_stale_tag_cleanup_only_removes_files(tmp_path):
+    root, output = tmp_path / "writeups", tmp_path / "site"
+    write_writeup(root, "Box", "Box", ["linux", "web"])
+    assert build_site(root, output) == 0
+    (output / static_site.SITE_TAGS_FOLDER / "assets").mkdir()
+    write_writeup(root, "Box 2", "Box 2", ["linux"])
+    (root / "Box" / "README.md").write_text("# Box\n\n<!-- tags: linux -->\n\n## Enumeration\n\nnmap\n")
+
+    assert build_site(root, output) == 0
+
+    assert sorted(path.name for path in (output / static_site.SITE_TAGS_FOLDER).iterdir()) == ["assets", "linux.html"]
+
+
+def test_writeup_folder_with_the_reserved_name_is_skipped(tmp_path, capsys):
+    root, output = tmp_path / "writeups", tmp_path / "site"
+    write_writeup(root, static_site.SITE_TAGS_FOLDER, "Reserved", ["linux"])
+
+    assert build_site(root, output) == 0
+
+    assert "Skipping" in capsys.readouterr().out
+    assert sorted(path.name for path in (output / static_site.SITE_TAGS_FOLDER).iterdir()) == []
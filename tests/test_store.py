@@ -0,0 +1,68 @@
+import os
+import stat
+
+import pytest
+
+from repwritter import store
+from repwritter.generator import WriteupGenerator
+
+
+@pytest.fixture(autouse=True)
+def objects(tmp_path, monkeypatch):
+    monkeypatch.setattr(store, "OBJECTS_PATH", str(tmp_path / "objects"))
+    monkeypatch.setattr(store, "MANIFESTS_PATH", str(tmp_path / "manifests"))
+
+
+def edit_through(path, data):
+    os.chmod(path, 0o644)
+    with open(path, 'wb') as f:
+        f.write(data)
+
+
+def test_work_tree_files_get_their_own_inode(tmp_path):
+    digest = store.store_bytes(b"nmap output\n")
+
+    store.materialize_object(digest, str(tmp_path / "site" / "scan.txt"))
+    store.materialize_object(digest, str(tmp_path / "repo" / "scan.txt"), link=False)
+
+    assert os.path.samefile(store.object_path(digest), tmp_path / "site" / "scan.txt")
+    assert not os.path.samefile(store.object_path(digest), tmp_path / "repo" / "scan.txt")
+    assert stat.S_IMODE(os.stat(tmp_path / "repo" / "scan.txt").st_mode) == 0o644
+    edit_through(tmp_path / "repo" / "scan.txt", b"edited in the repository\n")
+    assert store.hash_file(store.object_path(digest)) == digest
+
+
+def test_object_edited_through_a_hardlink_is_stored_again(tmp_path, capsys):
+    source = tmp_path / "exploit.py"
+    source.write_bytes(b"print('pwned')\n")
+    digest = store.store_object(str(source))
+    store.materialize_object(digest, str(tmp_path / "writeup" / "exploit.py"))
+    edit_through(tmp_path / "writeup" / "exploit.py", b"print('edited')\n")
+
+    with pytest.raises(OSError):
+        store.materialize_object(digest, str(tmp_path / "other" / "exploit.py"))
+    assert store.store_object(str(source)) == digest
+
+    assert "was modified through a hardlink" in capsys.readouterr().out
+    assert store.hash_file(store.object_path(digest)) == digest
+    store.materialize_object(digest, str(tmp_path / "other" / "exploit.py"))
+    assert (tmp_path / "other" / "exploit.py").read_bytes() == b"print('pwned')\n"
+
+
+def test_export_to_a_work_tree_replaces_old_hardlinks(tmp_path):
+    (tmp_path / "notes.txt").write_text("creds: none\n")
+    writeup = WriteupGenerator(str(tmp_path))
+    writeup.title = "Store Box"
+    writeup.files = [("notes.txt", str(tmp_path / "notes.txt"))]
+    writeup.input_order = [('title', None), ('file', 0)]
+    folder = tmp_path / "repo" / "Store Box"
+    _, manifest = writeup.export_writeup(str(folder), writeup.markdown, jobs=1)
+    store.save_manifest(manifest)
+    stored = store.object_path(manifest['assets']['notes.txt']['hash'])
+    assert os.path.samefile(stored, folder / "notes.txt")
+
+    changed, _ = writeup.export_writeup(str(folder), writeup.markdown, jobs=1, link=False)
+
+    assert changed == ["notes.txt"]
+    assert not os.path.samefile(stored, folder / "notes.txt")
+    assert (folder / "notes.txt").read_text() == "creds: none\n"
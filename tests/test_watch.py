@@ -0,0 +1,47 @@
+import os
+import sys
+import time
+
+import pytest
+
+from repwritter.watch import InotifyWatcher
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+
+
+def changes(watcher, seconds=0.5):
+    """Every path reported until the watcher stays quiet for a moment."""
+    changed, deadline = set(), time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        changed |= watcher.wait(0.1)
+    return changed
+
+
+@pytest.mark.parametrize("replace", ["swap", "recreate"])
+def test_edits_fire_after_the_watched_folder_is_replaced(tmp_path, replace):
+    folder = tmp_path / "Box"
+    folder.mkdir()
+    (folder / "README.md").write_text("old\n")
+    watcher = InotifyWatcher()
+    watcher.watch([str(folder)])
+
+    if replace == "swap":
+        # What swap_folder does on every export
+        staging = tmp_path / ".Box.staging"
+        staging.mkdir()
+        (staging / "README.md").write_text("new\n")
+        os.rename(folder, tmp_path / ".Box.old")
+        os.rename(staging, folder)
+        (tmp_path / ".Box.old" / "README.md").unlink()
+        (tmp_path / ".Box.old").rmdir()
+    else:
+        (folder / "README.md").unlink()
+        folder.rmdir()
+        assert str(folder / "README.md") in changes(watcher)
+        folder.mkdir()
+    changes(watcher)
+    assert list(watcher.dirs.values()) == [str(folder)]
+
+    (folder / "notes.txt").write_text("edited after the swap\n")
+
+    assert str(folder / "notes.txt") in changes(watcher)